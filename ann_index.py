@@ -0,0 +1,199 @@
+"""
+Approksimativ nabosøgning (IVF) over embedding-lageret.
+
+Vektorerne L2-normaliseres og grupperes med sfærisk k-means i nlist klynger.
+Indexet gemmer klynge-centroiderne og vektorerne sorteret efter klynge, så
+hver klynge er et sammenhængende udsnit. En søgning finder de nprobe
+nærmeste centroider og beregner kun cosinus-ligheden mod vektorerne i de
+klynger. Større nprobe giver højere recall og langsommere søgning.
+
+Indexet bygges kun på opfordring - med "build" herunder eller
+embedding_providers.py --build-ann - og skal bygges igen, når
+embedding-lageret er skrevet om. Det kan indlæses med mmap og ligger i en
+mappe ved siden af lageret: cowis_embeddings.npy -> cowis_embeddings_ivf/
+(se ann_dir_for). Klyngerne er ca. √n med mindst MIN_CLUSTER_SIZE vektorer
+hver, og under MIN_IVF_VECTORS vektorer bygges der intet index, fordi
+eksakt søgning (search.py uden --nprobe) så er hurtig nok.
+
+Brug:
+    python3 ann_index.py build [--nlist 64]                 # byg index ud fra cowis_embeddings.npy
+    python3 ann_index.py report -k 10 --nprobe 1 2 4 8 16   # recall@k og svartid mod eksakt søgning
+    python3 ann_index.py build --embeddings-file corpus_embeddings.npy   # -> corpus_embeddings_ivf/
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from embedding_store import EMBEDDINGS_FILE
+from search import normalize_rows, top_k
+
+ANN_DIR = "cowis_embeddings_ivf"
+KMEANS_ITERATIONS = 20
+# Under så mange vektorer er eksakt søgning hurtig nok, og indexet bygges ikke
+MIN_IVF_VECTORS = 1000
+# Mindst så mange vektorer pr. klynge, så k-means har noget at træne centroiderne på
+MIN_CLUSTER_SIZE = 39
+DEFAULT_NPROBE = 8
+# Antal vektorer der sammenlignes med centroiderne ad gangen under k-means
+ASSIGN_BATCH = 8192
+
+
+def ann_dir_for(embeddings_path):
+    """IVF-mappen der hører til et embedding-lager (cowis_embeddings.npy -> cowis_embeddings_ivf)."""
+    return os.path.splitext(embeddings_path)[0] + "_ivf"
+
+def default_nlist(count):
+    """Omkring √n klynger, men aldrig under MIN_CLUSTER_SIZE vektorer pr. klynge."""
+    return max(1, min(int(round(np.sqrt(count))), count // MIN_CLUSTER_SIZE))
+
+def _assign(vectors, centroids):
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), ASSIGN_BATCH):
+        labels[start:start + ASSIGN_BATCH] = np.argmax(vectors[start:start + ASSIGN_BATCH] @ centroids.T, axis=1)
+    return labels
+
+def spherical_kmeans(vectors, nlist, iterations=KMEANS_ITERATIONS, seed=0):
+    """Centroider (normaliserede) og klynge pr. vektor for normaliserede vektorer."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    labels = _assign(vectors, centroids)
+    for _ in range(iterations):
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        counts = np.bincount(labels, minlength=nlist)
+        empty = np.flatnonzero(counts == 0)
+        # Tomme klynger får en tilfældig vektor, så alle nlist klynger bruges
+        sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        centroids = normalize_rows(sums)
+        new_labels = _assign(vectors, centroids)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+    return centroids, labels
+
+def build_ivf(matrix, path=ANN_DIR, nlist=None, iterations=KMEANS_ITERATIONS, seed=0, force=False):
+    """Bygger og gemmer et IVF-index over matrix (rækkenumrene er embedding-lagerets).
+
+    Returnerer None uden at bygge noget, hvis matrix har færre end MIN_IVF_VECTORS
+    rækker (medmindre force=True).
+    """
+    if len(matrix) < MIN_IVF_VECTORS and not force:
+        return None
+    vectors = normalize_rows(matrix)
+    nlist = nlist or default_nlist(len(vectors))
+    nlist = max(1, min(nlist, len(vectors)))
+    centroids, labels = spherical_kmeans(vectors, nlist, iterations, seed)
+
+    ids = np.argsort(labels, kind="stable")
+    offsets = np.zeros(nlist + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(labels, minlength=nlist))
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "centroids.npy"), centroids.astype(np.float32))
+    np.save(os.path.join(path, "vectors.npy"), vectors[ids])
+    np.save(os.path.join(path, "ids.npy"), ids)
+    np.save(os.path.join(path, "offsets.npy"), offsets)
+    meta = {"count": int(len(vectors)), "dimensions": int(vectors.shape[1]), "nlist": int(nlist)}
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+class IvfIndex:
+    def __init__(self, path=ANN_DIR, mmap=True):
+        mode = "r" if mmap else None
+        self.centroids = np.load(os.path.join(path, "centroids.npy"))
+        self.offsets = np.load(os.path.join(path, "offsets.npy"))
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode=mode)
+        self.ids = np.load(os.path.join(path, "ids.npy"), mmap_mode=mode)
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+    def __len__(self):
+        return self.meta["count"]
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    def search_batch(self, query_vectors, k=10, nprobe=DEFAULT_NPROBE):
+        """(scores, rækkenumre) for de k bedste pr. forespørgsel; -1 hvis der er færre kandidater end k."""
+        queries = normalize_rows(np.atleast_2d(query_vectors))
+        probes = top_k(queries @ self.centroids.T, nprobe)
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        all_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        for q, (query, clusters) in enumerate(zip(queries, probes)):
+            positions = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in clusters])
+            if not len(positions):
+                continue
+            scores = self.vectors[positions] @ query
+            best = top_k(scores, k)
+            all_scores[q, :len(best)] = scores[best]
+            all_ids[q, :len(best)] = self.ids[positions[best]]
+        return all_scores, all_ids
+
+    def search(self, query_vector, k=10, nprobe=DEFAULT_NPROBE):
+        scores, ids = self.search_batch(np.asarray(query_vector)[None, :], k, nprobe)
+        return scores[0], ids[0]
+
+
+def recall_report(embeddings_path=EMBEDDINGS_FILE, path=ANN_DIR, k=10, nprobes=(1, 2, 4, 8, 16), queries=200, seed=0):
+    """Sammenligner IVF med eksakt søgning for et udsnit af lagerets egne vektorer."""
+    exact_vectors = normalize_rows(np.load(embeddings_path, mmap_mode="r"))
+    index = IvfIndex(path)
+    rng = np.random.default_rng(seed)
+    sample = exact_vectors[rng.choice(len(exact_vectors), min(queries, len(exact_vectors)), replace=False)]
+    k = min(k, len(exact_vectors))
+
+    # Begge sider søger én forespørgsel ad gangen, som search.py gør
+    started = time.perf_counter()
+    truth = np.stack([top_k(exact_vectors @ query, k) for query in sample])
+    exact_ms = (time.perf_counter() - started) * 1000 / len(sample)
+
+    print(f"📐 {len(index)} vektorer, {index.nlist} klynger, {len(sample)} forespørgsler, k={k}")
+    print(f"   eksakt:      recall 1.000  {exact_ms:.3f} ms/forespørgsel")
+    for nprobe in nprobes:
+        nprobe = min(nprobe, index.nlist)
+        started = time.perf_counter()
+        found = [index.search(query, k, nprobe)[1] for query in sample]
+        ann_ms = (time.perf_counter() - started) * 1000 / len(sample)
+        hits = sum(len(np.intersect1d(t, f)) for t, f in zip(truth, found))
+        print(f"   nprobe={nprobe:<4d} recall {hits / truth.size:.3f}  {ann_ms:.3f} ms/forespørgsel")
+
+def main():
+    parser = argparse.ArgumentParser(description="IVF-index til approksimativ søgning i embeddings.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Byg index ud fra embedding-lageret")
+    build.add_argument("--nlist", type=int,
+                       help=f"Antal klynger (standard: ca. √n, mindst {MIN_CLUSTER_SIZE} vektorer pr. klynge)")
+    build.add_argument("--iterations", type=int, default=KMEANS_ITERATIONS)
+    build.add_argument("--force", action="store_true",
+                       help=f"Byg også under {MIN_IVF_VECTORS} vektorer, hvor eksakt søgning normalt er hurtigst")
+    report = sub.add_parser("report", help="recall@k og svartid mod eksakt søgning")
+    report.add_argument("-k", type=int, default=10)
+    report.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    report.add_argument("--queries", type=int, default=200)
+    for p in (build, report):
+        p.add_argument("--embeddings-file", default=EMBEDDINGS_FILE)
+        p.add_argument("--index-dir", help="IVF-mappe (standard: <embeddings-file>_ivf)")
+    args = parser.parse_args()
+    args.index_dir = args.index_dir or ann_dir_for(args.embeddings_file)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        matrix = np.load(args.embeddings_file, mmap_mode="r")
+        meta = build_ivf(matrix, args.index_dir, args.nlist, args.iterations, force=args.force)
+        if meta is None:
+            raise SystemExit(f"Kun {len(matrix)} vektorer - under {MIN_IVF_VECTORS} er eksakt søgning hurtig nok, "
+                             f"så indexet bygges ikke (brug --force for at bygge alligevel)")
+        print(f"✅ IVF-index med {meta['nlist']} klynger over {meta['count']} vektorer gemt i {args.index_dir} "
+              f"({time.perf_counter() - started:.1f} sek.)")
+    else:
+        recall_report(args.embeddings_file, args.index_dir, args.k, args.nprobe, args.queries)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Append-only journal over gemte artikler, så output-filerne ikke skrives om under crawlet.
+
+Hver artikel skrives én gang som en JSON-linje i en journal-fil pr. kategori.
+Kompaktering bygger de sædvanlige filer ud fra journalen:
+"Cowis */categories/*.json" og index.json pr. hovedkategori (og
+cowis_data_with_embeddings.json med --combined). Embeddings skrives til et
+float32-lager (se embedding_store.py), og artiklerne refererer til deres række.
+IVF-indexet til search.py --nprobe bygges kun på opfordring, når lageret er
+stort nok til at det kan betale sig (python3 ann_index.py build), og det
+samme gælder de kvantiserede kopier (python3 quantized_store.py build).
+
+Brug:
+    python3 article_journal.py                  # kompakter crawl_journal/ til JSON-filerne
+    python3 article_journal.py --journal-dir d  # anden journal-mappe
+    python3 article_journal.py --combined       # skriv også den samlede fil
+"""
+
+import argparse
+import json
+import os
+import threading
+from pathlib import Path
+
+from article_store import ArticleStore
+from embedding_store import CHUNK_EMBEDDINGS_FILE, CHUNK_INDEX_FILE, EMBEDDINGS_FILE, write_embedding_store
+
+JOURNAL_DIR = "crawl_journal"
+COMBINED_FILE = "cowis_data_with_embeddings.json"
+
+# Hovedkategori -> (mappe, navn i udskrifter), i den rækkefølge de gemmes
+MAIN_CATEGORY_DIRS = {
+    "backoffice": ("Cowis Backoffice/categories", "Backoffice"),
+    "pos": ("Cowis POS/categories", "POS"),
+    "webshop": ("Cowis Webshop/categories", "Webshop"),
+}
+
+
+class ArticleJournal:
+    def __init__(self, journal_dir=JOURNAL_DIR):
+        self.journal_dir = Path(journal_dir)
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self._files = {}
+        self._lock = threading.Lock()
+        # Løbenummer på tværs af kategorier, så den samlede fil får crawl-rækkefølgen
+        self._seq = 0
+        for path in self.journal_dir.glob("*.jsonl"):
+            with open(path, "rb") as f:
+                self._seq += sum(1 for _ in f)
+
+    def reset(self):
+        """Starter forfra (bruges når der ikke køres med --resume)."""
+        with self._lock:
+            self._close_files()
+            for path in self.journal_dir.glob("*.jsonl"):
+                path.unlink()
+            self._seq = 0
+
+    def append(self, category_name, main_category, article_data):
+        """Skriver artiklen som én linje i kategoriens journal."""
+        # Artiklen serialiseres uden for låsen; løbenummeret tildeles under den, så to
+        # samtidige kald aldrig får samme seq
+        article_json = json.dumps(article_data, ensure_ascii=False)
+        main_json = json.dumps(main_category, ensure_ascii=False)
+        with self._lock:
+            line = f'{{"seq": {self._seq}, "main_category": {main_json}, "article": {article_json}}}\n'
+            f = self._files.get(category_name)
+            if f is None:
+                f = open(self.journal_dir / f"{category_name}.jsonl", "a", encoding="utf-8")
+                self._files[category_name] = f
+            f.write(line)
+            f.flush()
+            self._seq += 1
+
+    def _close_files(self):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+    def close(self):
+        with self._lock:
+            self._close_files()
+
+
+def read_journal(journal_dir=JOURNAL_DIR):
+    """Læser journalen og returnerer (store, category_main_map).
+
+    En URL der står flere gange (fx efter en genoptaget crawl) tæller kun med sidste udgave.
+    """
+    records = []
+    for path in sorted(Path(journal_dir).glob("*.jsonl")):
+        category_name = path.stem
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Halvt skrevet sidste linje efter et nedbrud
+                    print(f"⚠️ Springer ufuldstændig linje over i {path}")
+                    continue
+                records.append((record["seq"], category_name, record["main_category"], record["article"]))
+
+    records.sort(key=lambda r: r[0])
+    store = ArticleStore()
+    category_main_map = {}
+    for _, category_name, main_category, article_data in records:
+        store.add(article_data["url"], category_name, article_data["text"],
+                  article_data.get("images", []), article_data["embedding"], article_chunks(article_data))
+        category_main_map[category_name] = main_category
+    return store, category_main_map
+
+def article_chunks(article_data):
+    """Chunks fra en journal- eller checkpoint-post som [(start, end, embedding)], eller None."""
+    chunks = article_data.get("chunks")
+    return [(chunk["start"], chunk["end"], chunk["embedding"]) for chunk in chunks] if chunks else None
+
+def write_embeddings(store, category_main_map):
+    """Gemmer alle embeddings i float32-lageret (én række pr. artikel i store) og chunk-lageret."""
+    def index_row(record):
+        return {
+            "url": record.url,
+            "category": record.category_name,
+            "main_category": category_main_map.get(record.category_name, "backoffice"),
+        }
+
+    count, dimensions = write_embedding_store(store.embeddings, [index_row(record) for record in store])
+    print(f"[GEM] {count} embeddings ({dimensions} dim., float32) gemt i {EMBEDDINGS_FILE}")
+
+    matrix, chunks = store.chunk_embeddings()
+    if chunks:
+        rows = []
+        for record, start, end in chunks:
+            rows.append({**index_row(record), "start": start, "end": end})
+        write_embedding_store(matrix, rows, CHUNK_EMBEDDINGS_FILE, CHUNK_INDEX_FILE)
+        print(f"[GEM] {len(rows)} chunk-embeddings gemt i {CHUNK_EMBEDDINGS_FILE}")
+
+def write_category_files(store, category_main_map, combined=False):
+    """Gemmer separate JSON-filer for hver kategori, organiseret efter hovedkategori.
+
+    Hver artikel skrives kun i sin kategori-fil; med combined=True skrives
+    også den gamle samlede fil.
+    """
+    if len(store):
+        write_embeddings(store, category_main_map)
+    grouped = {main_cat: {} for main_cat in MAIN_CATEGORY_DIRS}
+    for category_name, rows in store.categories.items():
+        if not rows:  # Spring over tomme kategorier
+            continue
+        main_cat = category_main_map.get(category_name, "backoffice")
+        grouped.get(main_cat, grouped["backoffice"])[category_name] = store.in_category(category_name)
+
+    total_articles = 0
+    for main_cat, (main_dir, label) in MAIN_CATEGORY_DIRS.items():
+        categories = grouped[main_cat]
+        if not categories:
+            continue
+        os.makedirs(main_dir, exist_ok=True)
+        main_total = 0
+
+        for category_name, records in categories.items():
+            filename = f"{main_dir}/{category_name}.json"
+            with open(filename, "w", encoding="utf-8") as f:
+                json.dump([record.to_dict() for record in records], f, ensure_ascii=False, indent=2)
+            print(f"[GEM] {len(records)} artikler gemt i {filename}")
+            main_total += len(records)
+
+        index = {
+            "main_category": main_cat,
+            "total_articles": main_total,
+            "categories": {name: len(records) for name, records in categories.items()}
+        }
+        with open(f"{main_dir}/index.json", "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+
+        total_articles += main_total
+        print(f"[GEM] Totalt {main_total} {label} artikler gemt i {len(categories)} kategorier")
+
+    if combined:
+        # Samlet fil for bagudkompatibilitet - indeholder den samme tekst som kategori-filerne
+        with open(COMBINED_FILE, "w", encoding="utf-8") as f:
+            json.dump([record.to_dict() for record in store], f, ensure_ascii=False, indent=2)
+        print(f"[GEM] Samlet fil gemt i {COMBINED_FILE}")
+
+    print(f"[GEM] ✅ Totalt {total_articles} artikler gemt i {len(store.categories)} kategorier")
+
+def compact_journal(journal_dir=JOURNAL_DIR, combined=False):
+    """Bygger JSON-filerne ud fra journalen."""
+    store, category_main_map = read_journal(journal_dir)
+    if not len(store):
+        print(f"⚠️ Ingen artikler i {journal_dir}")
+        return
+    write_category_files(store, category_main_map, combined)
+
+def main():
+    parser = argparse.ArgumentParser(description="Kompakterer crawl-journalen til kategori-JSON-filerne.")
+    parser.add_argument("--journal-dir", default=JOURNAL_DIR,
+                        help=f"Mappe med journal-filerne (standard: {JOURNAL_DIR})")
+    parser.add_argument("--combined", action="store_true",
+                        help=f"Skriv også den samlede {COMBINED_FILE}")
+    args = parser.parse_args()
+    compact_journal(args.journal_dir, args.combined)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Kompakt lager til crawlede artikler i hukommelsen.
+
+Hver artikel findes én gang: som en ArticleRecord (med __slots__) og en række
+i en fælles float32-matrix med embeddings. Kategorierne holder kun
+rækkenumre, så en artikel ikke ligger i både "articles" og
+"category_articles", og embeddings ikke fylder som lister af Python-floats.
+
+Artikler der er embedded i flere vinduer (se chunking.py) har desuden deres
+chunks: tegn-offsets i teksten og en række i en separat chunk-matrix.
+"""
+
+import numpy as np
+
+# Startkapacitet for embedding-matrixen (fordobles når den er fuld)
+INITIAL_CAPACITY = 256
+
+
+def _grow(matrix, used, rows, dimensions):
+    """matrix med plads til mindst rows rækker (kapaciteten fordobles)."""
+    if matrix is None:
+        return np.empty((max(INITIAL_CAPACITY, rows), dimensions), dtype=np.float32)
+    if rows > matrix.shape[0]:
+        grown = np.empty((max(rows, 2 * matrix.shape[0]), matrix.shape[1]), dtype=np.float32)
+        grown[:used] = matrix[:used]
+        return grown
+    return matrix
+
+
+class ArticleRecord:
+    __slots__ = ("url", "text", "images", "category_name", "row", "chunks")
+
+    def __init__(self, url, text, images, category_name, row, chunks=None):
+        self.url = url
+        self.text = text
+        self.images = images
+        self.category_name = category_name
+        self.row = row
+        self.chunks = chunks  # [(start, end, chunk-række)] eller None
+
+    def to_dict(self, embedding_row=True):
+        """Artiklen i samme format som i kategori-filerne."""
+        data = {"url": self.url, "text": self.text, "images": self.images}
+        if embedding_row:
+            data["embedding_row"] = self.row
+        if self.chunks:
+            data["chunks"] = [{"start": start, "end": end} for start, end, _ in self.chunks]
+        return data
+
+
+class ArticleStore:
+    def __init__(self):
+        self.records = []
+        self.categories = {}  # kategori -> rækkenumre i crawl-rækkefølge
+        self._row_of = {}     # url -> række
+        self._matrix = None
+        self.chunk_count = 0
+        self._chunk_matrix = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __contains__(self, url):
+        return url in self._row_of
+
+    def add_category(self, category_name):
+        """Registrerer en (evt. tom) kategori."""
+        self.categories.setdefault(category_name, [])
+
+    def add(self, url, category_name, text, images, embedding, chunks=None):
+        """Gemmer en artikel. En URL der allerede findes, overskrives (nyeste udgave vinder).
+
+        chunks er [(start, end, embedding)] for en artikel der er embedded i flere vinduer.
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        row = self._row_of.get(url)
+        if row is None:
+            row = len(self.records)
+            self._matrix = _grow(self._matrix, len(self.records), row + 1, vector.shape[0])
+            self.records.append(ArticleRecord(url, text, images, category_name, row))
+            self._row_of[url] = row
+        else:
+            record = self.records[row]
+            self.categories[record.category_name].remove(row)
+            record.text, record.images, record.category_name = text, images, category_name
+        self._matrix[row] = vector
+        # Chunks fra en tidligere udgave bliver liggende i matrixen, men refereres ikke længere
+        self.records[row].chunks = [self._add_chunk(start, end, chunk_embedding)
+                                    for start, end, chunk_embedding in chunks] if chunks else None
+        self.categories.setdefault(category_name, []).append(row)
+        return self.records[row]
+
+    def _add_chunk(self, start, end, embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        chunk_row = self.chunk_count
+        self._chunk_matrix = _grow(self._chunk_matrix, chunk_row, chunk_row + 1, vector.shape[0])
+        self._chunk_matrix[chunk_row] = vector
+        self.chunk_count += 1
+        return start, end, chunk_row
+
+    @property
+    def embeddings(self):
+        """Embedding-matrixen (rækker i samme rækkefølge som records)."""
+        if self._matrix is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._matrix[:len(self.records)]
+
+    def chunk_embeddings(self):
+        """(matrix, [(record, start, end)]) for alle aktuelle chunks, i artiklernes rækkefølge."""
+        chunks = [(record, start, end, chunk_row) for record in self.records if record.chunks
+                  for start, end, chunk_row in record.chunks]
+        if not chunks:
+            return np.empty((0, 0), dtype=np.float32), []
+        matrix = self._chunk_matrix[[chunk_row for _, _, _, chunk_row in chunks]]
+        return matrix, [(record, start, end) for record, start, end, _ in chunks]
+
+    def in_category(self, category_name):
+        return [self.records[row] for row in self.categories.get(category_name, [])]
+
+    def nbytes(self):
+        """Bytes brugt på embeddings (inkl. ubrugt kapacitet)."""
+        return sum(matrix.nbytes for matrix in (self._matrix, self._chunk_matrix) if matrix is not None)
@@ -0,0 +1,374 @@
+"""
+Benchmark af HTML-ekstraktionen i crawleren.
+
+Sammenligner CPU-tid pr. side mellem den gamle fremgangsmåde (én BeautifulSoup-parse
+pr. ekstraktor) og ParsedPage (én parse pr. side), samt mellem parser-backends.
+"Før"-siden er en uændret kopi af crawlerens oprindelige ekstraktorer (nedenfor),
+ikke cowis_extract's kompatibilitets-funktioner, som selv bygger en ParsedPage.
+Med --verify sammenlignes tekst, billeder og links fra hver backend med
+html.parser-outputtet (differential test).
+
+Brug:
+    python3 benchmark_parsing.py                 # sider bygget fra de tjekkede korpusfiler
+    python3 benchmark_parsing.py --verify        # + tjek at alle backends giver samme output
+    python3 benchmark_parsing.py sider/*.html    # egne gemte HTML-sider
+"""
+
+import argparse
+import html as html_lib
+import json
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from cowis_extract import BASE_URL, DEFAULT_PARSER, PARSERS, ParsedPage, normalize_url, parse_page
+
+MAIN_CATEGORIES = ["Cowis Backoffice", "Cowis POS", "Cowis Webshop"]
+
+# Freshdesk-eksporter med rigtig artikel-HTML i "description"
+FRESHDESK_CATEGORY_FILE = "cowis helper category.json"
+SOLUTIONS_DIR = "Solutions_Organized"
+
+def wrap_article_page(title, body_html):
+    """Pakker artikelindhold ind i samme sidestruktur som knowledge.cowis.net."""
+    return (
+        "<html><head><title>Cowis</title><script>var x = 1;</script></head><body>"
+        '<header><img src="/images/logo.png"></header>'
+        '<nav class="navbar"><ul class="menu"><li><a href="/category/25/3&period-artikel.html">3. Artikel</a></li>'
+        '<li><a href="/category/32/10&period-inventur.html">10. Inventur</a></li></ul></nav>'
+        f'<div id="wrapper"><div class="article-content"><h2>{html_lib.escape(title)}</h2>'
+        f"{body_html}</div></div><footer>Cowis</footer></body></html>"
+    )
+
+def build_article_page(article):
+    """Bygger en artikel-side ud fra en gemt crawler-artikel (tekst + billeder)."""
+    lines = article["text"].split("\n")
+    paragraphs = "".join(f"<p>{html_lib.escape(line)}</p>" for line in lines[1:])
+    images = "".join(
+        f'<img src="{img.replace(BASE_URL, "/")}" width="600">' for img in article.get("images", [])
+    )
+    return wrap_article_page(lines[0], paragraphs + images)
+
+def build_category_page(category_articles):
+    """Bygger en kategori-side med links til artiklerne og en sidefod med paginering."""
+    links = "".join(f'<li><a href="{a["url"]}">{html_lib.escape(a["text"][:40])}</a></li>' for a in category_articles)
+    return (
+        "<html><body><nav><a href=\"/category/25/3&period-artikel.html\">3. Artikel</a></nav>"
+        f'<div class="content"><h2>Kategori</h2><ul>{links}</ul>'
+        "<div>Seite 1 von 2 <a href=\"/category/25/3&period-artikel.html?page=2\">2</a></div></div></body></html>"
+    )
+
+def load_freshdesk_articles():
+    """Artikler (titel, HTML) fra de tjekkede Freshdesk-eksporter."""
+    freshdesk_articles = []
+    if Path(FRESHDESK_CATEGORY_FILE).exists():
+        with open(FRESHDESK_CATEGORY_FILE, "r", encoding="utf-8") as f:
+            category = json.load(f)["category"]
+        for folder in category["all_folders"]:
+            freshdesk_articles.extend(folder["articles"])
+    for json_file in sorted(Path(SOLUTIONS_DIR).rglob("*.json")):
+        if json_file.name == "index.json":
+            continue
+        with open(json_file, "r", encoding="utf-8") as f:
+            freshdesk_articles.extend(json.load(f))
+    return [(a.get("title", ""), a["description"]) for a in freshdesk_articles if a.get("description")]
+
+def load_corpus_pages():
+    """Artikel- og kategori-sider bygget fra de tjekkede kategori-filer og Freshdesk-eksporter."""
+    article_pages = []
+    category_pages = []
+    for main_dir in MAIN_CATEGORIES:
+        for json_file in sorted((Path(main_dir) / "categories").glob("*.json")):
+            if json_file.name == "index.json":
+                continue
+            with open(json_file, "r", encoding="utf-8") as f:
+                cat_articles = json.load(f)
+            for article in cat_articles:
+                article_pages.append((article["url"], build_article_page(article)))
+            category_pages.append((BASE_URL, build_category_page(cat_articles)))
+    for title, description in load_freshdesk_articles():
+        article_pages.append((BASE_URL + "content/1/1/de/artikel.html", wrap_article_page(title, description)))
+    return article_pages, category_pages
+
+def load_html_files(paths):
+    """Indlæser gemte HTML-filer; filer med /category/ i navnet regnes som kategori-sider."""
+    article_pages = []
+    category_pages = []
+    for path in paths:
+        path = Path(path)
+        files = sorted(path.rglob("*.html")) if path.is_dir() else [path]
+        for html_file in files:
+            html = html_file.read_text(encoding="utf-8", errors="replace")
+            target = category_pages if "category" in html_file.name else article_pages
+            target.append((BASE_URL, html))
+    return article_pages, category_pages
+
+# --- Crawlerens oprindelige ekstraktorer (før ParsedPage), kopieret fra den første version af
+# cowis_crawler.py; pagineringen er løftet ud af scrape_category uden visited-tjekkene ---
+
+def baseline_article_links(html, base_url):
+    """Ekstraherer kun artikel-links fra en kategori-side."""
+    soup = BeautifulSoup(html, "html.parser")
+    article_links = set()
+    
+    for a in soup.find_all("a", href=True):
+        href = a["href"]
+        full_url = urljoin(base_url, href)
+        normalized = normalize_url(full_url)
+        
+        # Kun artikel-links fra samme domain
+        if normalized.startswith(BASE_URL.rstrip("/")) and "/content/" in normalized:
+            article_links.add(normalized)
+    
+    return article_links
+
+def baseline_pagination_links(html):
+    """Pagineringen fra den oprindelige scrape_category (egen parse af siden)."""
+    soup = BeautifulSoup(html, "html.parser")
+    pages_to_scrape = []
+    
+    # Find pagination links (oftest i samme kategori)
+    for a in soup.find_all("a", href=True):
+        href = a["href"]
+        full_url = urljoin(BASE_URL, href)
+        link_normalized = normalize_url(full_url)
+        
+        # Hvis det er en link til samme kategori (samme base path)
+        if (link_normalized.startswith(BASE_URL.rstrip("/")) and 
+            "/category/" in link_normalized and
+            full_url not in pages_to_scrape):
+            # Tjek om det ser ud som en pagination link (har side nummer eller lignende)
+            text = a.get_text().strip()
+            if any(char.isdigit() for char in text) or "→" in text or "⇥" in text:
+                pages_to_scrape.append(full_url)
+    return pages_to_scrape
+
+def baseline_article_text(html):
+    """Ekstraherer artikeltekst fra HTML."""
+    if not html:
+        return ""
+    soup = BeautifulSoup(html, "html.parser")
+    
+    # Fjern scripts, styles, navigation og footer elementer
+    for element in soup(["script", "style", "nav", "footer", "header"]):
+        element.decompose()
+    
+    # Prøv flere strategier for at finde artikelindhold
+    # 1. Find h2 med artikel-titel og tag parent content area
+    h2 = soup.find("h2")
+    if h2:
+        # Find det nærmeste content container
+        content_parent = h2.find_parent(["div", "main", "article", "section"])
+        if content_parent:
+            # Fjern eventuelle nested navigation/links sections
+            for nav in content_parent.find_all(["nav", "ul"], class_=lambda x: x and ("nav" in str(x).lower() or "menu" in str(x).lower()) if x else False):
+                nav.decompose()
+            text = content_parent.get_text(separator="\n", strip=True)
+            if len(text) > 100:  # Tjek at vi har nok indhold
+                return text
+    
+    # 2. Fallback: Find div med "content" i class eller id
+    content_div = soup.find("div", class_=lambda x: x and ("content" in str(x).lower() or "article" in str(x).lower()) if x else False)
+    if content_div:
+        text = content_div.get_text(separator="\n", strip=True)
+        if len(text) > 100:
+            return text
+    
+    # 3. Fallback: Find wrapper og filtrer bedre
+    wrapper = soup.find("div", {"id": "wrapper"})
+    if wrapper:
+        # Fjern navigation, footer og lignende
+        for element in wrapper.find_all(["nav", "footer", "header", "aside"]):
+            element.decompose()
+        text = wrapper.get_text(separator="\n", strip=True)
+        # Filtrer væk for kort tekst (sandsynligvis ikke artikelindhold)
+        if len(text) > 100:
+            return text
+    
+    # 4. Sidste resort: Find main element
+    main = soup.find("main")
+    if main:
+        text = main.get_text(separator="\n", strip=True)
+        if len(text) > 100:
+            return text
+    
+    return ""
+
+def baseline_images(html, article_url):
+    """Ekstraherer alle billed-URLs fra en artikel-side."""
+    if not html:
+        return []
+    
+    soup = BeautifulSoup(html, "html.parser")
+    image_urls = []
+    
+    # Find artikel-indholdet først (samme logik som extract_article_text)
+    content_area = None
+    h2 = soup.find("h2")
+    if h2:
+        content_area = h2.find_parent(["div", "main", "article", "section"])
+    
+    if not content_area:
+        content_area = soup.find("div", class_=lambda x: x and ("content" in str(x).lower() or "article" in str(x).lower()) if x else False)
+    
+    if not content_area:
+        content_area = soup.find("div", {"id": "wrapper"})
+    
+    # Find alle img tags i indholdet (eller hele siden hvis content_area ikke findes)
+    search_area = content_area if content_area else soup
+    
+    for img in search_area.find_all("img"):
+        src = img.get("src") or img.get("data-src")  # data-src for lazy-loaded images
+        if not src:
+            continue
+        
+        # Konverter relative URL til absolut URL
+        # Hvis src starter med / eller images/, brug BASE_URL som base
+        # Dette sikrer at /images/... bliver til https://knowledge.cowis.net/images/...
+        # og ikke https://knowledge.cowis.net/content/XX/XX/de/images/...
+        if src.startswith('http://') or src.startswith('https://'):
+            # Allerede en absolut URL
+            full_url = src
+        elif src.startswith('/'):
+            # Absolut path fra websitet root (fx /images/...)
+            full_url = urljoin(BASE_URL, src)
+        elif src.startswith('images/'):
+            # Starter med images/ - skal være /images/ fra root
+            full_url = urljoin(BASE_URL, '/' + src)
+        elif '/images/' in src:
+            # Indeholder /images/ et sted - brug BASE_URL for at sikre korrekt path
+            full_url = urljoin(BASE_URL, '/' + src.lstrip('/'))
+        else:
+            # Relativt til artiklen - brug article_url som base
+            full_url = urljoin(article_url, src)
+        
+        # Filtrer væk tydelige ikoner/logoer baseret på URL path
+        src_lower = src.lower()
+        if any(excluded in src_lower for excluded in ["icon", "logo", "arrow", "spacer", "pixel.gif", "1x1", "blank.gif"]):
+            continue
+        
+        # Tjek at det ikke er i navigation/header/footer
+        parent = img.find_parent(["nav", "header", "footer", "aside"])
+        if parent:
+            continue
+        
+        # Tjek billedets størrelse hvis angivet
+        width = img.get("width", "")
+        height = img.get("height", "")
+        
+        # Hvis størrelse er angivet, tjek at det ikke er et lille ikon
+        if width and width.isdigit():
+            if int(width) < 50:
+                continue
+        if height and height.isdigit():
+            if int(height) < 50:
+                continue
+        
+        # Hvis vi når hertil, er det sandsynligvis et indholdsbillede
+        image_urls.append(full_url)
+    
+    # Fjern duplikater og returner
+    return list(set(image_urls))
+
+# --- Målte funktioner ---
+
+def legacy_article(url, html):
+    # Gammel fremgangsmåde: hver ekstraktor parser siden selv
+    return baseline_article_text(html), baseline_images(html, url)
+
+def parsed_article(url, html):
+    page = ParsedPage(html, url)
+    return page.text, page.images
+
+def legacy_category(url, html):
+    return baseline_article_links(html, BASE_URL), baseline_pagination_links(html)
+
+def parsed_category(url, html):
+    page = ParsedPage(html, url)
+    return page.article_links, page.pagination_links
+
+def backend_article(parser):
+    def run(url, html):
+        page = parse_page(html, url, parser=parser)
+        return page.text, page.images
+    return run
+
+def backend_category(parser):
+    def run(url, html):
+        page = parse_page(html, url, parser=parser)
+        return page.article_links, page.pagination_links
+    return run
+
+def measure(func, pages, rounds):
+    """CPU-tid i ms pr. side (bedste af rounds gennemløb)."""
+    best = None
+    for _ in range(rounds):
+        start = time.process_time()
+        for url, html in pages:
+            func(url, html)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000 / len(pages) if pages else 0.0
+
+def report(label, legacy_func, parsed_func, pages, rounds):
+    if not pages:
+        return
+    before = measure(legacy_func, pages, rounds)
+    after = measure(parsed_func, pages, rounds)
+    speedup = before / after if after else 0.0
+    print(f"{label:<16} {len(pages):>6} sider   før {before:7.2f} ms/side   efter {after:7.2f} ms/side   ({speedup:.2f}x)")
+
+def verify(parser, article_pages, category_pages):
+    """Differential test: sammenligner en backend med html.parser. Returnerer antal afvigelser."""
+    differences = 0
+    for url, html in article_pages + category_pages:
+        reference = parse_page(html, url, parser=DEFAULT_PARSER)
+        page = parse_page(html, url, parser=parser)
+        for field in ("images", "article_links", "pagination_links", "text"):
+            expected = getattr(reference, field)
+            actual = getattr(page, field)
+            if field == "images":
+                expected, actual = sorted(expected), sorted(actual)
+            if expected != actual:
+                differences += 1
+                if differences <= 5:
+                    print(f"   ⚠️  {parser}: {field} afviger for {url}")
+    return differences
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark af HTML-ekstraktion pr. side.")
+    parser.add_argument("html", nargs="*", help="HTML-filer eller mapper (standard: sider bygget fra korpusfilerne)")
+    parser.add_argument("--rounds", type=int, default=3, help="Antal gennemløb; bedste tid bruges (standard: 3)")
+    parser.add_argument("--parser", action="append", choices=PARSERS,
+                        help="Backend der sammenlignes med html.parser (kan gentages; standard: alle)")
+    parser.add_argument("--verify", action="store_true",
+                        help="Tjek at backends giver samme tekst, billeder og links som html.parser")
+    args = parser.parse_args()
+
+    article_pages, category_pages = load_html_files(args.html) if args.html else load_corpus_pages()
+    backends = [p for p in (args.parser or PARSERS) if p != DEFAULT_PARSER]
+
+    print("⏱️  CPU-tid pr. side (én parse pr. ekstraktor → én ParsedPage)\n")
+    report("Artikel-sider", legacy_article, parsed_article, article_pages, args.rounds)
+    report("Kategori-sider", legacy_category, parsed_category, category_pages, args.rounds)
+
+    for backend in backends:
+        print(f"\n⏱️  Parser: {DEFAULT_PARSER} → {backend}\n")
+        report("Artikel-sider", backend_article(DEFAULT_PARSER), backend_article(backend), article_pages, args.rounds)
+        report("Kategori-sider", backend_category(DEFAULT_PARSER), backend_category(backend), category_pages, args.rounds)
+
+    if args.verify:
+        print(f"\n🔍 Differential test mod {DEFAULT_PARSER} ({len(article_pages) + len(category_pages)} sider)")
+        failed = False
+        for backend in backends:
+            differences = verify(backend, article_pages, category_pages)
+            print(f"   {backend}: {'✅ identisk output' if not differences else f'❌ {differences} afvigelser'}")
+            failed = failed or differences > 0
+        if failed:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Leksikalsk BM25-index over alle artikel-korpora, og hybrid søgning med embeddings.
+
+Indexet dækker:
+  - de crawlede kategori-filer ("Cowis */categories/*.json")
+  - Freshdesk-eksporten i Solutions_Organized/
+  - RIAB-artiklerne i RIAB/
+Titel, tags og tekst indekseres, så eksakte produkttermer og fejlkoder
+("Kassenabschluss", "RIAB", "EDI", ...) findes selv hvor embeddings ikke rammer.
+
+Indexet gemmes kompakt i bm25_index/ som et inverteret index: ét sorteret
+ordforråd, postings (dokument-id'er og termfrekvenser) i sammenhængende
+numpy-arrays med en offset pr. term, og dokumentlængder. Postings-arrays
+memory-mappes ved indlæsning.
+
+Hybrid søgning kombinerer BM25-placeringen med den semantiske placering (se
+search.py) med Reciprocal Rank Fusion. Kun de crawlede Cowis-artikler har
+embeddings; de øvrige dokumenter deltager med deres BM25-placering.
+
+Brug:
+    python3 bm25_index.py build
+    python3 bm25_index.py search "Kassenabschluss" [-k 10] [--source riab]
+    python3 bm25_index.py search "Kassenabschluss drucken" --hybrid   # forespørgslen embeddes via OpenAI
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from search import top_k
+
+BM25_DIR = "bm25_index"
+CORPORA = {
+    "cowis": ["Cowis */categories/*.json"],
+    "solutions": ["Solutions_Organized/**/*.json"],
+    "riab": ["RIAB/**/*.json"],
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Reciprocal Rank Fusion: score = sum(1 / (RRF_K + placering))
+RRF_K = 60
+# Antal kandidater fra hver metode der indgår i fusionen
+FUSION_CANDIDATES = 100
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+def _title(article):
+    if article.get("title"):
+        return article["title"]
+    # De crawlede artikler har ingen titel - første linje er overskriften
+    return (article.get("text") or "").strip().split("\n", 1)[0][:200]
+
+def _tags(article):
+    return [tag["name"] if isinstance(tag, dict) else str(tag) for tag in article.get("tags") or []]
+
+def iter_corpus_documents(corpora=CORPORA):
+    """(metadata, tekst der indekseres) for alle artikler i korpora. index.json-filerne springes over."""
+    for source, patterns in corpora.items():
+        for pattern in patterns:
+            for path in sorted(glob.glob(pattern, recursive=True)):
+                with open(path, "r", encoding="utf-8") as f:
+                    articles = json.load(f)
+                if not isinstance(articles, list):
+                    continue
+                for article in articles:
+                    title = _title(article)
+                    meta = {
+                        "source": source,
+                        "id": article.get("url") or article.get("id"),
+                        "title": title,
+                        "file": path,
+                    }
+                    yield meta, " ".join([title, " ".join(_tags(article)), article.get("text") or ""])
+
+def build_bm25(documents, path=BM25_DIR):
+    """Bygger og gemmer det inverterede index. documents er (metadata, tekst)-par."""
+    docs = []
+    doc_lengths = []
+    term_postings = {}
+    for doc_id, (meta, text) in enumerate(documents):
+        counts = {}
+        tokens = tokenize(text)
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            term_postings.setdefault(token, []).append((doc_id, tf))
+        docs.append(meta)
+        doc_lengths.append(len(tokens))
+
+    terms = sorted(term_postings)
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(term_postings[term]) for term in terms])
+    doc_ids = np.empty(offsets[-1], dtype=np.int32)
+    tfs = np.empty(offsets[-1], dtype=np.uint16)
+    for i, term in enumerate(terms):
+        postings = np.asarray(term_postings[term], dtype=np.int64)
+        doc_ids[offsets[i]:offsets[i + 1]] = postings[:, 0]
+        tfs[offsets[i]:offsets[i + 1]] = np.minimum(postings[:, 1], np.iinfo(np.uint16).max)
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "offsets.npy"), offsets)
+    np.save(os.path.join(path, "doc_ids.npy"), doc_ids)
+    np.save(os.path.join(path, "tfs.npy"), tfs)
+    np.save(os.path.join(path, "doc_lengths.npy"), np.asarray(doc_lengths, dtype=np.float32))
+    with open(os.path.join(path, "terms.json"), "w", encoding="utf-8") as f:
+        json.dump(terms, f, ensure_ascii=False, separators=(",", ":"))
+    with open(os.path.join(path, "docs.json"), "w", encoding="utf-8") as f:
+        json.dump(docs, f, ensure_ascii=False, separators=(",", ":"))
+    return len(docs), len(terms), int(offsets[-1])
+
+
+class Bm25Index:
+    def __init__(self, path=BM25_DIR, k1=BM25_K1, b=BM25_B):
+        self.offsets = np.load(os.path.join(path, "offsets.npy"))
+        self.doc_ids = np.load(os.path.join(path, "doc_ids.npy"), mmap_mode="r")
+        self.tfs = np.load(os.path.join(path, "tfs.npy"), mmap_mode="r")
+        doc_lengths = np.load(os.path.join(path, "doc_lengths.npy"))
+        with open(os.path.join(path, "terms.json"), "r", encoding="utf-8") as f:
+            self.term_index = {term: i for i, term in enumerate(json.load(f))}
+        with open(os.path.join(path, "docs.json"), "r", encoding="utf-8") as f:
+            self.docs = json.load(f)
+        self.doc_of_id = {doc["id"]: doc for doc in self.docs}
+        self.k1 = k1
+        # Længde-normaliseringen afhænger kun af dokumentet og beregnes én gang
+        self._norm = k1 * (1 - b + b * doc_lengths / max(doc_lengths.mean(), 1.0))
+        self._sources = {}
+        for i, doc in enumerate(self.docs):
+            self._sources.setdefault(doc["source"], []).append(i)
+        self._sources = {source: np.asarray(ids, dtype=np.int64) for source, ids in self._sources.items()}
+
+    def __len__(self):
+        return len(self.docs)
+
+    def scores(self, query):
+        """BM25-score for alle dokumenter."""
+        scores = np.zeros(len(self.docs), dtype=np.float32)
+        for term in set(tokenize(query)):
+            i = self.term_index.get(term)
+            if i is None:
+                continue
+            start, end = self.offsets[i], self.offsets[i + 1]
+            ids = self.doc_ids[start:end]
+            tf = self.tfs[start:end].astype(np.float32)
+            idf = np.log(1 + (len(self.docs) - (end - start) + 0.5) / ((end - start) + 0.5))
+            # Et dokument optræder højst én gang pr. term, så += er sikkert
+            scores[ids] += idf * tf * (self.k1 + 1) / (tf + self._norm[ids])
+        return scores
+
+    def search(self, query, k=10, source=None):
+        """De k bedste som liste af (score, dokument-metadata). Dokumenter uden træf udelades."""
+        scores = self.scores(query)
+        if source is not None:
+            candidates = self._sources.get(source, np.empty(0, dtype=np.int64))
+            best = candidates[top_k(scores[candidates], k)]
+        else:
+            best = top_k(scores, k)
+        return [(float(scores[i]), self.docs[i]) for i in best if scores[i] > 0]
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """Fletter flere placeringer (lister af nøgler, bedste først) til én. Returnerer [(score, nøgle)]."""
+    fused = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, 1):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(((score, key) for key, score in fused.items()), key=lambda item: -item[0])
+
+def hybrid_search(bm25, semantic, query, query_vector, k=10, candidates=FUSION_CANDIDATES):
+    """BM25 og semantisk søgning flettet med RRF. Returnerer [(score, dokument-metadata)].
+
+    Semantiske træf matches til BM25-dokumenterne via URL'en; træf der ikke
+    er i BM25-indexet tages med ud fra embedding-lagerets metadata.
+    """
+    lexical = [doc["id"] for _, doc in bm25.search(query, candidates)]
+    semantic_ids = [row["url"] for _, row in semantic.search(query_vector, candidates)]
+    hits = []
+    for score, key in reciprocal_rank_fusion([lexical, semantic_ids])[:k]:
+        doc = bm25.doc_of_id.get(key) or {"source": "cowis", "id": key, "title": key, "file": None}
+        hits.append((score, doc))
+    return hits
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25-index over alle artikel-korpora.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Byg indexet ud fra kategori-filerne, Solutions_Organized og RIAB")
+    search = sub.add_parser("search", help="Søg i indexet")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=10)
+    search.add_argument("--source", choices=sorted(CORPORA), help="Søg kun i ét korpus")
+    search.add_argument("--hybrid", action="store_true",
+                        help="Flet med semantisk søgning i de crawlede embeddings (Reciprocal Rank Fusion)")
+    for p in (build, search):
+        p.add_argument("--index-dir", default=BM25_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        started = time.perf_counter()
+        count, terms, postings = build_bm25(iter_corpus_documents(), args.index_dir)
+        print(f"✅ BM25-index: {count} dokumenter, {terms} termer, {postings} postings gemt i {args.index_dir}/ "
+              f"({time.perf_counter() - started:.1f} sek.)")
+        return
+
+    index = Bm25Index(args.index_dir)
+    if args.hybrid:
+        from search import SemanticIndex, embed_query
+
+        semantic = SemanticIndex()
+        query_vector = embed_query(args.query)
+        started = time.perf_counter()
+        hits = hybrid_search(index, semantic, args.query, query_vector, args.k)
+    else:
+        started = time.perf_counter()
+        hits = index.search(args.query, args.k, args.source)
+    print(f"🔎 {len(index)} dokumenter, søgning: {(time.perf_counter() - started) * 1000:.2f} ms\n")
+    for rank, (score, doc) in enumerate(hits, 1):
+        print(f"{rank:3d}. {score:.4f}  [{doc['source']}]  {doc['title']}  ({doc['id']})")
+
+if __name__ == "__main__":
+    main()
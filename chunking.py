@@ -0,0 +1,151 @@
+"""
+Opdeling af lange artikler i overlappende vinduer inden embedding.
+
+En artikel der er længere end CHUNK_TOKENS deles i vinduer af højst
+CHUNK_TOKENS tokens, så ingen tekst overstiger modellens grænse. Et vindue
+brydes helst ved en overskrift (fx "6.1.2 Felder im Bereich Order"), ellers
+mellem linjer og kun i sidste instans midt i en linje. Hvert nyt vindue
+starter med de sidste ca. OVERLAP_TOKENS tokens af det forrige, så
+sammenhængen ved et brud ikke går tabt. Linjer der er længere end
+overlappet (fx Freshdesk-tekster der står på én linje) deles i sætninger og
+derefter ved mellemrum i enheder på højst det halve overlap, så overlappet
+altid kan bestå af hele enheder.
+
+Vinduerne angives som tegn-offsets i artiklens tekst (start, end), så hvert
+chunk kan føres tilbage til sin artikel og position.
+"""
+
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from embedding_batcher import count_tokens
+
+# text-embedding-3-small accepterer 8191 tokens; mindre vinduer giver skarpere vektorer
+CHUNK_TOKENS = 800
+OVERLAP_TOKENS = 100
+
+# Sætningsgrænser i en lang linje (mellemrummet efter tegnet hører til sætningen)
+_SENTENCE_END = re.compile(r"(?<=[.!?:;])\s+")
+# Antal tegn pr. token der højst tælles med, når en lang linje deles
+_MAX_CHARS_PER_TOKEN = 16
+
+# Nummererede overskrifter ("6.1.2 Felder ...", "10.07 Die ...") og markdown-overskrifter
+HEADING_PATTERN = re.compile(r"^\s*(#{1,6}\s+\S|\d+(\.\d+)*\.?\s+\S)")
+
+Chunk = namedtuple("Chunk", "start end tokens")
+
+
+def _lines(text):
+    """(start, end) for hver linje inkl. linjeskift."""
+    spans = []
+    start = 0
+    for match in re.finditer(r"\n", text):
+        spans.append((start, match.end()))
+        start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+def _sentences(text, start, end):
+    """(start, end) for hver sætning i text[start:end]."""
+    spans = []
+    for match in _SENTENCE_END.finditer(text, start, end):
+        if match.end() < end:
+            spans.append((start, match.end()))
+            start = match.end()
+    spans.append((start, end))
+    return spans
+
+def _split_long_line(text, start, end, max_tokens):
+    """Deler en linje der alene overstiger max_tokens, helst ved mellemrum."""
+    pieces = []
+    while end - start > 0:
+        # Kun et udsnit omkring grænsen tælles, så en meget lang linje ikke tælles forfra for hvert stykke
+        window_end = min(end, start + max_tokens * _MAX_CHARS_PER_TOKEN)
+        tokens = count_tokens(text[start:window_end])
+        if tokens <= max_tokens and window_end < end:
+            window_end = end
+            tokens = count_tokens(text[start:end])
+        if tokens <= max_tokens:
+            pieces.append((start, end, tokens))
+            break
+        # Gæt et brudpunkt ud fra tegn pr. token og skær ned til det passer
+        cut = start + max(1, (window_end - start) * max_tokens // tokens)
+        while cut > start + 1 and count_tokens(text[start:cut]) > max_tokens:
+            cut = start + (cut - start) * 9 // 10
+        space = text.rfind(" ", start + (cut - start) // 2, cut)
+        if space > start:
+            cut = space + 1
+        pieces.append((start, cut, count_tokens(text[start:cut])))
+        start = cut
+    return pieces
+
+def _units(text, max_tokens, overlap_tokens):
+    """Tekstens mindste byggesten som (start, end, tokens, er_overskrift).
+
+    En linje er én enhed, medmindre den er længere end overlappet; så deles den i
+    sætninger og ved mellemrum, så ingen enhed er over overlap_tokens // 2 tokens.
+    """
+    unit_tokens = max(1, overlap_tokens // 2)
+    units = []
+    for start, end in _lines(text):
+        if not text[start:end].strip():
+            continue
+        heading = bool(HEADING_PATTERN.match(text[start:end]))
+        tokens = count_tokens(text[start:end])
+        if tokens <= overlap_tokens:
+            pieces = [(start, end, tokens)]
+        else:
+            pieces = [piece for sentence_start, sentence_end in _sentences(text, start, end)
+                      for piece in _split_long_line(text, sentence_start, sentence_end, unit_tokens)]
+        for piece_start, piece_end, tokens in pieces:
+            units.append((piece_start, piece_end, tokens, heading and piece_start == start))
+    return units
+
+def chunk_text(text, max_tokens=CHUNK_TOKENS, overlap_tokens=OVERLAP_TOKENS):
+    """Deler text i overlappende vinduer. Returnerer en liste af Chunk(start, end, tokens).
+
+    En tekst der kan være i ét vindue returneres som ét chunk, og en tom tekst
+    (eller en med kun whitespace) giver ingen chunks.
+    """
+    if not text.strip():
+        return []
+    total = count_tokens(text)
+    if total <= max_tokens:
+        return [Chunk(0, len(text), total)]
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+
+    chunks = []
+    current = []  # enheder i det aktuelle vindue
+    current_tokens = 0
+    for unit in _units(text, max_tokens, overlap_tokens):
+        tokens, heading = unit[2], unit[3]
+        new_content = [u for u in current if not u[4]]
+        full = current_tokens + tokens > max_tokens
+        # Ved en overskrift brydes vinduet tidligt, hvis det allerede er halvt fyldt
+        section_break = heading and current_tokens >= max_tokens // 2
+        if new_content and (full or section_break):
+            chunks.append(Chunk(current[0][0], current[-1][1], current_tokens))
+            # Overlap: de sidste hele enheder op til overlap_tokens gentages i næste vindue
+            carried = []
+            carried_tokens = 0
+            for u in reversed(current):
+                if carried_tokens + u[2] > overlap_tokens or carried_tokens + u[2] + tokens > max_tokens:
+                    break
+                carried.insert(0, u[:4] + (True,))
+                carried_tokens += u[2]
+            current, current_tokens = carried, carried_tokens
+        current.append(unit + (False,))
+        current_tokens += tokens
+    if [u for u in current if not u[4]]:
+        chunks.append(Chunk(current[0][0], current[-1][1], current_tokens))
+    return chunks
+
+def combine_embeddings(embeddings, weights):
+    """Artiklens samlede vektor: token-vægtet gennemsnit af chunk-vektorerne, L2-normaliseret."""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    combined = np.average(matrix, axis=0, weights=np.asarray(weights, dtype=np.float32))
+    norm = np.linalg.norm(combined)
+    return combined / norm if norm else combined
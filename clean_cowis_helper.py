@@ -8,12 +8,15 @@ import re
 import html
 from bs4 import BeautifulSoup
 
+# BeautifulSoup parser; "lxml" er hurtigere end Pythons indbyggede "html.parser"
+HTML_PARSER = "html.parser"
+
 def extract_images_from_html(html_content):
     """Extract image URLs from HTML content"""
     if not html_content:
         return []
 
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, HTML_PARSER)
     images = []
 
     for img in soup.find_all('img'):
@@ -29,7 +32,7 @@ def clean_html_text(html_content):
         return ""
 
     # Parse HTML
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, HTML_PARSER)
 
     # Remove script and style elements
     for script in soup(["script", "style"]):
@@ -103,13 +106,15 @@ def process_cowis_helper(input_file, output_file):
 if __name__ == "__main__":
     import sys
 
-    if len(sys.argv) != 3:
-        print("Usage: python clean_cowis_helper.py <input_file> <output_file>")
-        print("Example: python clean_cowis_helper.py 'cowis helper category.json' 'cowis_helper_vector_store.json'")
+    if len(sys.argv) not in (3, 4):
+        print("Usage: python clean_cowis_helper.py <input_file> <output_file> [html.parser|lxml]")
+        print("Example: python clean_cowis_helper.py 'cowis helper category.json' 'cowis_helper_vector_store.json' lxml")
         sys.exit(1)
 
     input_file = sys.argv[1]
     output_file = sys.argv[2]
+    if len(sys.argv) == 4:
+        HTML_PARSER = sys.argv[3]
 
     try:
         process_cowis_helper(input_file, output_file)
@@ -1,90 +1,44 @@
 import os
-import json
 import time
 import re
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, unquote, urlparse, parse_qs, urlunparse
-from openai import OpenAI
-from dotenv import load_dotenv
-
-# Load API key
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise ValueError("Ingen OPENAI_API_KEY fundet i .env")
-
-client = OpenAI(api_key=api_key)
-
-BASE_URL = "https://knowledge.cowis.net/"
-
-# Cowis Backoffice kategorier
-BACKOFFICE_CATEGORIES = [
-    # Basiswissen
-    "https://knowledge.cowis.net/category/21/basiswissen.html",
-    # Handbuch - 1. Einführung
-    "https://knowledge.cowis.net/category/23/1&period-einf&uumlhrung.html",
-    # Handbuch - 2. Adressen
-    "https://knowledge.cowis.net/category/24/2&period-adressen.html",
-    # Handbuch - 3. Artikel
-    "https://knowledge.cowis.net/category/25/3&period-artikel.html",
-    # Handbuch - 4. Wareneingang
-    "https://knowledge.cowis.net/category/26/4&period-wareneingang.html",
-    # Handbuch - 5. Retoure
-    "https://knowledge.cowis.net/category/27/5&period-retoure.html",
-    # Handbuch - 6. Order
-    "https://knowledge.cowis.net/category/28/6&period-order.html",
-    # Handbuch - 7. Auftragsbearbeitung
-    "https://knowledge.cowis.net/category/29/7&period-auftragsbearbeitung.html",
-    # Handbuch - 8. Zahlungen
-    "https://knowledge.cowis.net/category/30/8&period-zahlungen.html",
-    # Handbuch - 9. Auswertungen
-    "https://knowledge.cowis.net/category/31/9&period-auswertungen.html",
-    # Handbuch - 10. Inventur
-    "https://knowledge.cowis.net/category/32/10&period-inventur.html",
-    # Handbuch - 11. EDI
-    "https://knowledge.cowis.net/category/33/11&period-edi.html",
-    # Handbuch - 12. Kassenabschlüsse
-    "https://knowledge.cowis.net/category/34/12&period-kassenabschl&uumlsse.html",
-    # Handbuch - 13. Etikettendruck
-    "https://knowledge.cowis.net/category/35/13&period-etikettendruck.html",
-    # Handbuch - 14. Einstellungen
-    "https://knowledge.cowis.net/category/47/14&period-einstellungen.html",
-    # Schnittstellen - E-Commerce
-    "https://knowledge.cowis.net/category/46/e_commerce.html",
-    # Schnittstellen - EDI
-    "https://knowledge.cowis.net/category/50/edi.html",
-    # Schnittstellen - Fibu
-    "https://knowledge.cowis.net/category/52/fibu.html",
-    # Schnittstellen - Stammdatenimport-export
-    "https://knowledge.cowis.net/category/53/stammdatenimport_export.html",
-    # Systemvoraussetzungen
-    "https://knowledge.cowis.net/category/48/systemvoraussetzungen.html"
-]
-
-# Cowis POS kategorier
-POS_CATEGORIES = [
-    # Handbuch
-    "https://knowledge.cowis.net/category/37/handbuch.html",
-    # Systemvoraussetzungen
-    "https://knowledge.cowis.net/category/49/systemvoraussetzungen.html"
-]
-
-# Cowis Webshop kategorier
-WEBSHOP_CATEGORIES = [
-    # Gutscheinverwaltung
-    "https://knowledge.cowis.net/category/17/gutscheinverwaltung.html"
-]
-
-# Updatebeschreibungen kategorier
-UPDATEBESCHREIBUNGEN_CATEGORIES = [
-    # DdD Cowis backoffice
-    "https://knowledge.cowis.net/category/42/ddd-cowis-backoffice.html",
-    # DdD Cowis pos
-    "https://knowledge.cowis.net/category/43/ddd-cowis-pos.html",
-    # DdD Cowis Webshop
-    "https://knowledge.cowis.net/category/44/ddd-cowis-webshop.html"
-]
+import argparse
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+from http_transport import HttpTransport, POOL_SIZE
+from politeness import AimdGovernor, MIN_RATE, MAX_RATE
+from http_cache import HttpCache, CACHE_FILE
+from crawl_checkpoint import CrawlCheckpoint, CHECKPOINT_FILE
+from embedding_batcher import EmbeddingBatcher, AsyncEmbeddingBatcher
+from embedding_cache import EmbeddingCache, CACHE_FILE as EMBEDDING_CACHE_FILE
+from article_journal import ArticleJournal, JOURNAL_DIR, COMBINED_FILE, article_chunks, write_category_files
+from article_store import ArticleStore
+from chunking import chunk_text, combine_embeddings
+from cowis_extract import (
+    BASE_URL,
+    DEFAULT_PARSER,
+    PARSERS,
+    extract_article_page,
+    extract_category_page,
+    normalize_page_url,
+    normalize_url,
+)
+from taxonomy import load_taxonomy
+from crawl_frontier import Frontier, AsyncFrontier
+from url_inventory import INVENTORY_FILE, discover, load_inventory, save_inventory
+from html_archive import ARCHIVE_FILE, HtmlArchive, extract_archived_article
+from embedding_providers import PROVIDERS, get_provider
+
+# Kategorier og hovedkategori-mapping ligger i taxonomy.json
+TAXONOMY = load_taxonomy()
+
+# Startsider pr. crawl-gruppe, i crawl-rækkefølge
+BACKOFFICE_CATEGORIES = TAXONOMY.category_urls("backoffice")
+POS_CATEGORIES = TAXONOMY.category_urls("pos")
+WEBSHOP_CATEGORIES = TAXONOMY.category_urls("webshop")
+UPDATEBESCHREIBUNGEN_CATEGORIES = TAXONOMY.category_urls("updatebeschreibungen")
 
 # Samlet liste med mapping til hovedkategori
 CATEGORY_MAPPING = {
@@ -96,52 +50,63 @@ CATEGORY_MAPPING = {
 
 START_CATEGORIES = BACKOFFICE_CATEGORIES + POS_CATEGORIES + WEBSHOP_CATEGORIES + UPDATEBESCHREIBUNGEN_CATEGORIES
 
+# Asynkron crawl: maks. samtidige forespørgsler pr. host (raten styres af AimdGovernor)
+CONCURRENCY_PER_HOST = 16
+# Processer til HTML-ekstraktion i async-mode (0 = ekstraher i event-loopet)
+EXTRACT_WORKERS = os.cpu_count() or 1
+# Størrelse på køerne mellem fetch -> extract -> embed -> persist (modtryk)
+EXTRACT_QUEUE_PER_WORKER = 4
+EMBED_QUEUE_SIZE = 512
+PERSIST_QUEUE_SIZE = 512
+
+# Delt HTTP-session (keep-alive, retries) til både kategorier og artikler
+transport = HttpTransport()
+# Persistent cache til conditional GET (None = slået fra)
+http_cache = None
+# Checkpoint til --resume (None = slået fra)
+checkpoint = None
+# Append-only journal over gemte artikler (None = slået fra)
+journal = None
+# HTML-parser til ekstraktion (se cowis_extract.PARSERS)
+html_parser = DEFAULT_PARSER
+# Samler artikeltekster i batches til embeddings-endpointet (sættes i main/crawl_async)
+embedding_batcher = None
+# Cache over tidligere embeddings (None = slået fra)
+embedding_cache = None
+# Embedding-backend (se embedding_providers.py); oprettes i main, så en manglende API-nøgle
+# først er en fejl når OpenAI-backenden faktisk skal bruges
+embedder = None
+# Proces-pool til HTML-ekstraktion (sættes i crawl_async)
+extract_pool = None
+# Arkiv over alle hentede sider til --reextract (None = slået fra)
+html_archive = None
+# Skriv også den samlede cowis_data_with_embeddings.json (--combined)
+write_combined = False
+
 visited_urls = set()
-articles = []
-category_articles = {}  # Holder styr på artikler per kategori
+articles = ArticleStore()  # Alle gemte artikler; kategorierne holder kun rækkenumre
+pending_chunks = {}  # url -> chunk-embeddings for en artikel der venter på sine øvrige chunks
 category_main_map = {}  # Holder styr på hvilken hovedkategori hver kategori tilhører
-
-def normalize_url(url):
-    """Fjerner irrelevante query params og normaliserer URL'en."""
-    url = unquote(url)
-    parsed = urlparse(url)
-    clean_path = parsed.path.strip("/")
-    # Drop query params helt for at undgå loops
-    normalized = urlunparse((parsed.scheme, parsed.netloc, clean_path, "", "", ""))
-    return normalized.lower()
+category_pages = {}  # Besøgte sider pr. kategori (async-mode; ved --resume også færdige sider fra checkpointet)
+skipped_pagination = set()  # (kategori, URL) for links til andre kategorier der ikke hentes som paginering
 
 def fetch_html(url):
+    # Sidetallet (?page=2) er en del af nøglen, så hver side har sin egen ETag og body
+    cache_key = normalize_page_url(url)
+    cached = http_cache.get(cache_key) if http_cache else None
     try:
-        # Headers for at browse fra Tyskland
-        headers = {
-            "Accept-Language": "de-DE,de;q=0.9,en-US;q=0.8,en;q=0.7",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        }
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = transport.get(url, headers=http_cache.conditional_headers(cached) if cached else None)
+        if resp.status_code == 304 and cached:
+            http_cache.record_hit()
+            return cached["body"]
         resp.raise_for_status()
+        if http_cache:
+            http_cache.store(cache_key, url, resp)
         return resp.text
     except Exception as e:
         print(f"Fejl ved hentning af {url}: {e}")
         return ""
 
-def extract_article_links(html, base_url):
-    """Ekstraherer kun artikel-links fra en kategori-side."""
-    soup = BeautifulSoup(html, "html.parser")
-    article_links = set()
-    
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        full_url = urljoin(base_url, href)
-        normalized = normalize_url(full_url)
-        
-        # Kun artikel-links fra samme domain
-        if normalized.startswith(BASE_URL.rstrip("/")) and "/content/" in normalized:
-            article_links.add(normalized)
-    
-    return article_links
-
-
 def is_category(url):
     return "/category/" in url
 
@@ -149,63 +114,8 @@ def is_article(url):
     return "/content/" in url
 
 def get_main_category(url):
-    """Identificerer hovedkategorien baseret på URL."""
-    normalized = normalize_url(url)
-    
-    # For kategorier eller artikler, tjek kategori-ID fra URL
-    match = re.search(r'/category/(\d+)/', normalized)
-    if match:
-        cat_id = int(match.group(1))
-        
-        # Updatebeschreibungen underkategorier mappes til deres respektive hovedkategorier
-        if cat_id == 42:  # Updatebeschreibungen - DdD Cowis backoffice
-            return "backoffice"
-        if cat_id == 43:  # Updatebeschreibungen - DdD Cowis pos
-            return "pos"
-        if cat_id == 44:  # Updatebeschreibungen - DdD Cowis Webshop
-            return "webshop"
-        
-        # POS kategori ID'er: 37, 49
-        if cat_id == 37 or cat_id == 49:
-            return "pos"
-        
-        # Webshop kategori ID'er: 15, 17
-        if cat_id == 15 or cat_id == 17:
-            return "webshop"
-        
-        # Backoffice kategori ID'er: 21, 23-35, 46-48, 50, 52-53
-        if cat_id in [21, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35, 46, 47, 48, 50, 52, 53]:
-            return "backoffice"
-    
-    # Tjek om URL'en er direkte i en af kategorilisterne
-    for pos_cat in POS_CATEGORIES:
-        pos_normalized = normalize_url(pos_cat)
-        if normalized == pos_normalized:
-            return "pos"
-    
-    for webshop_cat in WEBSHOP_CATEGORIES:
-        webshop_normalized = normalize_url(webshop_cat)
-        if normalized == webshop_normalized:
-            return "webshop"
-    
-    for update_cat in UPDATEBESCHREIBUNGEN_CATEGORIES:
-        update_normalized = normalize_url(update_cat)
-        if normalized == update_normalized:
-            # Map updatebeschreibungen underkategorier til deres respektive hovedkategorier
-            if "/category/42/" in normalized:
-                return "backoffice"
-            if "/category/43/" in normalized:
-                return "pos"
-            if "/category/44/" in normalized:
-                return "webshop"
-    
-    for backoffice_cat in BACKOFFICE_CATEGORIES:
-        backoffice_normalized = normalize_url(backoffice_cat)
-        if normalized == backoffice_normalized:
-            return "backoffice"
-    
-    # Default til backoffice hvis usikker
-    return "backoffice"
+    """Identificerer hovedkategorien baseret på URL (opslag på kategori-ID, ellers URL)."""
+    return TAXONOMY.main_category(url)
 
 def get_category_name(url):
     """Ekstraherer kategori-navn eller ID fra URL."""
@@ -233,250 +143,137 @@ def get_category_from_url_stack(url, category_stack):
         return category_stack[-1]
     return "unknown"
 
-def extract_article_text(html):
-    """Ekstraherer artikeltekst fra HTML."""
-    if not html:
-        return ""
-    soup = BeautifulSoup(html, "html.parser")
-    
-    # Fjern scripts, styles, navigation og footer elementer
-    for element in soup(["script", "style", "nav", "footer", "header"]):
-        element.decompose()
-    
-    # Prøv flere strategier for at finde artikelindhold
-    # 1. Find h2 med artikel-titel og tag parent content area
-    h2 = soup.find("h2")
-    if h2:
-        # Find det nærmeste content container
-        content_parent = h2.find_parent(["div", "main", "article", "section"])
-        if content_parent:
-            # Fjern eventuelle nested navigation/links sections
-            for nav in content_parent.find_all(["nav", "ul"], class_=lambda x: x and ("nav" in str(x).lower() or "menu" in str(x).lower()) if x else False):
-                nav.decompose()
-            text = content_parent.get_text(separator="\n", strip=True)
-            if len(text) > 100:  # Tjek at vi har nok indhold
-                return text
-    
-    # 2. Fallback: Find div med "content" i class eller id
-    content_div = soup.find("div", class_=lambda x: x and ("content" in str(x).lower() or "article" in str(x).lower()) if x else False)
-    if content_div:
-        text = content_div.get_text(separator="\n", strip=True)
-        if len(text) > 100:
-            return text
-    
-    # 3. Fallback: Find wrapper og filtrer bedre
-    wrapper = soup.find("div", {"id": "wrapper"})
-    if wrapper:
-        # Fjern navigation, footer og lignende
-        for element in wrapper.find_all(["nav", "footer", "header", "aside"]):
-            element.decompose()
-        text = wrapper.get_text(separator="\n", strip=True)
-        # Filtrer væk for kort tekst (sandsynligvis ikke artikelindhold)
-        if len(text) > 100:
-            return text
-    
-    # 4. Sidste resort: Find main element
-    main = soup.find("main")
-    if main:
-        text = main.get_text(separator="\n", strip=True)
-        if len(text) > 100:
-            return text
-    
-    return ""
-
-def extract_images(html, article_url):
-    """Ekstraherer alle billed-URLs fra en artikel-side."""
-    if not html:
-        return []
-    
-    soup = BeautifulSoup(html, "html.parser")
-    image_urls = []
-    
-    # Find artikel-indholdet først (samme logik som extract_article_text)
-    content_area = None
-    h2 = soup.find("h2")
-    if h2:
-        content_area = h2.find_parent(["div", "main", "article", "section"])
-    
-    if not content_area:
-        content_area = soup.find("div", class_=lambda x: x and ("content" in str(x).lower() or "article" in str(x).lower()) if x else False)
-    
-    if not content_area:
-        content_area = soup.find("div", {"id": "wrapper"})
-    
-    # Find alle img tags i indholdet (eller hele siden hvis content_area ikke findes)
-    search_area = content_area if content_area else soup
-    
-    for img in search_area.find_all("img"):
-        src = img.get("src") or img.get("data-src")  # data-src for lazy-loaded images
-        if not src:
-            continue
-        
-        # Konverter relative URL til absolut URL
-        # Hvis src starter med / eller images/, brug BASE_URL som base
-        # Dette sikrer at /images/... bliver til https://knowledge.cowis.net/images/...
-        # og ikke https://knowledge.cowis.net/content/XX/XX/de/images/...
-        if src.startswith('http://') or src.startswith('https://'):
-            # Allerede en absolut URL
-            full_url = src
-        elif src.startswith('/'):
-            # Absolut path fra websitet root (fx /images/...)
-            full_url = urljoin(BASE_URL, src)
-        elif src.startswith('images/'):
-            # Starter med images/ - skal være /images/ fra root
-            full_url = urljoin(BASE_URL, '/' + src)
-        elif '/images/' in src:
-            # Indeholder /images/ et sted - brug BASE_URL for at sikre korrekt path
-            full_url = urljoin(BASE_URL, '/' + src.lstrip('/'))
-        else:
-            # Relativt til artiklen - brug article_url som base
-            full_url = urljoin(article_url, src)
-        
-        # Filtrer væk tydelige ikoner/logoer baseret på URL path
-        src_lower = src.lower()
-        if any(excluded in src_lower for excluded in ["icon", "logo", "arrow", "spacer", "pixel.gif", "1x1", "blank.gif"]):
-            continue
-        
-        # Tjek at det ikke er i navigation/header/footer
-        parent = img.find_parent(["nav", "header", "footer", "aside"])
-        if parent:
-            continue
-        
-        # Tjek billedets størrelse hvis angivet
-        width = img.get("width", "")
-        height = img.get("height", "")
-        
-        # Hvis størrelse er angivet, tjek at det ikke er et lille ikon
-        if width and width.isdigit():
-            if int(width) < 50:
-                continue
-        if height and height.isdigit():
-            if int(height) < 50:
-                continue
-        
-        # Hvis vi når hertil, er det sandsynligvis et indholdsbillede
-        image_urls.append(full_url)
-    
-    # Fjern duplikater og returner
-    return list(set(image_urls))
-
 def get_embedding(text):
-    try:
-        resp = client.embeddings.create(
-            model="text-embedding-3-small",
-            input=text
-        )
-        return resp.data[0].embedding
-    except Exception as e:
-        print(f"Fejl ved embeddings: {e}")
-        return []
+    return embedder.embed_one(text)
+
+def get_embeddings(texts):
+    """Embeddings for flere tekster i ét kald (samme rækkefølge som texts)."""
+    return embedder.embed(texts)
 
 def save_category_files():
     """Gemmer separate JSON-filer for hver kategori, organiseret efter hovedkategori."""
-    # Organiser kategorier efter hovedkategori
-    backoffice_categories = {}
-    pos_categories = {}
-    webshop_categories = {}
-    
-    for category_name, cat_articles in category_articles.items():
-        if not cat_articles:  # Spring over tomme kategorier
-            continue
-        
-        main_cat = category_main_map.get(category_name, "backoffice")
-        
-        if main_cat == "pos":
-            pos_categories[category_name] = cat_articles
-        elif main_cat == "webshop":
-            webshop_categories[category_name] = cat_articles
-        else:
-            backoffice_categories[category_name] = cat_articles
-    
-    total_articles = 0
+    write_category_files(articles, category_main_map, write_combined)
+
+def save_progress():
+    """Kompakterer den aktuelle tilstand til JSON-filerne (kaldes når crawlet er færdigt)."""
+    save_category_files()
+
+def report_extraction(url, text, image_urls):
+    if not text:
+        print(f"   ⚠️ Kunne ikke ekstraktere tekst fra {url}")
+        return
+    print(f"   ✓ Tekst ekstraheret ({len(text)} tegn)")
+    if image_urls:
+        print(f"   🖼️  Fundet {len(image_urls)} billed(er)")
+
+def extract_article(html, url):
+    """Ekstraherer tekst og billeder fra en artikel-side (HTML'en parses én gang)."""
+    text, image_urls = extract_article_page(html, url, html_parser)
+    report_extraction(url, text, image_urls)
+    return text, image_urls
+
+def archive_page(url, html, kind, category_name):
+    """Gemmer den hentede side i HTML-arkivet, hvis det er slået til."""
+    if html_archive:
+        html_archive.add(url, html, kind, category_name, category_main_map.get(category_name))
+
+def checkpoint_mark(url, kind, status, category_name=None, key=None):
+    """Registrerer status for en URL i checkpointet, hvis det er slået til."""
+    if checkpoint:
+        checkpoint.mark(key or normalize_url(url), url, kind, status, category_name)
+
+def store_article(url, category_name, text, image_urls, embedding, chunks=None):
+    """Gemmer en færdig artikel i den globale tilstand.
+    
+    chunks er [(start, end, embedding)] for en artikel der er embedded i flere vinduer.
+    """
+    if not embedding:
+        print(f"   ⚠️ Embedding fejlede for {url}")
+        checkpoint_mark(url, "article", "failed", category_name)
+        return
     
-    # Gem Backoffice kategorier
-    if backoffice_categories:
-        backoffice_dir = "Cowis Backoffice/categories"
-        os.makedirs(backoffice_dir, exist_ok=True)
-        backoffice_total = 0
-        
-        for category_name, cat_articles in backoffice_categories.items():
-            filename = f"{backoffice_dir}/{category_name}.json"
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(cat_articles, f, ensure_ascii=False, indent=2)
-            print(f"[AUTO-SAVE] {len(cat_articles)} artikler gemt i {filename}")
-            backoffice_total += len(cat_articles)
-        
-        # Gem index for Backoffice
-        backoffice_index = {
-            "main_category": "backoffice",
-            "total_articles": backoffice_total,
-            "categories": {name: len(articles) for name, articles in backoffice_categories.items()}
-        }
-        with open(f"{backoffice_dir}/index.json", "w", encoding="utf-8") as f:
-            json.dump(backoffice_index, f, ensure_ascii=False, indent=2)
-        
-        total_articles += backoffice_total
-        print(f"[AUTO-SAVE] Totalt {backoffice_total} Backoffice artikler gemt i {len(backoffice_categories)} kategorier")
-    
-    # Gem POS kategorier
-    if pos_categories:
-        pos_dir = "Cowis POS/categories"
-        os.makedirs(pos_dir, exist_ok=True)
-        pos_total = 0
-        
-        for category_name, cat_articles in pos_categories.items():
-            filename = f"{pos_dir}/{category_name}.json"
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(cat_articles, f, ensure_ascii=False, indent=2)
-            print(f"[AUTO-SAVE] {len(cat_articles)} artikler gemt i {filename}")
-            pos_total += len(cat_articles)
-        
-        # Gem index for POS
-        pos_index = {
-            "main_category": "pos",
-            "total_articles": pos_total,
-            "categories": {name: len(articles) for name, articles in pos_categories.items()}
+    print(f"   ✓ Embedding oprettet")
+    # Sørg for at hovedkategorien er tracked (hvis den ikke allerede er det)
+    if category_name not in category_main_map:
+        category_main_map[category_name] = get_main_category(url)
+    
+    # Journalen skrives før checkpointet, så en artikel aldrig er "done" uden at være gemt
+    if journal or checkpoint:
+        article_data = {
+            "url": url,
+            "text": text,
+            "embedding": embedding,
+            "images": image_urls  # Tilføj billed-URLs
         }
-        with open(f"{pos_dir}/index.json", "w", encoding="utf-8") as f:
-            json.dump(pos_index, f, ensure_ascii=False, indent=2)
-        
-        total_articles += pos_total
-        print(f"[AUTO-SAVE] Totalt {pos_total} POS artikler gemt i {len(pos_categories)} kategorier")
-    
-    # Gem Webshop kategorier
-    if webshop_categories:
-        webshop_dir = "Cowis Webshop/categories"
-        os.makedirs(webshop_dir, exist_ok=True)
-        webshop_total = 0
-        
-        for category_name, cat_articles in webshop_categories.items():
-            filename = f"{webshop_dir}/{category_name}.json"
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(cat_articles, f, ensure_ascii=False, indent=2)
-            print(f"[AUTO-SAVE] {len(cat_articles)} artikler gemt i {filename}")
-            webshop_total += len(cat_articles)
+        if chunks:
+            article_data["chunks"] = [
+                {"start": start, "end": end, "embedding": chunk_embedding} for start, end, chunk_embedding in chunks
+            ]
+        if journal:
+            journal.append(category_name, category_main_map[category_name], article_data)
+        if checkpoint:
+            checkpoint.save_article(normalize_url(url), category_name, article_data)
+    
+    articles.add(url, category_name, text, image_urls, embedding, chunks)
+    
+    print(f"✅ Gemte artikel: {url}")
+
+def split_article(url, text):
+    """Artiklens chunks (se chunking.py); en kort artikel er ét chunk og en tom artikel ingen."""
+    chunks = chunk_text(text)
+    if not chunks:
+        print(f"   ⚠️ Ingen tekst at embedde for {url}")
+    elif len(chunks) > 1:
+        print(f"   ✂️  Opdelt i {len(chunks)} chunks ({sum(chunk.tokens for chunk in chunks)} tokens)")
+    return chunks
+
+def collect_chunk(url, category_name, text, image_urls, chunks, index, embedding):
+    """Modtager embeddingen for et chunk; artiklen gemmes når alle dens chunks er embedded.
+    
+    Artiklens vektor er det token-vægtede gennemsnit af chunk-vektorerne. En
+    artikel uden chunks (ingen tekst) har intet at embedde og markeres som fejlet.
+    """
+    if not chunks:
+        store_article(url, category_name, text, image_urls, None)
+        return
+    if len(chunks) == 1:
+        store_article(url, category_name, text, image_urls, embedding)
+        return
+    embeddings = pending_chunks.setdefault(url, [None] * len(chunks))
+    embeddings[index] = embedding or []
+    if any(chunk_embedding is None for chunk_embedding in embeddings):
+        return
+    del pending_chunks[url]
+    if not all(embeddings):
+        store_article(url, category_name, text, image_urls, None)
+        return
+    combined = combine_embeddings(embeddings, [chunk.tokens for chunk in chunks])
+    store_article(url, category_name, text, image_urls, combined.tolist(),
+                  [(chunk.start, chunk.end, chunk_embedding) for chunk, chunk_embedding in zip(chunks, embeddings)])
+
+def submit_embedding(url, category_name, text, image_urls):
+    """Lægger artiklens chunks i embedding-batchen; artiklen gemmes når alle embeddings er klar.
+
+    Chunks der allerede findes i embedding-cachen kræver intet API-kald.
+    """
+    chunks = split_article(url, text)
+    if not chunks:
+        collect_chunk(url, category_name, text, image_urls, chunks, 0, None)
+        return
+    for index, chunk in enumerate(chunks):
+        piece = text[chunk.start:chunk.end] if len(chunks) > 1 else text
+        cached = embedding_cache.get(piece) if embedding_cache else None
+        if cached:
+            print(f"   ✓ Embedding fundet i cache")
+            collect_chunk(url, category_name, text, image_urls, chunks, index, cached)
+            continue
         
-        # Gem index for Webshop
-        webshop_index = {
-            "main_category": "webshop",
-            "total_articles": webshop_total,
-            "categories": {name: len(articles) for name, articles in webshop_categories.items()}
-        }
-        with open(f"{webshop_dir}/index.json", "w", encoding="utf-8") as f:
-            json.dump(webshop_index, f, ensure_ascii=False, indent=2)
+        def on_done(embedding, index=index, piece=piece):
+            if embedding_cache and embedding:
+                embedding_cache.put(piece, embedding)
+            collect_chunk(url, category_name, text, image_urls, chunks, index, embedding)
         
-        total_articles += webshop_total
-        print(f"[AUTO-SAVE] Totalt {webshop_total} Webshop artikler gemt i {len(webshop_categories)} kategorier")
-    
-    # Gem også en samlet fil (valgfri, for bagudkompatibilitet)
-    with open("cowis_data_with_embeddings.json", "w", encoding="utf-8") as f:
-        json.dump(articles, f, ensure_ascii=False, indent=2)
-    
-    print(f"[AUTO-SAVE] ✅ Totalt {total_articles} artikler gemt i {len(category_articles)} kategorier")
-
-def save_progress():
-    """Kald save_category_files i stedet."""
-    save_category_files()
+        embedding_batcher.submit(piece, on_done)
 
 def scrape_article(url, category_name):
     """Scraper en enkelt artikel og gemmer den."""
@@ -490,49 +287,48 @@ def scrape_article(url, category_name):
     html = fetch_html(url)
     if not html:
         print(f"   ⚠️ Kunne ikke hente HTML fra {url}")
+        checkpoint_mark(url, "article", "failed", category_name)
         return
+    archive_page(url, html, "article", category_name)
     
-    text = extract_article_text(html)
+    text, image_urls = extract_article(html, url)
     if text:
-        print(f"   ✓ Tekst ekstraheret ({len(text)} tegn)")
-        
-        # Find billeder på siden
-        image_urls = extract_images(html, url)
-        if image_urls:
-            print(f"   🖼️  Fundet {len(image_urls)} billed(er)")
-        
-        embedding = get_embedding(text)
-        if embedding:
-            print(f"   ✓ Embedding oprettet")
-            article_data = {
-                "url": url,
-                "text": text,
-                "embedding": embedding,
-                "images": image_urls  # Tilføj billed-URLs
-            }
-            articles.append(article_data)
-            
-            # Tilføj til kategori
-            if category_name not in category_articles:
-                category_articles[category_name] = []
-            
-            # Sørg for at hovedkategorien er tracked (hvis den ikke allerede er det)
-            if category_name not in category_main_map:
-                category_main_map[category_name] = get_main_category(url)
-            
-            category_articles[category_name].append(article_data)
-            
-            print(f"✅ Gemte artikel: {url}")
-            
-            # Auto-save hver 5. artikel
-            if len(articles) % 5 == 0:
-                save_progress()
-        else:
-            print(f"   ⚠️ Embedding fejlede for {url}")
+        submit_embedding(url, category_name, text, image_urls)
     else:
-        print(f"   ⚠️ Kunne ikke ekstraktere tekst fra {url}")
+        checkpoint_mark(url, "article", "failed", category_name)
+
+def record_skipped_pagination(category_name, rejected_links):
+    """Tæller links til andre kategorier som den gamle heuristik ville have hentet som paginering."""
+    for link_normalized in rejected_links:
+        skipped_pagination.add((category_name, link_normalized))
+
+def print_pagination_summary():
+    print(f"\n🧭 Paginering: {len(skipped_pagination)} overflødige side-hentninger undgået "
+          f"(links til andre kategorier)")
+
+def register_category(category_url):
+    """Registrerer kategoriens navn og hovedkategori. Returnerer (category_name, main_category)."""
+    category_name = get_category_name(category_url)
+    main_category = get_main_category(category_url)
     
-    time.sleep(0.5)
+    # Gem hovedkategori-mapping
+    category_main_map[category_name] = main_category
+    if checkpoint:
+        checkpoint.save_category(category_name, main_category)
+    
+    articles.add_category(category_name)
+    return category_name, main_category
+
+def inventory_jobs(inventory):
+    """Artikel-jobs (url, category_name) fra et URL-inventar; kategorierne registreres uden at blive hentet."""
+    registered = {}
+    jobs = []
+    for entry in inventory["articles"]:
+        category_url = entry["category_url"]
+        if category_url not in registered:
+            registered[category_url] = register_category(category_url)[0]
+        jobs.append((entry["url"], registered[category_url]))
+    return jobs
 
 def scrape_category(category_url):
     """Scraper alle artikler fra en kategori-side (inkl. paginering)."""
@@ -541,72 +337,516 @@ def scrape_category(category_url):
         return
     
     visited_urls.add(normalized)
-    category_name = get_category_name(category_url)
-    main_category = get_main_category(category_url)
-    
-    # Gem hovedkategori-mapping
-    category_main_map[category_name] = main_category
-    
-    if category_name not in category_articles:
-        category_articles[category_name] = []
+    category_name, main_category = register_category(category_url)
     
     print(f"\n📁 Scraper kategori: {category_name} ({main_category.upper()})")
     print(f"   URL: {category_url}")
     
-    # Håndter paginering - scrape alle sider
-    pages_to_scrape = [category_url]
-    visited_pages = set()
-    
-    while pages_to_scrape:
-        page_url = pages_to_scrape.pop(0)
-        page_normalized = normalize_url(page_url)
-        
-        if page_normalized in visited_pages:
+    # Sider og artikler hentes fra en prioriteret frontier: artikler før dybere paginering
+    frontier = Frontier()
+    frontier.push(page_key(category_name, normalize_page_url(category_url)), ("page", category_url, category_name))
+    walk_category(frontier, category_name)
+
+    # Kategorien er først færdig når alle dens sider og artikler er behandlet. Artiklerne er
+    # ikke pending i checkpointet, så de sendes fra batchen og gemmes før kategorien er "done"
+    embedding_batcher.flush()
+    checkpoint_mark(category_url, "category", "done", category_name)
+
+def walk_category(frontier, category_name):
+    """Henter sider og artikler fra en kategoris frontier, indtil den er tom (seriel mode)."""
+    finished_pages = category_pages.get(category_name, set())
+    while frontier:
+        kind, page_url, _ = frontier.pop()
+        if kind == "article":
+            scrape_article(page_url, category_name)
+            continue
+        if normalize_page_url(page_url) in finished_pages:
             continue
         
-        visited_pages.add(page_normalized)
         print(f"\n   📄 Læser side: {page_url}")
         
         html = fetch_html(page_url)
         if not html:
             continue
+        archive_page(page_url, html, "page", category_name)
         
         # Find alle artikel-links på denne side
-        article_links = extract_article_links(html, BASE_URL)
+        article_links, pagination_links, rejected_links = extract_category_page(html, page_url, html_parser)
         print(f"   🔗 Fundet {len(article_links)} artikler på denne side")
         
-        # Scrape hver artikel
         for article_url in article_links:
-            scrape_article(article_url, category_name)
+            frontier.push(article_url, ("article", article_url, category_name))
         
-        # Tjek for paginering (find links til side 2, 3, osv.)
-        # Tjek for "Seite X von Y" og find links til næste sider
-        soup = BeautifulSoup(html, "html.parser")
+        # Paginering (side 2, 3, osv. i samme kategori)
+        for full_url, link_normalized in pagination_links:
+            frontier.push(page_key(category_name, link_normalized), ("page", full_url, category_name))
+        record_skipped_pagination(category_name, rejected_links)
+
+def resume_serial(resume_jobs):
+    """Fortsætter de jobs der stod i kø i checkpointet, uden async (se restore_checkpoint).
+
+    Sider samles i en frontier pr. kategori, så deres artikler og videre paginering hentes.
+    """
+    frontiers = {}
+    for kind, url, category_name in resume_jobs:
+        if kind == "article":
+            scrape_article(url, category_name)
+        elif kind == "page":
+            frontier = frontiers.setdefault(category_name, Frontier())
+            frontier.push(page_key(category_name, normalize_page_url(url)), ("page", url, category_name))
+        else:
+            scrape_category(url)
+    for category_name, frontier in frontiers.items():
+        walk_category(frontier, category_name)
+    embedding_batcher.flush()
+
+class HostLimiter:
+    """Begrænser antal samtidige forespørgsler pr. host (raten styres af transportens governor)."""
+    
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+        self._semaphores = {}
+    
+    @asynccontextmanager
+    async def slot(self, url):
+        host = urlparse(url).netloc
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.concurrency))
+        async with semaphore:
+            yield
+
+async def fetch_html_async(url, limiter):
+    """Henter HTML i en tråd, inden for host-begrænsningen."""
+    async with limiter.slot(url):
+        return await asyncio.to_thread(fetch_html, url)
+
+def page_key(category_name, page_normalized):
+    """Checkpoint-nøgle for en kategori-side (sider besøges pr. kategori)."""
+    return f"{category_name} {page_normalized}"
+
+def job_key(kind, url, category_name=None):
+    """Nøgle som et job dedupliker under i frontier og checkpoint."""
+    if kind == "page":
+        return page_key(category_name, normalize_page_url(url))
+    return normalize_url(url)
+
+def enqueue(frontier, kind, url, category_name=None):
+    """Lægger et job i den fælles frontier og registrerer det som pending i checkpointet.
+
+    En URL der allerede er i frontier tælles kun som et ekstra link (højere prioritet).
+    """
+    key = job_key(kind, url, category_name)
+    if frontier.add(key, (kind, url, category_name)) and checkpoint:
+        checkpoint.enqueue(key, url, kind, category_name)
+
+async def fetch_article_async(url, category_name, limiter):
+    """Henter en artikel der ikke er besøgt før. Returnerer HTML'en eller None."""
+    normalized = normalize_url(url)
+    if normalized in visited_urls:
+        return None
+    
+    visited_urls.add(normalized)
+    print(f"📄 Scraper artikel: {url}")
+    
+    html = await fetch_html_async(url, limiter)
+    if not html:
+        print(f"   ⚠️ Kunne ikke hente HTML fra {url}")
+        checkpoint_mark(url, "article", "failed", category_name)
+    return html
+
+async def fetch_category_page_async(page_url, category_name, limiter):
+    """Henter én side af en kategori, hvis den ikke er læst før. Returnerer HTML'en eller None."""
+    visited_pages = category_pages.setdefault(category_name, set())
+    page_normalized = normalize_page_url(page_url)
+    if page_normalized in visited_pages:
+        return None
+    
+    visited_pages.add(page_normalized)
+    print(f"\n   📄 Læser side: {page_url}")
+    
+    html = await fetch_html_async(page_url, limiter)
+    if not html:
+        checkpoint_mark(page_url, "page", "failed", category_name, key=page_key(category_name, page_normalized))
+    return html
+
+async def fetch_category_async(category_url, limiter):
+    """Registrerer en kategori og henter dens forside. Returnerer (kategori-navn, HTML) eller None."""
+    normalized = normalize_url(category_url)
+    if normalized in visited_urls:
+        return None
+    
+    visited_urls.add(normalized)
+    category_name, main_category = register_category(category_url)
+    
+    print(f"\n📁 Scraper kategori: {category_name} ({main_category.upper()})")
+    print(f"   URL: {category_url}")
+    
+    html = await fetch_category_page_async(category_url, category_name, limiter)
+    if not html:
+        return None
+    return category_name, html
+
+async def fetch_job(kind, url, category_name, limiter):
+    """Fetch-trinnet: henter HTML for et job. Returnerer (kind, url, category_name, html) eller None."""
+    if kind == "category":
+        fetched = await fetch_category_async(url, limiter)
+        if fetched is None:
+            return None
+        category_name, html = fetched
+    elif kind == "page":
+        html = await fetch_category_page_async(url, category_name, limiter)
+    else:
+        html = await fetch_article_async(url, category_name, limiter)
+    if not html:
+        return None
+    if html_archive:
+        await asyncio.to_thread(archive_page, url, html, "article" if kind == "article" else "page", category_name)
+    return kind, url, category_name, html
+
+async def run_extraction(func, html, url):
+    """Kører en ekstraktor i proces-poolen (eller direkte hvis den er slået fra)."""
+    if extract_pool is None:
+        return func(html, url, html_parser)
+    return await asyncio.get_running_loop().run_in_executor(extract_pool, func, html, url, html_parser)
+
+async def extract_job(kind, url, category_name, html, frontier, embed_queue):
+    """Extract-trinnet: artikler sendes videre til embedding, sidernes links lægges i frontier."""
+    if kind == "article":
+        text, image_urls = await run_extraction(extract_article_page, html, url)
+        report_extraction(url, text, image_urls)
+        if text:
+            await embed_queue.put((url, category_name, text, image_urls))
+        else:
+            checkpoint_mark(url, "article", "failed", category_name)
+        return
+    
+    article_links, pagination_links, rejected_links = await run_extraction(extract_category_page, html, url)
+    print(f"   🔗 Fundet {len(article_links)} artikler på denne side")
+    
+    for article_url in article_links:
+        enqueue(frontier, "article", article_url, category_name)
+    
+    # Alle kendte sider i kategorien lægges i kø på én gang, så de hentes parallelt
+    visited_pages = category_pages.setdefault(category_name, set())
+    for full_url, link_normalized in pagination_links:
+        if link_normalized not in visited_pages:
+            enqueue(frontier, "page", full_url, category_name)
+    record_skipped_pagination(category_name, rejected_links)
+    
+    # Siden er færdig når dens links ligger i (den persistente) frontier
+    checkpoint_mark(url, "page", "done", category_name, key=page_key(category_name, normalize_page_url(url)))
+    if kind == "category":
+        # Kategorien er færdig når forsidens artikler og sider ligger i frontier
+        checkpoint_mark(url, "category", "done", category_name)
+
+async def embed_job(url, category_name, text, image_urls, persist_queue):
+    """Embed-trinnet: slår hvert chunk op i embedding-cachen eller lægger det i batchen."""
+    chunks = split_article(url, text)
+    if not chunks:
+        # Intet at embedde - persist-trinnet markerer artiklen som fejlet
+        await persist_queue.put((url, category_name, text, image_urls, chunks, 0, "", None, False))
+        return
+    for index, chunk in enumerate(chunks):
+        piece = text[chunk.start:chunk.end] if len(chunks) > 1 else text
+        # Cache-opslaget er en SQLite-forespørgsel - den køres i en tråd, ikke i event-loopet
+        cached = await asyncio.to_thread(embedding_cache.get, piece) if embedding_cache else None
+        if cached:
+            print(f"   ✓ Embedding fundet i cache")
+            await persist_queue.put((url, category_name, text, image_urls, chunks, index, piece, cached, False))
+            continue
+        
+        # Bremser når der allerede er max_inflight batches undervejs
+        await embedding_batcher.wait_for_capacity()
         
-        # Find pagination links (oftest i samme kategori)
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
-            full_url = urljoin(BASE_URL, href)
-            link_normalized = normalize_url(full_url)
-            
-            # Hvis det er en link til samme kategori (samme base path)
-            if (link_normalized.startswith(BASE_URL.rstrip("/")) and 
-                "/category/" in link_normalized and
-                link_normalized not in visited_pages and
-                link_normalized not in pages_to_scrape):
-                # Tjek om det ser ud som en pagination link (har side nummer eller lignende)
-                text = a.get_text().strip()
-                if any(char.isdigit() for char in text) or "→" in text or "⇥" in text:
-                    pages_to_scrape.append(full_url)
+        def on_done(embedding, index=index, piece=piece):
+            return persist_queue.put((url, category_name, text, image_urls, chunks, index, piece, embedding, True))
         
-        time.sleep(0.5)
+        embedding_batcher.submit(piece, on_done)
 
-if __name__ == "__main__":
-    print(f"🚀 Starter scraping af {len(START_CATEGORIES)} kategorier...\n")
+def persist_job(url, category_name, text, image_urls, chunks, index, piece, embedding, fresh):
+    """Persist-trinnet: gemmer nye embeddings i cachen og artiklen i journal og checkpoint.
+
+    Kører i crawl_async's skrivetråd (blokerende SQLite-commits og journal-flush).
+    """
+    if fresh and embedding_cache and embedding:
+        embedding_cache.put(piece, embedding)
+    collect_chunk(url, category_name, text, image_urls, chunks, index, embedding)
+
+async def crawl_async(start_urls, concurrency=CONCURRENCY_PER_HOST, resume_jobs=(), extract_workers=EXTRACT_WORKERS,
+                      article_jobs=()):
+    """Crawler alle kategorier som en pipeline: fetch -> extract -> embed -> persist.
+    
+    article_jobs er (url, category_name) for artikler der allerede er kendt (URL-inventaret),
+    så de lægges direkte i kø.
+    Trinnene er forbundet med begrænsede køer, så et langsomt trin bremser de foregående
+    i stedet for at hobe HTML og tekster op i hukommelsen. Frontier-jobs regnes først som
+    færdige når deres side er ekstraheret, så frontier.join() venter på begge trin.
+    """
+    global embedding_batcher, extract_pool
+    embedding_batcher = AsyncEmbeddingBatcher(get_embeddings)
+    loop = asyncio.get_running_loop()
+    # Tråde til blokerende HTTP- og embedding-kald
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency * 2))
+    # Én skrivetråd til persist-trinnet: commits og flush blokerer ikke fetch-planlægningen,
+    # og artiklerne gemmes stadig én ad gangen i den rækkefølge de bliver færdige
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persist")
+    # Processer til CPU-tung HTML-parsing (spawn, så børnene ikke arver crawlerens tråde)
+    if extract_workers > 0:
+        extract_pool = ProcessPoolExecutor(max_workers=extract_workers, mp_context=multiprocessing.get_context("spawn"))
+    
+    limiter = HostLimiter(concurrency)
+    frontier = AsyncFrontier()
+    extract_queue = asyncio.Queue(maxsize=max(extract_workers, 1) * EXTRACT_QUEUE_PER_WORKER)
+    embed_queue = asyncio.Queue(maxsize=EMBED_QUEUE_SIZE)
+    persist_queue = asyncio.Queue(maxsize=PERSIST_QUEUE_SIZE)
+    
+    # Ved --resume fortsættes med de jobs der stod i kø da crawlen stoppede
+    for kind, url, category_name in resume_jobs:
+        frontier.add(job_key(kind, url, category_name), (kind, url, category_name))
+    for url in start_urls:
+        frontier.add(job_key("category", url), ("category", url, None))
+    for url, category_name in article_jobs:
+        enqueue(frontier, "article", url, category_name)
+    
+    async def fetch_worker():
+        while True:
+            kind, url, category_name = await frontier.get()
+            handed_off = False
+            try:
+                fetched = await fetch_job(kind, url, category_name, limiter)
+                if fetched:
+                    await extract_queue.put(fetched)
+                    handed_off = True
+            except Exception as e:
+                print(f"Fejl ved behandling af {url}: {e}")
+            finally:
+                # Sendt videre til extract: jobbet afsluttes først når siden er ekstraheret
+                if not handed_off:
+                    frontier.task_done()
+    
+    async def extract_worker():
+        while True:
+            kind, url, category_name, html = await extract_queue.get()
+            try:
+                await extract_job(kind, url, category_name, html, frontier, embed_queue)
+            except Exception as e:
+                print(f"Fejl ved ekstraktion af {url}: {e}")
+            finally:
+                extract_queue.task_done()
+                frontier.task_done()
+    
+    async def embed_worker():
+        while True:
+            url, category_name, text, image_urls = await embed_queue.get()
+            try:
+                await embed_job(url, category_name, text, image_urls, persist_queue)
+            except Exception as e:
+                print(f"Fejl ved embedding af {url}: {e}")
+            finally:
+                embed_queue.task_done()
+    
+    async def persist_worker():
+        while True:
+            job = await persist_queue.get()
+            try:
+                await loop.run_in_executor(writer, persist_job, *job)
+            except Exception as e:
+                print(f"Fejl ved gemning af {job[0]}: {e}")
+            finally:
+                persist_queue.task_done()
+    
+    workers = [asyncio.create_task(fetch_worker()) for _ in range(concurrency * 2)]
+    workers += [asyncio.create_task(extract_worker()) for _ in range(max(extract_workers, 1) * 2)]
+    workers += [asyncio.create_task(embed_worker()), asyncio.create_task(persist_worker())]
+    try:
+        await frontier.join()
+        await embed_queue.join()
+        await embedding_batcher.drain()
+        await persist_queue.join()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        writer.shutdown()
+        if extract_pool is not None:
+            extract_pool.shutdown()
+            extract_pool = None
+
+def reextract(archive, workers=EXTRACT_WORKERS):
+    """Kører alle arkiverede artikler gennem ekstraktorerne igen, parallelt og uden netværk.
+    
+    Embeddings hentes fra embedding-cachen; kun artikler hvis tekst er ændret sendes til API'et.
+    """
+    for url, kind, _, _, _ in archive.pages():
+        if kind != "article":
+            register_category(url)
+    # Kategorier der kun kendes fra deres artikler (fx en crawl med --from-inventory, hvor
+    # ingen kategori-sider arkiveres); artikel-URL'en siger intet om hovedkategorien
+    for category_name, main_category in archive.categories().items():
+        if category_name not in category_main_map:
+            category_main_map[category_name] = main_category
+            articles.add_category(category_name)
+    
+    jobs = archive.article_jobs(html_parser)
+    print(f"♻️  Re-ekstraherer {len(jobs)} arkiverede artikler med {workers} processer...")
+    if workers > 0:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(extract_archived_article, jobs, chunksize=16))
+    else:
+        results = [extract_archived_article(job) for job in jobs]
     
-    for cat_url in START_CATEGORIES:
-        scrape_category(cat_url)
-        time.sleep(1)  # Pause mellem kategorier
+    for url, category_name, text, image_urls in results:
+        visited_urls.add(normalize_url(url))
+        if text:
+            submit_embedding(url, category_name, text, image_urls)
+        else:
+            print(f"   ⚠️ Kunne ikke ekstraktere tekst fra {url}")
+
+def restore_checkpoint():
+    """Genindlæser tilstanden fra checkpointet og returnerer de jobs der stadig er pending."""
+    category_main_map.update(checkpoint.categories())
+    for category_name, article_data in checkpoint.articles():
+        articles.add(article_data["url"], category_name, article_data["text"],
+                     article_data.get("images", []), article_data["embedding"], article_chunks(article_data))
+    
+    for key, kind, category_name in checkpoint.finished():
+        if kind == "page":
+            category_pages.setdefault(category_name, set()).add(key.split(" ", 1)[1])
+        else:
+            visited_urls.add(key)
     
+    pending = checkpoint.pending()
+    print(f"♻️  Genoptager: {len(articles)} artikler gemt, {len(visited_urls)} URL'er færdige, "
+          f"{len(pending)} i kø")
+    return pending
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Crawler knowledge.cowis.net og gemmer artikler med embeddings.")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Crawl asynkront med mange samtidige forespørgsler")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY_PER_HOST,
+                        help=f"Maks. samtidige forespørgsler pr. host i async-mode (standard: {CONCURRENCY_PER_HOST})")
+    parser.add_argument("--min-rate", type=float, default=MIN_RATE,
+                        help=f"Laveste forespørgselsrate pr. host i req/s (standard: {MIN_RATE})")
+    parser.add_argument("--max-rate", type=float, default=MAX_RATE,
+                        help=f"Højeste forespørgselsrate pr. host i req/s (standard: {MAX_RATE})")
+    parser.add_argument("--extract-workers", type=int, default=EXTRACT_WORKERS,
+                        help=f"Processer til HTML-ekstraktion i async-mode, 0 = ingen pool (standard: {EXTRACT_WORKERS})")
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE,
+                        help=f"Antal genbrugte HTTP-forbindelser i connection pool (standard: {POOL_SIZE})")
+    parser.add_argument("--cache-file", default=CACHE_FILE,
+                        help=f"SQLite-fil til HTTP-cachen (standard: {CACHE_FILE})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Hent alle sider forfra uden conditional GET")
+    parser.add_argument("--parser", choices=PARSERS, default=DEFAULT_PARSER,
+                        help=f"HTML-parser til ekstraktion; lxml-fast er hurtigst (standard: {DEFAULT_PARSER})")
+    parser.add_argument("--embedding-cache-file", default=EMBEDDING_CACHE_FILE,
+                        help=f"SQLite-fil til embedding-cachen (standard: {EMBEDDING_CACHE_FILE})")
+    parser.add_argument("--no-embedding-cache", action="store_true",
+                        help="Embed alle artikler forfra")
+    parser.add_argument("--discover", action="store_true",
+                        help="Find alle artikel-URLs først (sitemap eller BFS over kategorier) og gem dem i URL-inventaret")
+    parser.add_argument("--from-inventory", action="store_true",
+                        help="Crawl artiklerne i det gemte URL-inventar uden at hente kategori-sider")
+    parser.add_argument("--inventory-file", default=INVENTORY_FILE,
+                        help=f"JSON-fil til URL-inventaret (standard: {INVENTORY_FILE})")
+    parser.add_argument("--archive-file", default=ARCHIVE_FILE,
+                        help=f"Komprimeret arkiv over alle hentede sider (standard: {ARCHIVE_FILE})")
+    parser.add_argument("--no-archive", action="store_true",
+                        help="Gem ikke de hentede sider i HTML-arkivet")
+    parser.add_argument("--reextract", action="store_true",
+                        help="Genopbyg artiklerne fra HTML-arkivet med de aktuelle ekstraktorer (intet netværk)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Fortsæt en afbrudt crawl fra checkpointet")
+    parser.add_argument("--checkpoint-file", default=CHECKPOINT_FILE,
+                        help=f"SQLite-fil til crawl-checkpoint (standard: {CHECKPOINT_FILE})")
+    parser.add_argument("--journal-dir", default=JOURNAL_DIR,
+                        help=f"Mappe til append-only artikel-journal (standard: {JOURNAL_DIR})")
+    parser.add_argument("--embedder", choices=sorted(PROVIDERS), default="openai",
+                        help="Embedding-backend: openai (API), local (sentence-transformers på CPU) "
+                             "eller hashing (ingen model, til tests) (standard: openai)")
+    parser.add_argument("--combined", action="store_true",
+                        help=f"Skriv også den samlede {COMBINED_FILE} (samme artikler som kategori-filerne)")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    write_combined = args.combined
+    governor = AimdGovernor(min_rate=args.min_rate, max_rate=args.max_rate)
+    transport = HttpTransport(pool_size=max(args.pool_size, args.concurrency), governor=governor)
+    html_parser = args.parser
+    try:
+        embedder = get_provider(args.embedder)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(f"🧠 Embeddings: {embedder.name} ({embedder.model}, {embedder.dimensions} dim.)")
+    if not args.no_embedding_cache:
+        embedding_cache = EmbeddingCache(embedder.model, embedder.dimensions, args.embedding_cache_file)
+    if not args.no_cache:
+        http_cache = HttpCache(args.cache_file)
+    
+    if args.reextract and args.no_archive:
+        raise SystemExit("--reextract kræver HTML-arkivet (brug ikke --no-archive)")
+    if not args.no_archive:
+        html_archive = HtmlArchive(args.archive_file)
+    journal = ArticleJournal(args.journal_dir)
+    started = time.perf_counter()
+    
+    if args.reextract:
+        # Intet netværk og intet checkpoint: artiklerne genopbygges fra arkivet
+        journal.reset()
+        embedding_batcher = EmbeddingBatcher(get_embeddings)
+        reextract(html_archive, args.extract_workers)
+        embedding_batcher.flush()
+    else:
+        checkpoint = CrawlCheckpoint(args.checkpoint_file)
+        resume_jobs = []
+        if args.resume:
+            resume_jobs = restore_checkpoint()
+        else:
+            checkpoint.reset()
+            journal.reset()
+        
+        start_categories = START_CATEGORIES
+        article_jobs = []
+        if args.discover or args.from_inventory:
+            # Artikel-URL'erne kendes på forhånd - ingen kategori-sider hentes under crawlet
+            if args.from_inventory:
+                inventory = load_inventory(args.inventory_file)
+                print(f"🗺️  URL-inventar fra {inventory['created']} ({inventory['source']}): "
+                      f"{len(inventory['articles'])} artikler")
+            else:
+                inventory = discover(fetch_html, START_CATEGORIES, get_category_name, parser=html_parser)
+                save_inventory(inventory, args.inventory_file)
+            article_jobs = inventory_jobs(inventory)
+            start_categories = []
+        
+        print(f"🚀 Starter scraping af {len(start_categories)} kategorier og {len(article_jobs)} kendte artikler...\n")
+        
+        if args.use_async:
+            asyncio.run(crawl_async(start_categories, args.concurrency, resume_jobs, args.extract_workers, article_jobs))
+        else:
+            embedding_batcher = EmbeddingBatcher(get_embeddings)
+            resume_serial(resume_jobs)
+            for cat_url in start_categories:
+                scrape_category(cat_url)
+            for url, category_name in article_jobs:
+                scrape_article(url, category_name)
+            embedding_batcher.flush()
+    
+    journal.close()
+    embedder.close()
     save_progress()
-    print(f"\n✅ Færdig! Gemte i alt {len(articles)} artikler i {len(category_articles)} kategorier.")
+    transport.print_summary()
+    transport.governor.print_summary()
+    print_pagination_summary()
+    embedding_batcher.print_summary()
+    if embedding_cache:
+        embedding_cache.print_summary()
+        embedding_cache.close()
+    if http_cache:
+        http_cache.print_summary()
+    if html_archive:
+        html_archive.print_summary()
+        html_archive.close()
+    print(f"\n✅ Færdig! Gemte i alt {len(articles)} artikler i {len(articles.categories)} kategorier.")
+    print(f"⏱️  Samlet tid: {time.perf_counter() - started:.1f} sek.")
@@ -0,0 +1,565 @@
+"""
+Ekstraktion af tekst, billeder og links fra sider på knowledge.cowis.net.
+
+ParsedPage parser HTML'en én gang og beregner alle udtræk fra det samme træ,
+så en artikel- eller kategoriside ikke parses flere gange.
+
+Parseren vælges med parse_page(..., parser=...):
+  - "html.parser": BeautifulSoup med Pythons egen parser (reference)
+  - "lxml":        BeautifulSoup med lxml som parser
+  - "lxml-fast":   udtræk direkte på et lxml-træ uden BeautifulSoup
+"""
+
+import html as html_lib
+import re
+
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml import etree
+from urllib.parse import parse_qsl, urlencode, urljoin, unquote, urlparse, urlunparse
+
+BASE_URL = "https://knowledge.cowis.net/"
+
+PARSERS = ["html.parser", "lxml", "lxml-fast"]
+DEFAULT_PARSER = "html.parser"
+
+# Billeder hvis URL indeholder et af disse ord er ikoner/logoer og springes over
+EXCLUDED_IMAGE_PARTS = ["icon", "logo", "arrow", "spacer", "pixel.gif", "1x1", "blank.gif"]
+
+def normalize_url(url):
+    """Fjerner irrelevante query params og normaliserer URL'en."""
+    url = unquote(url)
+    parsed = urlparse(url)
+    clean_path = parsed.path.strip("/")
+    # Drop query params helt for at undgå loops
+    normalized = urlunparse((parsed.scheme, parsed.netloc, clean_path, "", "", ""))
+    return normalized.lower()
+
+# Query-parametre der angiver sidetal; de bevares når en kategori-side normaliseres
+PAGE_QUERY_PARAMS = {"page", "seite", "p", "start", "offset"}
+
+# "Seite 2 von 5" i sidefoden på paginerede kategori-sider (tags mellem ordene tillades)
+_TAGS = r"\s*(?:<[^>]*>\s*)*"
+PAGE_INFO_PATTERN = re.compile(rf"(?:Seite|Page){_TAGS}(\d+){_TAGS}(?:von|of){_TAGS}(\d+)", re.IGNORECASE)
+
+_CATEGORY_ID = re.compile(r"/category/(\d+)/")
+
+def normalize_page_url(url):
+    """Som normalize_url, men sidetals-parametre (fx ?page=2) bevares, så siderne kan skelnes."""
+    params = [(k, v) for k, v in parse_qsl(urlparse(url).query) if k.lower() in PAGE_QUERY_PARAMS]
+    normalized = normalize_url(url)
+    return f"{normalized}?{urlencode(params).lower()}" if params else normalized
+
+def category_id(url):
+    """Kategori-ID'et i en /category/<id>/-URL, eller None."""
+    match = _CATEGORY_ID.search(url)
+    return match.group(1) if match else None
+
+def page_info(html):
+    """(aktuel side, antal sider) fra "Seite X von Y", eller None."""
+    match = PAGE_INFO_PATTERN.search(html or "")
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+def _page_url_template(links):
+    """Skabelon ("...?page={}") udledt af et link hvis tekst er sidetallet i dets URL."""
+    for full_url, _, text in links:
+        if not text.isdigit() or int(text) < 2:
+            continue
+        escaped = full_url.replace("{", "{{").replace("}", "}}")
+        # Kategori-ID'et i stien er aldrig sidetallet (kategori 2 har også en side 2)
+        category = _CATEGORY_ID.search(escaped)
+        matches = [match for match in re.finditer(rf"(?<!\d){text}(?!\d)", escaped)
+                   if not category or match.start() >= category.end()]
+        if matches:
+            last = matches[-1]
+            return escaped[:last.start()] + "{}" + escaped[last.end():]
+    return None
+
+def select_pagination_links(page_url, html, candidates):
+    """Vælger de ægte paginerings-links blandt kandidaterne (url, linktekst).
+
+    Et link tæller kun hvis det peger på samme kategori-ID som siden selv; links
+    til andre kategorier (fx "3. Artikel" i sidemenuen) returneres som afviste.
+    Står der "Seite X von Y" på siden, og kan URL-mønstret udledes af et af
+    sidetals-linksene, beregnes alle sidernes URLs med det samme.
+    Returnerer (links som (url, normaliseret url), afviste normaliserede URLs).
+    """
+    own_id = category_id(normalize_url(page_url)) if page_url else None
+    own_page = normalize_page_url(page_url) if own_id is not None else None
+    links = []
+    rejected = []
+    for full_url, text in candidates:
+        normalized = normalize_page_url(full_url)
+        if normalized == own_page:
+            continue
+        if own_id is not None and category_id(normalized) != own_id:
+            rejected.append(normalized)
+            continue
+        links.append((full_url, normalized, text))
+
+    info = page_info(html) if own_id is not None else None
+    template = _page_url_template(links) if info else None
+    if template:
+        current, total = info
+        # Side 1 er kategoriens egen URL; beregnede URLs skal stadig ligge i samme kategori
+        generated = ((template.format(n), str(n)) for n in range(2, total + 1) if n != current)
+        links.extend((full_url, normalize_page_url(full_url), text) for full_url, text in generated
+                     if category_id(normalize_url(full_url)) == own_id)
+
+    unique = {}
+    for full_url, normalized, _ in links:
+        unique.setdefault(normalized, full_url)
+    return [(full_url, normalized) for normalized, full_url in unique.items()], rejected
+
+def _is_content_class(x):
+    return x and ("content" in str(x).lower() or "article" in str(x).lower()) if x else False
+
+def _is_nav_class(x):
+    return x and ("nav" in str(x).lower() or "menu" in str(x).lower()) if x else False
+
+def is_pagination_text(text):
+    """Linktekster der ligner paginering (har side nummer eller pil)."""
+    return any(char.isdigit() for char in text) or "→" in text or "⇥" in text
+
+def is_content_image(src, width, height):
+    """Frasorterer ikoner, logoer og små billeder."""
+    # Filtrer væk tydelige ikoner/logoer baseret på URL path
+    src_lower = src.lower()
+    if any(excluded in src_lower for excluded in EXCLUDED_IMAGE_PARTS):
+        return False
+
+    # Hvis størrelse er angivet, tjek at det ikke er et lille ikon
+    if width and width.isdigit():
+        if int(width) < 50:
+            return False
+    if height and height.isdigit():
+        if int(height) < 50:
+            return False
+    return True
+
+def _unescape_attr(value):
+    """Pythons html.parser afkoder også entities uden semikolon (fx "&uuml" i Cowis-URLs), det gør lxml ikke."""
+    return html_lib.unescape(value) if value and "&" in value else value
+
+def resolve_image_url(src, article_url):
+    """Konverterer en img src til en absolut URL."""
+    # Hvis src starter med / eller images/, brug BASE_URL som base
+    # Dette sikrer at /images/... bliver til https://knowledge.cowis.net/images/...
+    # og ikke https://knowledge.cowis.net/content/XX/XX/de/images/...
+    if src.startswith('http://') or src.startswith('https://'):
+        # Allerede en absolut URL
+        return src
+    if src.startswith('/'):
+        # Absolut path fra websitet root (fx /images/...)
+        return urljoin(BASE_URL, src)
+    if src.startswith('images/'):
+        # Starter med images/ - skal være /images/ fra root
+        return urljoin(BASE_URL, '/' + src)
+    if '/images/' in src:
+        # Indeholder /images/ et sted - brug BASE_URL for at sikre korrekt path
+        return urljoin(BASE_URL, '/' + src.lstrip('/'))
+    # Relativt til artiklen - brug article_url som base
+    return urljoin(article_url, src)
+
+class ParsedPage:
+    """En side parset én gang; tekst, billeder og links udledes fra samme træ."""
+
+    def __init__(self, html, url="", base_url=BASE_URL, parser=DEFAULT_PARSER):
+        self.url = url
+        self.base_url = base_url
+        self.html = html
+        self.soup = BeautifulSoup(html, parser) if html else None
+        # Attributter skal afkodes som html.parser gør det, uanset parser
+        self._attr = (lambda value: value) if parser == "html.parser" else _unescape_attr
+        self._content_area = None
+        self._images = None
+        self._article_links = None
+        self._pagination_links = None
+        self._rejected_pagination_links = None
+        self._text = None
+
+    @property
+    def content_area(self):
+        """Artikelindholdet (h2's container, content-div eller wrapper) - ellers hele siden."""
+        if self._content_area is None and self.soup is not None:
+            content_area = None
+            h2 = self.soup.find("h2")
+            if h2:
+                content_area = h2.find_parent(["div", "main", "article", "section"])
+            if not content_area:
+                content_area = self.soup.find("div", class_=_is_content_class)
+            if not content_area:
+                content_area = self.soup.find("div", {"id": "wrapper"})
+            self._content_area = content_area if content_area else self.soup
+        return self._content_area
+
+    @property
+    def images(self):
+        """Alle indholdsbilleder som absolutte URLs."""
+        if self._images is None:
+            self._images = self._extract_images() if self.soup is not None else []
+        return self._images
+
+    @property
+    def article_links(self):
+        """Normaliserede links til artikler (/content/) på samme domain, i dokumentrækkefølge uden dubletter."""
+        if self._article_links is None:
+            self._links()
+        return self._article_links
+
+    @property
+    def pagination_links(self):
+        """Kategoriens øvrige sider som (url, normaliseret url), se select_pagination_links."""
+        if self._pagination_links is None:
+            self._links()
+        return self._pagination_links
+
+    @property
+    def rejected_pagination_links(self):
+        """Links med sidetals-tekst der peger på andre kategorier (normaliserede URLs)."""
+        if self._rejected_pagination_links is None:
+            self._links()
+        return self._rejected_pagination_links
+
+    @property
+    def text(self):
+        """Artikelteksten. Fjerner navigation m.m. fra træet, så øvrige udtræk beregnes først."""
+        if self._text is None:
+            if self.soup is None:
+                self._text = ""
+            else:
+                self.images
+                self._links()
+                self._text = self._extract_text()
+        return self._text
+
+    def _links(self):
+        if self._article_links is not None:
+            return
+        article_links = {}  # dict bevarer rækkefølgen i dokumentet
+        pagination_candidates = []
+        domain = BASE_URL.rstrip("/")
+        anchors = self.soup.find_all("a", href=True) if self.soup is not None else []
+
+        for a in anchors:
+            full_url = urljoin(self.base_url, self._attr(a["href"]))
+            normalized = normalize_url(full_url)
+            if not normalized.startswith(domain):
+                continue
+
+            # Kun artikel-links fra samme domain
+            if "/content/" in normalized:
+                article_links[normalized] = None
+
+            # Tjek om det ser ud som en pagination link (har side nummer eller lignende)
+            text = a.get_text().strip()
+            if "/category/" in normalized and is_pagination_text(text):
+                pagination_candidates.append((full_url, text))
+
+        self._article_links = list(article_links)
+        self._pagination_links, self._rejected_pagination_links = select_pagination_links(
+            self.url, self.html, pagination_candidates
+        )
+
+    def _extract_images(self):
+        image_urls = []
+
+        for img in self.content_area.find_all("img"):
+            src = self._attr(img.get("src") or img.get("data-src"))  # data-src for lazy-loaded images
+            if not src:
+                continue
+
+            if not is_content_image(src, img.get("width", ""), img.get("height", "")):
+                continue
+
+            # Tjek at det ikke er i navigation/header/footer
+            parent = img.find_parent(["nav", "header", "footer", "aside"])
+            if parent:
+                continue
+
+            # Hvis vi når hertil, er det sandsynligvis et indholdsbillede
+            image_urls.append(resolve_image_url(src, self.url))
+
+        # Fjern duplikater og returner
+        return list(set(image_urls))
+
+    def _extract_text(self):
+        soup = self.soup
+
+        # Fjern scripts, styles, navigation og footer elementer
+        for element in soup(["script", "style", "nav", "footer", "header"]):
+            element.decompose()
+
+        # Prøv flere strategier for at finde artikelindhold
+        # 1. Find h2 med artikel-titel og tag parent content area
+        h2 = soup.find("h2")
+        if h2:
+            # Find det nærmeste content container
+            content_parent = h2.find_parent(["div", "main", "article", "section"])
+            if content_parent:
+                # Fjern eventuelle nested navigation/links sections
+                for nav in content_parent.find_all(["nav", "ul"], class_=_is_nav_class):
+                    nav.decompose()
+                text = content_parent.get_text(separator="\n", strip=True)
+                if len(text) > 100:  # Tjek at vi har nok indhold
+                    return text
+
+        # 2. Fallback: Find div med "content" i class eller id
+        content_div = soup.find("div", class_=_is_content_class)
+        if content_div:
+            text = content_div.get_text(separator="\n", strip=True)
+            if len(text) > 100:
+                return text
+
+        # 3. Fallback: Find wrapper og filtrer bedre
+        wrapper = soup.find("div", {"id": "wrapper"})
+        if wrapper:
+            # Fjern navigation, footer og lignende
+            for element in wrapper.find_all(["nav", "footer", "header", "aside"]):
+                element.decompose()
+            text = wrapper.get_text(separator="\n", strip=True)
+            # Filtrer væk for kort tekst (sandsynligvis ikke artikelindhold)
+            if len(text) > 100:
+                return text
+
+        # 4. Sidste resort: Find main element
+        main = soup.find("main")
+        if main:
+            text = main.get_text(separator="\n", strip=True)
+            if len(text) > 100:
+                return text
+
+        return ""
+
+# Tags hvis tekst BeautifulSoup ikke medtager i get_text()
+_STRING_CONTAINERS = {"script", "style", "template", "rt", "rp"}
+
+_LXML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+def _lxml_strings(root, skip=()):
+    """Tekststrenge under root i dokumentrækkefølge, som BeautifulSoup's get_text().
+
+    Elementer i skip behandles som fjernede: deres indhold springes over, men
+    teksten efter dem (tail) medtages.
+    """
+    if root.tag in _STRING_CONTAINERS:
+        return
+    if root.text:
+        yield root.text
+    stack = [(root, iter(root))]
+    while stack:
+        parent, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if parent is not root and parent.tail:
+                yield parent.tail
+            continue
+        # Kommentarer og processing instructions har ikke en streng som tag
+        if isinstance(child.tag, str) and child not in skip and child.tag not in _STRING_CONTAINERS:
+            if child.text:
+                yield child.text
+            stack.append((child, iter(child)))
+        elif child.tail:
+            yield child.tail
+
+def _lxml_text(root, skip=()):
+    """Svarer til get_text(separator="\n", strip=True)."""
+    return "\n".join(s.strip() for s in _lxml_strings(root, skip) if s.strip())
+
+def _lxml_removed(el, removed):
+    return el in removed or any(ancestor in removed for ancestor in el.iterancestors())
+
+def _lxml_first(elements, removed=()):
+    """Første element der ikke ligger i et fjernet element."""
+    for el in elements:
+        if not removed or not _lxml_removed(el, removed):
+            return el
+    return None
+
+def _lxml_content_divs(root):
+    return (div for div in root.iter("div") if _is_content_class(div.get("class")))
+
+def _lxml_wrappers(root):
+    return (div for div in root.iter("div") if div.get("id") == "wrapper")
+
+class LxmlParsedPage:
+    """Samme udtræk som ParsedPage, men direkte på et lxml-træ (hurtig sti).
+
+    Træet ændres ikke: elementer som ParsedPage fjerner med decompose() samles
+    i et sæt og springes over, når teksten opsamles.
+    """
+
+    def __init__(self, html, url="", base_url=BASE_URL):
+        self.url = url
+        self.base_url = base_url
+        self.html = html
+        self.root = None
+        if html:
+            try:
+                self.root = lxml.html.document_fromstring(html.encode("utf-8"), parser=_LXML_PARSER)
+            except (etree.ParserError, ValueError):
+                self.root = None
+        self._content_area = None
+        self._images = None
+        self._article_links = None
+        self._pagination_links = None
+        self._rejected_pagination_links = None
+        self._text = None
+
+    @property
+    def content_area(self):
+        if self._content_area is None and self.root is not None:
+            content_area = None
+            h2 = next(self.root.iter("h2"), None)
+            if h2 is not None:
+                content_area = next(h2.iterancestors("div", "main", "article", "section"), None)
+            if content_area is None:
+                content_area = _lxml_first(_lxml_content_divs(self.root))
+            if content_area is None:
+                content_area = _lxml_first(_lxml_wrappers(self.root))
+            self._content_area = content_area if content_area is not None else self.root
+        return self._content_area
+
+    @property
+    def images(self):
+        if self._images is None:
+            self._images = self._extract_images() if self.root is not None else []
+        return self._images
+
+    @property
+    def article_links(self):
+        if self._article_links is None:
+            self._links()
+        return self._article_links
+
+    @property
+    def pagination_links(self):
+        if self._pagination_links is None:
+            self._links()
+        return self._pagination_links
+
+    @property
+    def rejected_pagination_links(self):
+        if self._rejected_pagination_links is None:
+            self._links()
+        return self._rejected_pagination_links
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = self._extract_text() if self.root is not None else ""
+        return self._text
+
+    def _links(self):
+        article_links = {}  # dict bevarer rækkefølgen i dokumentet
+        pagination_candidates = []
+        domain = BASE_URL.rstrip("/")
+        anchors = self.root.iter("a") if self.root is not None else []
+
+        for a in anchors:
+            href = a.get("href")
+            if href is None:
+                continue
+            full_url = urljoin(self.base_url, _unescape_attr(href))
+            normalized = normalize_url(full_url)
+            if not normalized.startswith(domain):
+                continue
+            if "/content/" in normalized:
+                article_links[normalized] = None
+            if "/category/" in normalized:
+                text = "".join(_lxml_strings(a)).strip()
+                if is_pagination_text(text):
+                    pagination_candidates.append((full_url, text))
+
+        self._article_links = list(article_links)
+        self._pagination_links, self._rejected_pagination_links = select_pagination_links(
+            self.url, self.html, pagination_candidates
+        )
+
+    def _extract_images(self):
+        image_urls = []
+        for img in self.content_area.iterdescendants("img"):
+            src = _unescape_attr(img.get("src") or img.get("data-src"))
+            if not src:
+                continue
+            if not is_content_image(src, img.get("width", ""), img.get("height", "")):
+                continue
+            if next(img.iterancestors("nav", "header", "footer", "aside"), None) is not None:
+                continue
+            image_urls.append(resolve_image_url(src, self.url))
+        return list(set(image_urls))
+
+    def _extract_text(self):
+        # Samme strategier som ParsedPage._extract_text
+        root = self.root
+        removed = set(root.iter("script", "style", "nav", "footer", "header"))
+
+        h2 = _lxml_first(root.iter("h2"), removed)
+        if h2 is not None:
+            content_parent = next(h2.iterancestors("div", "main", "article", "section"), None)
+            if content_parent is not None:
+                for nav in content_parent.iterdescendants("nav", "ul"):
+                    if _is_nav_class(nav.get("class")):
+                        removed.add(nav)
+                text = _lxml_text(content_parent, removed)
+                if len(text) > 100:
+                    return text
+
+        content_div = _lxml_first(_lxml_content_divs(root), removed)
+        if content_div is not None:
+            text = _lxml_text(content_div, removed)
+            if len(text) > 100:
+                return text
+
+        wrapper = _lxml_first(_lxml_wrappers(root), removed)
+        if wrapper is not None:
+            removed.update(wrapper.iterdescendants("nav", "footer", "header", "aside"))
+            text = _lxml_text(wrapper, removed)
+            if len(text) > 100:
+                return text
+
+        main = _lxml_first(root.iter("main"), removed)
+        if main is not None:
+            text = _lxml_text(main, removed)
+            if len(text) > 100:
+                return text
+
+        return ""
+
+def parse_page(html, url="", base_url=BASE_URL, parser=DEFAULT_PARSER):
+    """Parser en side med den valgte parser (se PARSERS)."""
+    if parser == "lxml-fast":
+        return LxmlParsedPage(html, url, base_url)
+    return ParsedPage(html, url, base_url, parser)
+
+def extract_article_page(html, url, parser=DEFAULT_PARSER):
+    """(tekst, billeder) fra en artikel-side som et kompakt resultat, fx fra en proces-pool."""
+    page = parse_page(html, url, parser=parser)
+    text = page.text
+    return (text, page.images) if text else ("", [])
+
+def extract_category_page(html, url, parser=DEFAULT_PARSER):
+    """(artikel-links, paginerings-links, afviste paginerings-links) fra en kategori-side."""
+    page = parse_page(html, url, parser=parser)
+    return page.article_links, page.pagination_links, page.rejected_pagination_links
+
+def extract_article_links(html, base_url=BASE_URL):
+    """Ekstraherer kun artikel-links fra en kategori-side."""
+    return ParsedPage(html, base_url=base_url).article_links
+
+def extract_pagination_links(html):
+    """Finder paginerings-links på en kategori-side som (url, normaliseret url)."""
+    return ParsedPage(html).pagination_links
+
+def extract_article_text(html):
+    """Ekstraherer artikeltekst fra HTML."""
+    if not html:
+        return ""
+    return ParsedPage(html).text
+
+def extract_images(html, article_url):
+    """Ekstraherer alle billed-URLs fra en artikel-side."""
+    if not html:
+        return []
+    return ParsedPage(html, article_url).images
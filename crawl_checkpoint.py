@@ -0,0 +1,119 @@
+"""
+Holdbart checkpoint af crawl-tilstanden, så en afbrudt crawl kan genoptages med --resume.
+
+Gemmer frontier, status pr. URL (pending/done/failed), kategori-mapping og de
+gemte artikler (inkl. embeddings) i en SQLite-fil i WAL-mode.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+CHECKPOINT_FILE = "crawl_checkpoint.sqlite"
+
+
+class CrawlCheckpoint:
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                category_name TEXT,
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS categories (
+                category_name TEXT PRIMARY KEY,
+                main_category TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS articles (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT UNIQUE NOT NULL,
+                category_name TEXT NOT NULL,
+                payload TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Starter forfra (bruges når der ikke køres med --resume)."""
+        with self._lock:
+            self._conn.executescript("DELETE FROM frontier; DELETE FROM categories; DELETE FROM articles;")
+            self._conn.commit()
+
+    def enqueue(self, key, url, kind, category_name=None):
+        """Registrerer en URL i frontier, medmindre den allerede er kendt."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO frontier (key, url, kind, category_name, status, updated_at) "
+                "VALUES (?, ?, ?, ?, 'pending', ?)",
+                (key, url, kind, category_name, time.time()),
+            )
+            self._conn.commit()
+
+    def mark(self, key, url, kind, status, category_name=None):
+        """Sætter status for en URL (pending/done/failed)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO frontier (key, url, kind, category_name, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, kind, category_name, status, time.time()),
+            )
+            self._conn.commit()
+
+    def save_category(self, category_name, main_category):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO categories (category_name, main_category) VALUES (?, ?)",
+                (category_name, main_category),
+            )
+            self._conn.commit()
+
+    def save_article(self, key, category_name, article_data):
+        """Gemmer en færdig artikel og markerer dens URL som done i samme transaktion."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO articles (key, category_name, payload) VALUES (?, ?, ?)",
+                (key, category_name, json.dumps(article_data, ensure_ascii=False)),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO frontier (key, url, kind, category_name, status, updated_at) "
+                "VALUES (?, ?, 'article', ?, 'done', ?)",
+                (key, article_data["url"], category_name, time.time()),
+            )
+            self._conn.commit()
+
+    def finished(self):
+        """URL'er der er færdigbehandlet (done eller failed) som (key, kind, category_name)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT key, kind, category_name FROM frontier WHERE status != 'pending'"
+            ).fetchall()
+
+    def pending(self):
+        """Frontier-poster der endnu ikke er behandlet, som (kind, url, category_name)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT kind, url, category_name FROM frontier WHERE status = 'pending' ORDER BY updated_at"
+            ).fetchall()
+
+    def categories(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT category_name, main_category FROM categories").fetchall())
+
+    def articles(self):
+        """Gemte artikler i den rækkefølge de blev gemt, som (category_name, article_data)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT category_name, payload FROM articles ORDER BY seq").fetchall()
+        return [(category_name, json.loads(payload)) for category_name, payload in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
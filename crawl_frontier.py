@@ -0,0 +1,125 @@
+"""
+Prioriteret crawl-frontier med dedup.
+
+Jobs hentes i prioritetsorden:
+  1. kategori-forsider
+  2. artikler - flest interne links først (linkgrafen opdateres undervejs)
+  3. paginerings-sider
+Inden for samme prioritet hentes jobs i den rækkefølge de blev fundet.
+
+Dedup og link-tælling er O(1) opslag i dicts; køen er en heap (O(log n)).
+Når en ventende URL får flere links, lægges den ind igen med ny prioritet,
+og den forældede post springes over ved udtagning.
+"""
+
+import asyncio
+import heapq
+import itertools
+
+# Prioritet pr. jobtype (lavere hentes først)
+KIND_PRIORITY = {"category": 0, "article": 1, "page": 2}
+
+
+class Frontier:
+    def __init__(self):
+        self._heap = []
+        self._pending = {}  # key -> (heap-post, job)
+        self._seen = set()
+        self._inlinks = {}
+        self._order = itertools.count()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __contains__(self, key):
+        return key in self._seen
+
+    def inlinks(self, key):
+        """Antal gange en URL er linket fra sider crawleren har læst."""
+        return self._inlinks.get(key, 0)
+
+    def link(self, key):
+        """Registrerer et link til en kendt URL; er den stadig i kø, rykker den frem."""
+        self._inlinks[key] = self._inlinks.get(key, 0) + 1
+        if key in self._pending:
+            entry, job = self._pending[key]
+            self._push(key, job, entry[2])  # behold rækkefølgen fra første gang
+
+    def push(self, key, job):
+        """Lægger job (kind, url, category_name) i kø under key. Returnerer False hvis key allerede er set."""
+        if key in self._seen:
+            self.link(key)
+            return False
+        self._seen.add(key)
+        self._inlinks[key] = self._inlinks.get(key, 0) + 1
+        self._push(key, job, next(self._order))
+        return True
+
+    def _push(self, key, job, order):
+        kind = job[0]
+        entry = [KIND_PRIORITY.get(kind, len(KIND_PRIORITY)), -self._inlinks[key], order, key]
+        self._pending[key] = (entry, job)
+        heapq.heappush(self._heap, entry)
+
+    def pop(self):
+        """Næste job efter prioritet. IndexError hvis køen er tom."""
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            key = entry[3]
+            pending = self._pending.get(key)
+            if pending is not None and pending[0] is entry:
+                del self._pending[key]
+                return pending[1]
+        raise IndexError("pop from empty frontier")
+
+
+class AsyncFrontier:
+    """Frontier med samme get/task_done/join-interface som asyncio.Queue.
+
+    Bygget på asyncio's offentlige primitiver (ikke Queue's interne hooks): en semafor
+    tæller ventende jobs, og en Event signalerer når alle jobs er afsluttet. Links kan
+    stadig rykke ventende jobs frem, hvilket en asyncio.PriorityQueue ikke tillader.
+    Brug add() til at lægge jobs i kø, så allerede kendte URL'er kun tælles som link.
+    """
+
+    def __init__(self):
+        self._frontier = Frontier()
+        self._available = asyncio.Semaphore(0)
+        self._unfinished = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+    def __len__(self):
+        return len(self._frontier)
+
+    def qsize(self):
+        return len(self._frontier)
+
+    def empty(self):
+        return not len(self._frontier)
+
+    def add(self, key, job):
+        """Lægger job i kø hvis key er ny. Returnerer True hvis jobbet blev lagt i kø."""
+        if not self._frontier.push(key, job):
+            return False
+        self._unfinished += 1
+        self._finished.clear()
+        self._available.release()
+        return True
+
+    async def get(self):
+        """Næste job efter prioritet; venter hvis køen er tom."""
+        await self._available.acquire()
+        return self._frontier.pop()
+
+    def task_done(self):
+        """Markerer et job fra get() som afsluttet."""
+        if self._unfinished <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._finished.set()
+
+    async def join(self):
+        """Venter til alle jobs der er lagt i kø, er afsluttet."""
+        await self._finished.wait()
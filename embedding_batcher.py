@@ -0,0 +1,135 @@
+"""
+Batching af embedding-kald.
+
+Tekster samles i batches begrænset af antal og samlet antal tokens, og hver
+batch sendes som ét kald til embeddings-endpointet. Resultatet leveres til
+en callback pr. tekst, så crawleren kan gemme artiklen når embeddingen er klar.
+Fejler et kald, får hver tekst i batchen en tom embedding ([]).
+"""
+
+import asyncio
+import inspect
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken er valgfri - uden den estimeres tokens ud fra tegn
+    tiktoken = None
+
+MAX_BATCH_ITEMS = 256
+# Embeddings-endpointet tillader højst 300.000 tokens pr. kald
+MAX_BATCH_TOKENS = 250_000
+# Hvor længe (sek.) en ufuld batch venter på flere tekster i async-mode
+BATCH_LINGER = 0.5
+# Maks. samtidige embedding-kald i async-mode
+MAX_INFLIGHT_BATCHES = 4
+
+_encoding = None
+
+def count_tokens(text):
+    """Antal tokens i text (cl100k_base), eller et estimat hvis tiktoken ikke er installeret."""
+    global _encoding
+    if tiktoken is None:
+        return len(text) // 3 + 1
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding("cl100k_base")
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+class EmbeddingBatcher:
+    """Pakker tekster i batches og kalder embed_many(texts) -> list[embedding] én gang pr. batch."""
+
+    def __init__(self, embed_many, max_items=MAX_BATCH_ITEMS, max_tokens=MAX_BATCH_TOKENS):
+        self.embed_many = embed_many
+        self.max_items = max_items
+        self.max_tokens = max_tokens
+        self._pending = []
+        self._pending_tokens = 0
+        self.requests = 0
+        self.items = 0
+
+    def submit(self, text, on_done):
+        """Lægger text i kø; on_done(embedding) kaldes når batchen er sendt."""
+        tokens = count_tokens(text)
+        if self._pending and self._pending_tokens + tokens > self.max_tokens:
+            self.flush()
+        self._pending.append((text, on_done))
+        self._pending_tokens += tokens
+        if len(self._pending) >= self.max_items:
+            self.flush()
+
+    def _take_batch(self):
+        batch = self._pending
+        self._pending = []
+        self._pending_tokens = 0
+        return batch
+
+    def _deliver(self, batch, embeddings):
+        self.requests += 1
+        self.items += len(batch)
+        return [on_done(embedding) for (_, on_done), embedding in zip(batch, embeddings)]
+
+    def _embed(self, texts):
+        """embed_many(texts), eller [] pr. tekst hvis kaldet fejler (så crawlet ikke afbrydes)."""
+        try:
+            return self.embed_many(texts)
+        except Exception as e:
+            print(f"Fejl ved embeddings ({len(texts)} tekster): {e}")
+            return [[] for _ in texts]
+
+    def flush(self):
+        """Sender den aktuelle batch (blokerende)."""
+        batch = self._take_batch()
+        if batch:
+            self._deliver(batch, self._embed([text for text, _ in batch]))
+
+    def print_summary(self):
+        print(f"\n🧮 Embeddings: {self.items} tekster i {self.requests} kald")
+
+
+class AsyncEmbeddingBatcher(EmbeddingBatcher):
+    """Som EmbeddingBatcher, men batches sendes i baggrunden så crawl-loopet ikke venter.
+
+    En ufuld batch sendes efter BATCH_LINGER sekunder; drain() venter på alle udestående kald.
+    on_done må være en coroutine-funktion; den afventes før batchen regnes som leveret,
+    så en fuld kø efter batcheren bremser nye kald (se wait_for_capacity).
+    """
+
+    def __init__(self, embed_many, max_items=MAX_BATCH_ITEMS, max_tokens=MAX_BATCH_TOKENS, linger=BATCH_LINGER,
+                 max_inflight=MAX_INFLIGHT_BATCHES):
+        super().__init__(embed_many, max_items, max_tokens)
+        self.linger = linger
+        self.max_inflight = max_inflight
+        self._timer = None
+        self._inflight = set()
+
+    def submit(self, text, on_done):
+        super().submit(text, on_done)
+        if self._pending and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.linger, self.flush)
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = self._take_batch()
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._send(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch):
+        embeddings = await asyncio.to_thread(self._embed, [text for text, _ in batch])
+        for result in self._deliver(batch, embeddings):
+            if inspect.isawaitable(result):
+                await result
+
+    async def wait_for_capacity(self):
+        """Venter til der er færre end max_inflight batches undervejs."""
+        while len(self._inflight) >= self.max_inflight:
+            await asyncio.wait(list(self._inflight), return_when=asyncio.FIRST_COMPLETED)
+
+    async def drain(self):
+        """Sender resten af køen og venter til alle batches er leveret."""
+        self.flush()
+        while self._inflight:
+            await asyncio.gather(*list(self._inflight))
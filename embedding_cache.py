@@ -0,0 +1,125 @@
+"""
+Persistent embedding-cache, så uændrede artikler aldrig embeddes igen.
+
+Nøglen er (model, dimensioner, sha256 af den normaliserede tekst). Vektorerne
+gemmes binært i en SQLite-fil, og når cachen overstiger max_entries fjernes
+de mindst nyligt brugte. Et cache-hit skriver ikke til databasen: tidspunkterne
+samles i hukommelsen og skrives sammen med næste put (eller ved flush/close).
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+
+CACHE_FILE = "embedding_cache.sqlite"
+MAX_ENTRIES = 20_000
+# Hits hvis last_used højst holdes i hukommelsen før de skrives
+TOUCH_BATCH = 256
+# Ved oprydning fjernes der ned til denne andel af max_entries, så det ikke sker ved hvert put
+EVICT_TO = 0.9
+
+def normalize_text(text):
+    """Normaliserer unicode og whitespace, så kosmetiske forskelle giver samme nøgle."""
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def cache_key(model, dimensions, text):
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model}:{dimensions}:{digest}"
+
+
+class EmbeddingCache:
+    def __init__(self, model, dimensions, path=CACHE_FILE, max_entries=MAX_ENTRIES):
+        self.model = model
+        self.dimensions = dimensions
+        self.path = path
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        # Rækkeantallet tælles én gang og holdes derefter ajour ved put og oprydning
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self._touched = {}  # key -> last_used for hits der endnu ikke er skrevet
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text):
+        """Den gemte embedding for text, eller None."""
+        key = cache_key(self.model, self.dimensions, text)
+        with self._lock:
+            row = self._conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if not row:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH:
+                self._write_touched()
+                self._conn.commit()
+        return array("d", row[0]).tolist()
+
+    def put(self, text, embedding):
+        if not embedding:
+            return
+        key = cache_key(self.model, self.dimensions, text)
+        with self._lock:
+            self._touched.pop(key, None)
+            self._write_touched()
+            exists = self._conn.execute("SELECT 1 FROM embeddings WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                (key, array("d", embedding).tobytes(), time.time()),
+            )
+            if not exists:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _write_touched(self):
+        """Skriver de samlede last_used-tidspunkter (i den åbne transaktion)."""
+        if self._touched:
+            self._conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                   [(used, key) for key, used in self._touched.items()])
+            self._touched = {}
+
+    def _evict(self):
+        """Fjerner de mindst nyligt brugte embeddings, ned til EVICT_TO af max_entries."""
+        target = int(self.max_entries * EVICT_TO)
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+            (self._count - target,),
+        )
+        self._count = target
+
+    def flush(self):
+        """Skriver ventende last_used-tidspunkter."""
+        with self._lock:
+            self._write_touched()
+            self._conn.commit()
+
+    def print_summary(self):
+        total = self.hits + self.misses
+        ratio = self.hits / total * 100 if total else 0.0
+        print(f"\n💾 Embedding-cache: {self.hits} hits, {self.misses} misses ({ratio:.1f}% hits)")
+
+    def close(self):
+        with self._lock:
+            self._write_touched()
+            self._conn.commit()
+            self._conn.close()
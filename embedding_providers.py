@@ -0,0 +1,296 @@
+"""
+Udskiftelige embedding-backends.
+
+Alle backends har samme interface: attributterne name, model og dimensions
+(bruges også som nøgle i embedding-cachen), embed(texts) -> list[embedding]
+og close(). En batch der fejler giver en tom embedding ([]) pr. tekst i stedet
+for en exception, så crawleren kan markere artiklerne som fejlede og fortsætte.
+  - openai:   text-embedding-3-small via API'et (kræver OPENAI_API_KEY)
+  - local:    en sentence-transformers-model på CPU (valgfri afhængighed)
+  - hashing:  hashing-vektorisering af ord og tegn-trigrammer - ingen model,
+              intet netværk; til tests og hurtige lokale builds
+De lokale backends kører i batches fordelt på flere CPU-kerner.
+
+Scriptet embedder også Freshdesk-eksporten (Solutions_Organized) og RIAB
+lokalt ind i et embedding-lager (se embedding_store.py):
+    python3 embedding_providers.py --backend hashing
+    python3 embedding_providers.py --backend local --model paraphrase-multilingual-MiniLM-L12-v2
+    python3 embedding_providers.py --backend hashing --build-ann   # også IVF-index (ann_index.py)
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import re
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+OPENAI_MODEL = "text-embedding-3-small"
+OPENAI_DIMENSIONS = 1536
+LOCAL_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+HASHING_DIMENSIONS = 1536
+# Tekster pr. batch i de lokale backends
+LOCAL_BATCH_SIZE = 64
+LOCAL_WORKERS = os.cpu_count() or 1
+
+CORPUS_EMBEDDINGS_FILE = "corpus_embeddings.npy"
+CORPUS_INDEX_FILE = "corpus_embeddings_index.json"
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+class EmbeddingProvider:
+    name = None
+    model = None
+    dimensions = None
+
+    def embed(self, texts):
+        raise NotImplementedError
+
+    def embed_one(self, text):
+        return self.embed([text])[0]
+
+    def close(self):
+        """Frigiver backendens ressourcer (fx proces-pool)."""
+
+
+def _batch_or_empty(compute, texts):
+    """Embeddings fra compute() som lister, eller [] pr. tekst hvis batchen fejler."""
+    try:
+        return compute().tolist()
+    except Exception as e:
+        print(f"Fejl ved batch-embeddings ({len(texts)} tekster): {e}")
+        return [[] for _ in texts]
+
+
+class OpenAIEmbeddings(EmbeddingProvider):
+    name = "openai"
+
+    def __init__(self, model=OPENAI_MODEL, dimensions=OPENAI_DIMENSIONS):
+        from dotenv import load_dotenv
+        from openai import OpenAI
+
+        load_dotenv()
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("Ingen OPENAI_API_KEY fundet i .env")
+        self.client = OpenAI(api_key=api_key)
+        self.model = model
+        self.dimensions = dimensions
+
+    def _create(self, texts):
+        resp = self.client.embeddings.create(model=self.model, dimensions=self.dimensions, input=texts)
+        return [item.embedding for item in sorted(resp.data, key=lambda item: item.index)]
+
+    def embed_one(self, text):
+        try:
+            return self._create(text)[0]
+        except Exception as e:
+            print(f"Fejl ved embeddings: {e}")
+            return []
+
+    def embed(self, texts):
+        """Embeddings for flere tekster i ét kald (samme rækkefølge som texts)."""
+        try:
+            return self._create(texts)
+        except Exception as e:
+            # Én ugyldig tekst får hele batchen afvist - prøv dem enkeltvis så resten ikke går tabt
+            print(f"Fejl ved batch-embeddings ({len(texts)} tekster): {e}")
+            return [self.embed_one(text) for text in texts]
+
+
+class SentenceTransformerEmbeddings(EmbeddingProvider):
+    name = "local"
+
+    def __init__(self, model=LOCAL_MODEL, workers=LOCAL_WORKERS, batch_size=LOCAL_BATCH_SIZE):
+        try:
+            import torch
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ValueError("Backend 'local' kræver sentence-transformers (pip install sentence-transformers)")
+        # torch paralleliserer selv hver batch over workers tråde
+        torch.set_num_threads(workers)
+        self._model = SentenceTransformer(model, device="cpu")
+        self.model = model
+        self.dimensions = self._model.get_sentence_embedding_dimension()
+        self.batch_size = batch_size
+
+    def embed(self, texts):
+        texts = list(texts)
+        return _batch_or_empty(lambda: self._model.encode(texts, batch_size=self.batch_size,
+                                                          normalize_embeddings=True).astype(np.float32), texts)
+
+
+def _hash_features(text):
+    """Ord og tegn-trigrammer (fanger dele af sammensatte ord som "Kassenabschluss")."""
+    for word in _WORD.findall(text.lower()):
+        yield word
+        padded = f"<{word}>"
+        for i in range(len(padded) - 2):
+            yield padded[i:i + 3]
+
+def hashing_vectors(texts, dimensions=HASHING_DIMENSIONS):
+    """L2-normaliserede hashing-vektorer (1 + log tf, fortegn fra hashen) som float32-matrix."""
+    matrix = np.zeros((len(texts), dimensions), dtype=np.float32)
+    for row, text in enumerate(texts):
+        counts = {}
+        for feature in _hash_features(text):
+            counts[feature] = counts.get(feature, 0) + 1
+        for feature, tf in counts.items():
+            h = zlib.crc32(feature.encode("utf-8"))
+            matrix[row, h % dimensions] += (1.0 + math.log(tf)) * (1.0 if h & 0x80000000 else -1.0)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class HashingEmbeddings(EmbeddingProvider):
+    name = "hashing"
+
+    def __init__(self, dimensions=HASHING_DIMENSIONS, workers=LOCAL_WORKERS, batch_size=LOCAL_BATCH_SIZE):
+        self.model = f"hashing-crc32-{dimensions}"
+        self.dimensions = dimensions
+        self.workers = workers
+        self.batch_size = batch_size
+        self._pool = None
+
+    def embed(self, texts):
+        texts = list(texts)
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if self.workers <= 1 or len(batches) <= 1:
+            parts = [_batch_or_empty(lambda batch=batch: hashing_vectors(batch, self.dimensions), batch)
+                     for batch in batches]
+        else:
+            # Hashingen er ren Python, så batchene fordeles på processer (ikke tråde);
+            # spawn, så børnene ikke arver crawlerens tråde
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            futures = [self._pool.submit(hashing_vectors, batch, self.dimensions) for batch in batches]
+            parts = [_batch_or_empty(future.result, batch) for future, batch in zip(futures, batches)]
+        return [vector for part in parts for vector in part]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+PROVIDERS = {
+    "openai": OpenAIEmbeddings,
+    "local": SentenceTransformerEmbeddings,
+    "hashing": HashingEmbeddings,
+}
+
+def get_provider(name, **options):
+    """Opretter en backend ud fra navnet i PROVIDERS."""
+    if name not in PROVIDERS:
+        raise ValueError(f"Ukendt embedding-backend: {name} (vælg mellem {', '.join(PROVIDERS)})")
+    return PROVIDERS[name](**options)
+
+
+def embed_corpora(provider, corpora, embeddings_path=CORPUS_EMBEDDINGS_FILE, index_path=CORPUS_INDEX_FILE,
+                  build_ann=False):
+    """Embedder alle artikler i korpora (se bm25_index.CORPORA) ind i et embedding-lager.
+
+    Lange artikler embeddes i chunks (se chunking.py), og artiklens vektor er gennemsnittet.
+    Med build_ann=True bygges IVF-indexet til search.py --nprobe ved siden af lageret
+    (se ann_index.ann_dir_for), hvis der er mindst ann_index.MIN_IVF_VECTORS artikler.
+    """
+    from ann_index import MIN_IVF_VECTORS, ann_dir_for, build_ivf
+    from bm25_index import iter_corpus_documents
+    from chunking import chunk_text, combine_embeddings
+    from embedding_batcher import EmbeddingBatcher
+    from embedding_store import write_embedding_store
+
+    rows = []
+    vectors = []
+
+    def add_document(meta, text):
+        chunks = chunk_text(text)
+        if not chunks:
+            print(f"   ⚠️ Ingen tekst at embedde for {meta['id']}")
+            return
+        received = [None] * len(chunks)
+
+        def on_done(embedding, index):
+            received[index] = embedding
+            if all(vector is not None for vector in received):
+                if all(received):
+                    vectors.append(combine_embeddings(received, [chunk.tokens for chunk in chunks]))
+                    # Samme række-format som crawlerens lager, så search.py kan bruges direkte
+                    rows.append({
+                        "url": str(meta["id"]),
+                        "category": os.path.splitext(os.path.basename(meta["file"]))[0],
+                        "main_category": meta["source"],
+                        "title": meta["title"],
+                    })
+                else:
+                    print(f"   ⚠️ Embedding fejlede for {meta['id']}")
+
+        for index, chunk in enumerate(chunks):
+            batcher.submit(text[chunk.start:chunk.end], lambda embedding, index=index: on_done(embedding, index))
+
+    batcher = EmbeddingBatcher(provider.embed)
+    documents = 0
+    for meta, text in iter_corpus_documents(corpora):
+        add_document(meta, text)
+        documents += 1
+    batcher.flush()
+
+    if not rows:
+        print("⚠️ Ingen artikler embedded")
+        return 0
+    matrix = np.stack(vectors)
+    write_embedding_store(matrix, rows, embeddings_path, index_path)
+    print(f"💾 {len(rows)} af {documents} artikler embedded med {provider.name} ({provider.model}, "
+          f"{provider.dimensions} dim.) gemt i {embeddings_path}")
+    if build_ann:
+        meta = build_ivf(matrix, ann_dir_for(embeddings_path))
+        if meta is None:
+            print(f"ℹ️  Intet IVF-index: under {MIN_IVF_VECTORS} artikler er eksakt søgning hurtig nok")
+        else:
+            print(f"💾 IVF-index med {meta['nlist']} klynger gemt i {ann_dir_for(embeddings_path)}/")
+    return len(rows)
+
+def main():
+    from bm25_index import CORPORA
+
+    parser = argparse.ArgumentParser(description="Embedder Solutions_Organized og RIAB med en valgfri backend.")
+    parser.add_argument("--backend", choices=sorted(PROVIDERS), default="hashing",
+                        help="Embedding-backend (standard: hashing)")
+    parser.add_argument("--model", help=f"Model til backend 'local' (standard: {LOCAL_MODEL})")
+    parser.add_argument("--workers", type=int, default=LOCAL_WORKERS,
+                        help=f"CPU-kerner til de lokale backends (standard: {LOCAL_WORKERS})")
+    parser.add_argument("--corpus", nargs="+", choices=sorted(CORPORA), default=["solutions", "riab"],
+                        help="Korpora der embeddes (standard: solutions riab)")
+    parser.add_argument("--embeddings-file", default=CORPUS_EMBEDDINGS_FILE)
+    parser.add_argument("--index-file", default=CORPUS_INDEX_FILE)
+    parser.add_argument("--build-ann", action="store_true",
+                        help="Byg også IVF-indexet til search.py --nprobe (se ann_index.py)")
+    args = parser.parse_args()
+
+    options = {}
+    if args.backend != "openai":
+        options["workers"] = args.workers
+    if args.backend == "local" and args.model:
+        options["model"] = args.model
+    try:
+        provider = get_provider(args.backend, **options)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    started = time.perf_counter()
+    try:
+        embed_corpora(provider, {name: CORPORA[name] for name in args.corpus}, args.embeddings_file, args.index_file,
+                      args.build_ann)
+    finally:
+        provider.close()
+    print(f"⏱️  Samlet tid: {time.perf_counter() - started:.1f} sek.")
+
+if __name__ == "__main__":
+    main()
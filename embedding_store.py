@@ -0,0 +1,79 @@
+"""
+Kompakt lager til embeddings: én sammenhængende float32-matrix i en .npy-fil
+plus et JSON-index der mapper række -> URL og kategori.
+
+Kategori-filerne indeholder kun "embedding_row" i stedet for selve
+vektoren. Matrixen kan memory-mappes, så
+søgning læser vektorerne direkte fra filen uden at oprette Python-floats.
+"""
+
+import json
+import os
+
+import numpy as np
+
+EMBEDDINGS_FILE = "cowis_embeddings.npy"
+INDEX_FILE = "cowis_embeddings_index.json"
+# Chunk-vektorer for artikler der er embedded i flere vinduer (se chunking.py)
+CHUNK_EMBEDDINGS_FILE = "cowis_chunk_embeddings.npy"
+CHUNK_INDEX_FILE = "cowis_chunk_embeddings_index.json"
+
+
+def write_embedding_store(matrix, rows, embeddings_path=EMBEDDINGS_FILE, index_path=INDEX_FILE):
+    """Gemmer embeddings som float32-matrix og index.
+
+    rows er en liste af index-rækker (dicts med mindst "url"); række i i
+    matrixen svarer til rows[i].
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    # Skriv til midlertidig fil først, så en læser aldrig ser en halv matrix
+    tmp_path = embeddings_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, matrix)
+    os.replace(tmp_path, embeddings_path)
+
+    index = {
+        "dimensions": int(matrix.shape[1]),
+        "count": int(matrix.shape[0]),
+        "rows": rows,
+    }
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    return matrix.shape
+
+
+class EmbeddingStore:
+    """Læseadgang til et gemt embedding-lager.
+
+    matrix er memory-mappet (read-only) som standard, så den deles med OS'ets
+    page cache i stedet for at blive kopieret ind i processen.
+    """
+
+    def __init__(self, embeddings_path=EMBEDDINGS_FILE, index_path=INDEX_FILE, mmap=True):
+        self.matrix = np.load(embeddings_path, mmap_mode="r" if mmap else None)
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        self.rows = index["rows"]
+        if len(self.rows) != self.matrix.shape[0]:
+            raise ValueError(
+                f"{index_path} har {len(self.rows)} rækker, men {embeddings_path} har {self.matrix.shape[0]}"
+            )
+        self.urls = [row["url"] for row in self.rows]
+        self.row_of = {url: i for i, url in enumerate(self.urls)}
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def dimensions(self):
+        return self.matrix.shape[1]
+
+    def vector(self, url):
+        """Embedding for url som et view ind i matrixen (ingen kopi)."""
+        return self.matrix[self.row_of[url]]
+
+    def rows_for(self, main_category):
+        """Rækkenumre for artikler i en hovedkategori."""
+        return np.fromiter(
+            (i for i, row in enumerate(self.rows) if row["main_category"] == main_category), dtype=np.int64
+        )
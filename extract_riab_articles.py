@@ -5,59 +5,52 @@ RIAB appears to be a specific POS system variant used in various articles.
 
 import json
 import os
+import re
 from pathlib import Path
 
-def extract_riab_articles():
-    """Extract all articles containing 'RIAB' from Solutions.json."""
+from solutions_stream import SOLUTIONS_FILE, iter_solution_articles
 
-    print("🔍 Loading Solutions.json...")
-    with open("Solutions.json", "r", encoding="utf-8") as f:
-        data = json.load(f)
+def extract_riab_articles(path=SOLUTIONS_FILE):
+    """Extract all articles containing 'RIAB' from Solutions.json.
+
+    The export is streamed (see solutions_stream.py); only the RIAB articles are kept.
+    """
+
+    print(f"🔍 Streaming {path}...")
 
     riab_articles = []
 
-    print(f"📊 Processing {len(data)} categories...")
-
-    for item in data:
-        cat = item['category']
-        cat_name = cat.get('name', 'Unknown Category')
-
-        for folder in cat.get('all_folders', []):
-            folder_name = folder.get('name', 'Unknown Folder')
-
-            for article in folder.get('articles', []):
-                # Check if article contains RIAB
-                title = article.get('title', '').lower()
-                desc = article.get('description', '').lower()
-                desc_un_html = article.get('desc_un_html', '').lower()
-
-                has_riab = ('riab' in title or 'riab' in desc or 'riab' in desc_un_html)
-
-                if has_riab:
-                    # Extract clean text from desc_un_html (remove HTML tags)
-                    import re
-
-                    clean_text = ""
-                    if desc_un_html:
-                        # Simple HTML tag removal using regex
-                        clean_text = re.sub(r'<[^>]+>', '', desc_un_html)
-                        # Clean up extra whitespace
-                        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-
-                    # Create article entry similar to vector_store format
-                    article_entry = {
-                        "id": article.get('id'),
-                        "title": article.get('title', ''),
-                        "text": clean_text,
-                        "category": cat_name,
-                        "folder": folder_name,
-                        "created_at": article.get('created_at'),
-                        "updated_at": article.get('updated_at'),
-                        "status": article.get('status'),
-                        "tags": article.get('tags', [])
-                    }
-
-                    riab_articles.append(article_entry)
+    for cat_name, folder_name, article in iter_solution_articles(path):
+        # Check if article contains RIAB
+        title = article.get('title', '').lower()
+        desc = article.get('description', '').lower()
+        desc_un_html = article.get('desc_un_html', '').lower()
+
+        has_riab = ('riab' in title or 'riab' in desc or 'riab' in desc_un_html)
+
+        if has_riab:
+            # Extract clean text from desc_un_html (remove HTML tags)
+            clean_text = ""
+            if desc_un_html:
+                # Simple HTML tag removal using regex
+                clean_text = re.sub(r'<[^>]+>', '', desc_un_html)
+                # Clean up extra whitespace
+                clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+
+            # Create article entry similar to vector_store format
+            article_entry = {
+                "id": article.get('id'),
+                "title": article.get('title', ''),
+                "text": clean_text,
+                "category": cat_name,
+                "folder": folder_name,
+                "created_at": article.get('created_at'),
+                "updated_at": article.get('updated_at'),
+                "status": article.get('status'),
+                "tags": article.get('tags', [])
+            }
+
+            riab_articles.append(article_entry)
 
     return riab_articles
 
@@ -138,7 +131,6 @@ def save_riab_articles(organized_articles):
 
 def sanitize_filename(name):
     """Sanitize folder/filename by removing invalid characters."""
-    import re
     # Replace invalid characters with underscores
     return re.sub(r'[<>:"/\\|?*]', '_', name).strip()
 
@@ -0,0 +1,164 @@
+"""
+Komprimeret, append-only arkiv over hentede sider (WARC-lignende).
+
+Hver side gemmes som sit eget gzip-medlem med WARC-agtige headers, så en
+post kan læses direkte ud fra sin offset. Et SQLite-index holder URL ->
+(offset, længde, type, kategori, hovedkategori, sha256). En side der ikke er ændret siden
+sidst skrives ikke igen.
+
+Arkivet bruges af `python3 cowis_crawler.py --reextract` til at køre alle
+artikler gennem ekstraktorerne igen uden at hente noget fra sitet.
+"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from cowis_extract import DEFAULT_PARSER, extract_article_page, normalize_page_url
+
+ARCHIVE_FILE = "html_archive.warc.gz"
+# Indexet ligger ved siden af arkivet: <arkiv>.idx.sqlite
+INDEX_SUFFIX = ".idx.sqlite"
+
+
+def _record_bytes(url, body):
+    headers = (
+        "WARC/1.0\r\n"
+        "WARC-Type: resource\r\n"
+        f"WARC-Target-URI: {url}\r\n"
+        f"WARC-Date: {time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}\r\n"
+        "Content-Type: text/html; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n"
+    )
+    return headers.encode("utf-8") + body + b"\r\n\r\n"
+
+def read_record(path, offset, length):
+    """Læser én post fra arkivet. Returnerer (headers, html)."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = gzip.decompress(f.read(length))
+    head, _, rest = data.partition(b"\r\n\r\n")
+    headers = dict(line.split(": ", 1) for line in head.decode("utf-8").split("\r\n")[1:])
+    body = rest[:int(headers["Content-Length"])]
+    return headers, body.decode("utf-8")
+
+def extract_archived_article(job):
+    """Læser en artikel fra arkivet og ekstraherer den. Til proces-poolen i --reextract.
+
+    job er (arkiv-sti, offset, længde, url, category_name, parser);
+    returnerer (url, category_name, tekst, billeder).
+    """
+    path, offset, length, url, category_name, parser = job
+    _, html = read_record(path, offset, length)
+    text, image_urls = extract_article_page(html, url, parser)
+    return url, category_name, text, image_urls
+
+
+class HtmlArchive:
+    def __init__(self, path=ARCHIVE_FILE):
+        self.path = path
+        self._file = open(path, "ab")
+        self._conn = sqlite3.connect(path + INDEX_SUFFIX, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                category_name TEXT,
+                main_category TEXT,
+                sha256 TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        # Arkiver fra før hovedkategorien blev gemt
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pages)")}
+        if "main_category" not in columns:
+            self._conn.execute("ALTER TABLE pages ADD COLUMN main_category TEXT")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self.written = 0
+        self.unchanged = 0
+        self.bytes_written = 0
+
+    def add(self, url, html, kind, category_name=None, main_category=None):
+        """Arkiverer en hentet side, medmindre samme indhold allerede ligger i arkivet.
+
+        main_category gemmes så --reextract kan placere artiklerne uden kategori-siderne
+        (fx efter en crawl med --from-inventory).
+        """
+        if not html:
+            return
+        key = normalize_page_url(url)
+        body = html.encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            row = self._conn.execute("SELECT sha256 FROM pages WHERE key = ?", (key,)).fetchone()
+            if row and row[0] == digest:
+                self._conn.execute(
+                    "UPDATE pages SET kind = ?, category_name = ?, main_category = ?, fetched_at = ? WHERE key = ?",
+                    (kind, category_name, main_category, time.time(), key),
+                )
+                self._conn.commit()
+                self.unchanged += 1
+                return
+            record = gzip.compress(_record_bytes(url, body))
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(record)
+            self._file.flush()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(key, url, kind, category_name, main_category, sha256, offset, length, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, kind, category_name, main_category, digest, offset, len(record), time.time()),
+            )
+            self._conn.commit()
+            self.written += 1
+            self.bytes_written += len(record)
+
+    def pages(self, kind=None):
+        """Arkiverede sider som (url, kind, category_name, offset, length), i den rækkefølge de blev arkiveret."""
+        query = "SELECT url, kind, category_name, offset, length FROM pages"
+        params = ()
+        if kind:
+            query += " WHERE kind = ?"
+            params = (kind,)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY offset", params).fetchall()
+
+    def categories(self):
+        """Kategori -> hovedkategori for de arkiverede sider der har den registreret."""
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT category_name, main_category FROM pages "
+                "WHERE category_name IS NOT NULL AND main_category IS NOT NULL ORDER BY offset"
+            ).fetchall())
+
+    def read(self, offset, length):
+        with self._lock:
+            self._file.flush()
+        return read_record(self.path, offset, length)[1]
+
+    def article_jobs(self, parser=DEFAULT_PARSER):
+        """Jobs til extract_archived_article for alle arkiverede artikler."""
+        with self._lock:
+            self._file.flush()
+        return [(self.path, offset, length, url, category_name, parser)
+                for url, _, category_name, offset, length in self.pages("article")]
+
+    def print_summary(self):
+        print(f"\n🗄️  HTML-arkiv: {self.written} sider skrevet ({self.bytes_written / (1024 * 1024):.2f} MB), "
+              f"{self.unchanged} uændrede")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+            self._conn.close()
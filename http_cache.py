@@ -0,0 +1,80 @@
+"""
+Persistent HTTP-cache til inkrementelle recrawls.
+
+Gemmer body, ETag og Last-Modified pr. normaliseret URL i en SQLite-fil.
+Ved næste crawl sendes If-None-Match/If-Modified-Since, og et 304-svar
+betyder at den gemte body genbruges uden at blive hentet igen.
+"""
+
+import sqlite3
+import threading
+import time
+
+CACHE_FILE = "http_cache.sqlite"
+
+
+class HttpCache:
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                body TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "body": row[2]}
+
+    def conditional_headers(self, entry):
+        """Headers til en conditional GET ud fra en gemt entry."""
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, key, url, resp):
+        """Gemmer et 200-svar og tæller det som en miss."""
+        with self._lock:
+            self.misses += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, etag, last_modified, body, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, resp.headers.get("ETag"), resp.headers.get("Last-Modified"), resp.text, time.time()),
+            )
+            self._conn.commit()
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def print_summary(self):
+        print(f"\n🗄️  HTTP-cache: {self.hits} hits, {self.misses} misses "
+              f"(hit ratio {self.hit_ratio() * 100:.1f}%)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
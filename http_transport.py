@@ -0,0 +1,166 @@
+"""
+Fælles HTTP-transport til crawleren.
+
+Genbruger forbindelser via en requests.Session med connection pool (keep-alive),
+prøver igen med eksponentiel backoff + jitter ved 5xx/429/timeouts og måler
+connect-, TLS- og TTFB-tid for hver forespørgsel. Med en governor (se
+politeness.py) afventes en plads før hver forespørgsel, og svaret bruges til at
+justere raten mod hosten.
+"""
+
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Headers for at browse fra Tyskland
+DEFAULT_HEADERS = {
+    "Accept-Language": "de-DE,de;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+POOL_SIZE = 32
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+TIMEOUT = 10
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Timing for den forespørgsel der kører i den aktuelle tråd
+_timing = threading.local()
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def _new_conn(self):
+        start = time.perf_counter()
+        sock = super()._new_conn()
+        _timing.connect = time.perf_counter() - start
+        return sock
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def _new_conn(self):
+        start = time.perf_counter()
+        sock = super()._new_conn()
+        _timing.connect = time.perf_counter() - start
+        return sock
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        # connect() laver både TCP-forbindelsen og TLS-handshaket
+        _timing.tls = max(0.0, time.perf_counter() - start - getattr(_timing, "connect", 0.0))
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+class HttpTransport:
+    """Delt session med connection pool, retries og timing pr. forespørgsel."""
+
+    def __init__(self, pool_size=POOL_SIZE, max_retries=MAX_RETRIES, timeout=TIMEOUT, governor=None):
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.governor = governor
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.timings = []
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def _backoff(self, attempt, retry_after=None):
+        """Ventetid før næste forsøg: Retry-After hvis serveren angiver det, ellers full jitter."""
+        if retry_after:
+            try:
+                return min(BACKOFF_MAX, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def get(self, url, headers=None):
+        """GET med retries. Returnerer response (også ved 4xx) eller kaster den sidste fejl."""
+        for attempt in range(self.max_retries + 1):
+            _timing.connect = 0.0
+            _timing.tls = 0.0
+            if self.governor:
+                self.governor.acquire(url)
+            try:
+                resp = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                if self.governor:
+                    self.governor.record_error(url)
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                print(f"   ↻ {url}: {e.__class__.__name__}, prøver igen om {delay:.1f} sek.")
+            else:
+                self._record(url, resp)
+                if self.governor:
+                    self.governor.record(url, resp.status_code, resp.elapsed.total_seconds(),
+                                         resp.headers.get("Retry-After"))
+                if resp.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return resp
+                delay = self._backoff(attempt, resp.headers.get("Retry-After"))
+                print(f"   ↻ {url}: HTTP {resp.status_code}, prøver igen om {delay:.1f} sek.")
+            with self._lock:
+                self.retries += 1
+            time.sleep(delay)
+
+    def _record(self, url, resp):
+        timing = {
+            "url": url,
+            "status": resp.status_code,
+            "connect": _timing.connect,
+            "tls": _timing.tls,
+            "ttfb": resp.elapsed.total_seconds(),
+            "bytes": len(resp.content),
+        }
+        with self._lock:
+            self.timings.append(timing)
+
+    def summary(self):
+        """Opsummering af målte tider (sekunder) for alle forespørgsler."""
+        with self._lock:
+            timings = list(self.timings)
+        if not timings:
+            return {"requests": 0, "retries": self.retries}
+        new_connections = [t for t in timings if t["connect"] > 0]
+        return {
+            "requests": len(timings),
+            "retries": self.retries,
+            "new_connections": len(new_connections),
+            "avg_connect": sum(t["connect"] for t in new_connections) / len(new_connections) if new_connections else 0.0,
+            "avg_tls": sum(t["tls"] for t in new_connections) / len(new_connections) if new_connections else 0.0,
+            "avg_ttfb": sum(t["ttfb"] for t in timings) / len(timings),
+            "bytes": sum(t["bytes"] for t in timings),
+        }
+
+    def print_summary(self):
+        stats = self.summary()
+        print(f"\n🌐 HTTP: {stats['requests']} forespørgsler, {stats['retries']} retries")
+        if stats["requests"]:
+            print(f"   Nye forbindelser: {stats['new_connections']} "
+                  f"(connect {stats['avg_connect'] * 1000:.0f} ms, TLS {stats['avg_tls'] * 1000:.0f} ms i snit)")
+            print(f"   TTFB i snit: {stats['avg_ttfb'] * 1000:.0f} ms, {stats['bytes'] / (1024 * 1024):.2f} MB hentet")
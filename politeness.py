@@ -0,0 +1,137 @@
+"""
+Adaptiv hastighedsregulering (AIMD) pr. host.
+
+Hver host har en tilladt forespørgselsrate. Den hæves lidt (additivt) for hvert
+sundt svar og halveres (multiplikativt) ved 429/503, Retry-After, 5xx,
+netværksfejl eller når svartiden stiger markant over det normale. Raten
+holdes mellem en nedre og øvre grænse.
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+
+MIN_RATE = 0.5     # forespørgsler/sek. - raten går aldrig under dette
+MAX_RATE = 20.0    # forespørgsler/sek. - raten går aldrig over dette
+START_RATE = 2.0   # svarer til de gamle faste pauser på 0,5 sek.
+INCREASE = 0.25    # req/s lagt til pr. sundt svar
+DECREASE = 0.5     # raten ganges med dette ved tegn på overbelastning
+DECREASE_COOLDOWN = 1.0  # sek. - højst én nedsættelse pr. vindue, så én bølge fejl ikke giver flere halveringer
+BACKOFF_STATUSES = {429, 503}
+
+# Svartid regnes som en spike hvis den er LATENCY_SPIKE gange over gennemsnittet
+# (og over LATENCY_FLOOR sek., så små udsving på hurtige svar ignoreres)
+LATENCY_SPIKE = 3.0
+LATENCY_FLOOR = 0.5
+LATENCY_SMOOTHING = 0.1
+
+
+class _HostState:
+    def __init__(self, rate):
+        self.rate = rate
+        self.next_slot = 0.0
+        self.avg_latency = None
+        self.last_decrease = 0.0
+        self.increases = 0
+        self.decreases = 0
+        self.lowest_rate = rate
+        self.highest_rate = rate
+
+
+class AimdGovernor:
+    """Fordeler forespørgsler pr. host efter en rate der justeres med AIMD. Trådsikker."""
+
+    def __init__(self, min_rate=MIN_RATE, max_rate=MAX_RATE, start_rate=START_RATE,
+                 increase=INCREASE, decrease=DECREASE):
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.start_rate = min(max(start_rate, self.min_rate), self.max_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url):
+        host = urlparse(url).netloc
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.start_rate)
+        return state
+
+    def acquire(self, url):
+        """Blokerer til der er en ledig plads til en forespørgsel mod url's host."""
+        with self._lock:
+            state = self._host(url)
+            now = time.monotonic()
+            start = max(now, state.next_slot)
+            state.next_slot = start + 1.0 / state.rate
+        if start > now:
+            time.sleep(start - now)
+
+    def record(self, url, status, latency, retry_after=None):
+        """Justerer raten ud fra et svar (HTTP-status og svartid i sek.)."""
+        with self._lock:
+            state = self._host(url)
+            pause = _parse_retry_after(retry_after)
+            if pause:
+                # Serveren har bedt om en pause - ingen forespørgsler før den er gået
+                state.next_slot = max(state.next_slot, time.monotonic() + pause)
+            if status in BACKOFF_STATUSES or pause or status >= 500:
+                self._slow_down(state)
+            elif self._is_spike(state, latency):
+                self._slow_down(state)
+            else:
+                self._speed_up(state)
+                self._update_latency(state, latency)
+
+    def record_error(self, url):
+        """Timeout eller forbindelsesfejl."""
+        with self._lock:
+            self._slow_down(self._host(url))
+
+    def _is_spike(self, state, latency):
+        if state.avg_latency is None:
+            return False
+        return latency > LATENCY_FLOOR and latency > state.avg_latency * LATENCY_SPIKE
+
+    def _update_latency(self, state, latency):
+        if state.avg_latency is None:
+            state.avg_latency = latency
+        else:
+            state.avg_latency += LATENCY_SMOOTHING * (latency - state.avg_latency)
+
+    def _speed_up(self, state):
+        state.rate = min(self.max_rate, state.rate + self.increase)
+        state.increases += 1
+        state.highest_rate = max(state.highest_rate, state.rate)
+
+    def _slow_down(self, state):
+        now = time.monotonic()
+        if now - state.last_decrease < DECREASE_COOLDOWN:
+            return
+        state.last_decrease = now
+        state.rate = max(self.min_rate, state.rate * self.decrease)
+        state.decreases += 1
+        state.lowest_rate = min(state.lowest_rate, state.rate)
+
+    def rate(self, url):
+        with self._lock:
+            return self._host(url).rate
+
+    def print_summary(self):
+        with self._lock:
+            hosts = list(self._hosts.items())
+        for host, state in hosts:
+            print(f"\n🚦 {host}: {state.rate:.1f} req/s til sidst "
+                  f"(min {state.lowest_rate:.1f}, maks {state.highest_rate:.1f}; "
+                  f"{state.increases} op, {state.decreases} ned)")
+
+
+def _parse_retry_after(value):
+    """Retry-After i sekunder (HTTP-datoer ignoreres), eller None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
@@ -1,6 +1,9 @@
 """
 Script to process the entire Solutions.json file and organize all articles by category.
 This will create a comprehensive organization of all help articles from Freshdesk.
+
+Solutions.json is streamed (see solutions_stream.py) and each folder file is written
+as soon as its articles have been read, so memory use does not grow with the export.
 """
 
 import json
@@ -8,64 +11,48 @@ import os
 import re
 from pathlib import Path
 
-def load_solutions_data():
-    """Load the entire Solutions.json file."""
-    print("🔍 Loading Solutions.json (42MB file)...")
-    with open("Solutions.json", "r", encoding="utf-8") as f:
-        data = json.load(f)
-    print(f"✅ Loaded {len(data)} categories")
-    return data
-
-def extract_all_articles(data):
-    """Extract all articles from the nested Freshdesk structure."""
-    all_articles = []
-
-    print("📊 Processing all articles...")
-
-    for category_item in data:
-        category = category_item['category']
-        category_name = category.get('name', 'Unknown Category')
-
-        print(f"  📁 Processing category: {category_name}")
-
-        for folder in category.get('all_folders', []):
-            folder_name = folder.get('name', 'Unknown Folder')
-
-            for article in folder.get('articles', []):
-                # Extract clean text from desc_un_html (remove HTML tags)
-                desc_un_html = article.get('desc_un_html', '')
-                clean_text = ""
-                if desc_un_html:
-                    # Simple HTML tag removal using regex
-                    clean_text = re.sub(r'<[^>]+>', '', desc_un_html)
-                    # Clean up extra whitespace
-                    clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-
-                # Create article entry
-                article_entry = {
-                    "id": article.get('id'),
-                    "title": article.get('title', ''),
-                    "text": clean_text,
-                    "category": category_name,
-                    "folder": folder_name,
-                    "created_at": article.get('created_at'),
-                    "updated_at": article.get('updated_at'),
-                    "status": article.get('status'),
-                    "tags": article.get('tags', []),
-                    "description": article.get('description', ''),
-                    "user_id": article.get('user_id'),
-                    "thumbs_up": article.get('thumbs_up', 0),
-                    "thumbs_down": article.get('thumbs_down', 0),
-                    "hits": article.get('hits', 0),
-                    "seo_data": article.get('seo_data', {}),
-                    "modified_at": article.get('modified_at'),
-                    "modified_by": article.get('modified_by')
-                }
-
-                all_articles.append(article_entry)
-
-    print(f"✅ Extracted {len(all_articles)} total articles")
-    return all_articles
+from solutions_stream import SOLUTIONS_FILE, iter_solution_articles
+from taxonomy import load_taxonomy
+
+def extract_all_articles(path=SOLUTIONS_FILE):
+    """Yield all articles from the nested Freshdesk structure, one at a time."""
+    print(f"📊 Streaming articles from {path}...")
+
+    current_category = None
+    for category_name, folder_name, article in iter_solution_articles(path):
+        if category_name != current_category:
+            print(f"  📁 Processing category: {category_name}")
+            current_category = category_name
+
+        # Extract clean text from desc_un_html (remove HTML tags)
+        desc_un_html = article.get('desc_un_html', '')
+        clean_text = ""
+        if desc_un_html:
+            # Simple HTML tag removal using regex
+            clean_text = re.sub(r'<[^>]+>', '', desc_un_html)
+            # Clean up extra whitespace
+            clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+
+        # Create article entry
+        yield {
+            "id": article.get('id'),
+            "title": article.get('title', ''),
+            "text": clean_text,
+            "category": category_name,
+            "folder": folder_name,
+            "created_at": article.get('created_at'),
+            "updated_at": article.get('updated_at'),
+            "status": article.get('status'),
+            "tags": article.get('tags', []),
+            "description": article.get('description', ''),
+            "user_id": article.get('user_id'),
+            "thumbs_up": article.get('thumbs_up', 0),
+            "thumbs_down": article.get('thumbs_down', 0),
+            "hits": article.get('hits', 0),
+            "seo_data": article.get('seo_data', {}),
+            "modified_at": article.get('modified_at'),
+            "modified_by": article.get('modified_by')
+        }
 
 def organize_articles_by_category(articles):
     """Organize articles by their source category and folder."""
@@ -86,101 +73,75 @@ def organize_articles_by_category(articles):
     return organized
 
 def identify_main_categories():
-    """Identify main category groupings based on existing structure."""
-    # Based on the existing Cowis structure, map categories to main groups
-    main_category_mapping = {
-        # Cowis Backoffice categories
-        "Cowis Customer Help": "Cowis Backoffice",
-        "DdD Customer Help": "Cowis Backoffice",
-
-        # POS categories
-        "Imagine Documentation": "Cowis POS",
-        "RVE - RFA - POSFLOW etc.  Customer Help": "Cowis POS",
-
-        # Webshop categories
-        # (None currently identified as webshop from Solutions.json)
-
-        # Other categories stay as-is or go to general
-        "INTERNAL Support Articles": "Internal Support",
-        "MStore Customer Help": "MStore",
-        "MStore User Guide": "MStore",
-        "MStore Customer FAQs": "MStore",
-        "RMS Customer Help": "RMS",
-        "RMSify Customer Help": "RMS",
-        "Alert Manager Customer Help": "Alert Manager",
-        "SmartVision Customer Help": "SmartVision",
-        "JobBOSS Customer Help": "JobBOSS",
-        "Sigma Customer Help": "Sigma",
-        "ViJi Track Documentation": "ViJi Track",
-        "How to use this portal and what to expect from Support": "Support Portal",
-        "Omnis Customer Help": "Omnis",
-        "INTERNAL MStore Product Information": "Internal MStore",
-        "ARCHIVED": "Archived",
-        "Imagine FAQs": "Imagine",
-        "Default Category": "Default"
-    }
+    """Main category groupings for Freshdesk category names, from taxonomy.json."""
+    return load_taxonomy().freshdesk_main
 
-    return main_category_mapping
+def sanitize_filename(name):
+    """Sanitize folder/filename by removing invalid characters."""
+    return re.sub(r'[<>:"/\\|?*]', '_', name).strip()
 
-def organize_by_main_category(articles, main_mapping):
-    """Organize articles by main categories."""
-    organized = {}
+def save_folder_articles(base_dir, main_cat, sub_cat, folder_name, articles, append=False):
+    """Write one folder's articles to its JSON file (appending if the folder was already written)."""
+    sub_dir = base_dir / sanitize_filename(main_cat) / sanitize_filename(sub_cat)
+    sub_dir.mkdir(parents=True, exist_ok=True)
+    folder_file = sub_dir / f"{sanitize_filename(folder_name)}.json"
 
-    for article in articles:
-        category_name = article['category']
-        main_category = main_mapping.get(category_name, "Other")
+    if append and folder_file.exists():
+        # The same folder appeared again later in the export - keep both parts
+        with open(folder_file, "r", encoding="utf-8") as f:
+            articles = json.load(f) + articles
 
-        if main_category not in organized:
-            organized[main_category] = {}
+    with open(folder_file, "w", encoding="utf-8") as f:
+        json.dump(articles, f, ensure_ascii=False, indent=2)
 
-        sub_category = category_name
-        folder_name = article['folder']
+    print(f"    ✅ Saved {len(articles)} articles to {folder_file}")
 
-        if sub_category not in organized[main_category]:
-            organized[main_category][sub_category] = {}
+def save_organized_articles(articles, main_mapping):
+    """Save articles in organized folder structure.
 
-        if folder_name not in organized[main_category][sub_category]:
-            organized[main_category][sub_category][folder_name] = []
+    The articles of a folder are contiguous in Solutions.json, so each folder is
+    written when the next one starts; only article counts are kept for the indexes.
+    """
+    base_dir = Path("Solutions_Organized")
+    base_dir.mkdir(exist_ok=True)
 
-        organized[main_category][sub_category][folder_name].append(article)
+    counts = {}  # main category -> sub category -> folder -> article count
+    current_key = None
+    folder_articles = []
 
-    return organized
+    print("\n💾 Saving organized articles...")
 
-def sanitize_filename(name):
-    """Sanitize folder/filename by removing invalid characters."""
-    return re.sub(r'[<>:"/\\|?*]', '_', name).strip()
+    def flush():
+        if not folder_articles:
+            return
+        main_cat, sub_cat, folder_name = current_key
+        folders = counts.setdefault(main_cat, {}).setdefault(sub_cat, {})
+        save_folder_articles(base_dir, main_cat, sub_cat, folder_name, folder_articles,
+                             append=folder_name in folders)
+        folders[folder_name] = folders.get(folder_name, 0) + len(folder_articles)
 
-def save_organized_articles(organized_articles):
-    """Save articles in organized folder structure."""
-    base_dir = Path("Solutions_Organized")
-    base_dir.mkdir(exist_ok=True)
+    for article in articles:
+        category_name = article['category']
+        key = (main_mapping.get(category_name, "Other"), category_name, article['folder'])
+        if key != current_key:
+            flush()
+            current_key = key
+            folder_articles = []
+        folder_articles.append(article)
+    flush()
 
     total_articles = 0
     main_category_stats = {}
 
-    print("\n💾 Saving organized articles...")
-
-    # Save by main category
-    for main_cat, sub_categories in organized_articles.items():
+    # Save indexes by main category
+    for main_cat, sub_categories in counts.items():
         main_dir = base_dir / sanitize_filename(main_cat)
-        main_dir.mkdir(exist_ok=True)
 
         main_total = 0
 
         for sub_cat, folders in sub_categories.items():
             sub_dir = main_dir / sanitize_filename(sub_cat)
-            sub_dir.mkdir(exist_ok=True)
-
-            sub_total = 0
-
-            for folder_name, articles in folders.items():
-                folder_file = sub_dir / f"{sanitize_filename(folder_name)}.json"
-
-                with open(folder_file, "w", encoding="utf-8") as f:
-                    json.dump(articles, f, ensure_ascii=False, indent=2)
-
-                print(f"    ✅ Saved {len(articles)} articles to {folder_file}")
-                sub_total += len(articles)
+            sub_total = sum(folders.values())
 
             # Save subcategory index
             sub_index = sub_dir / "index.json"
@@ -188,7 +149,7 @@ def save_organized_articles(organized_articles):
                 "main_category": main_cat,
                 "sub_category": sub_cat,
                 "total_articles": sub_total,
-                "folders": {folder: len(articles) for folder, articles in folders.items()}
+                "folders": folders
             }
 
             with open(sub_index, "w", encoding="utf-8") as f:
@@ -202,8 +163,7 @@ def save_organized_articles(organized_articles):
         main_index_data = {
             "main_category": main_cat,
             "total_articles": main_total,
-            "sub_categories": {sub: sum(len(articles) for articles in folders.values())
-                             for sub, folders in sub_categories.items()}
+            "sub_categories": {sub: sum(folders.values()) for sub, folders in sub_categories.items()}
         }
 
         with open(main_index, "w", encoding="utf-8") as f:
@@ -213,6 +173,9 @@ def save_organized_articles(organized_articles):
         total_articles += main_total
         print(f"🏷️  {main_cat}: {main_total} articles in {len(sub_categories)} subcategories")
 
+    if not total_articles:
+        return 0
+
     # Save master index
     master_index = {
         "total_articles": total_articles,
@@ -227,7 +190,7 @@ def save_organized_articles(organized_articles):
 
     print(f"\n🎯 Complete Solutions.json processing finished!")
     print(f"   📊 Total articles processed: {total_articles}")
-    print(f"   📂 Organized in {len(organized_articles)} main categories")
+    print(f"   📂 Organized in {len(counts)} main categories")
     print(f"   📁 Saved to: {base_dir}/")
 
     return total_articles
@@ -236,24 +199,15 @@ def main():
     """Main function."""
     print("🚀 Starting comprehensive Solutions.json processing...\n")
 
-    # Load data
-    data = load_solutions_data()
-
-    # Extract all articles
-    all_articles = extract_all_articles(data)
-
-    if not all_articles:
-        print("❌ No articles found!")
-        return
-
     # Get main category mapping
     main_mapping = identify_main_categories()
 
-    # Organize by main categories
-    organized = organize_by_main_category(all_articles, main_mapping)
+    # Stream all articles straight into the organized folder structure
+    total_processed = save_organized_articles(extract_all_articles(), main_mapping)
 
-    # Save organized articles
-    total_processed = save_organized_articles(organized)
+    if not total_processed:
+        print("❌ No articles found!")
+        return
 
     # Get file sizes for comparison
     solutions_size = os.path.getsize("Solutions.json") / (1024 * 1024)  # MB
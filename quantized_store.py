@@ -0,0 +1,168 @@
+"""
+Kvantiserede embeddings (int8 og binær) med eksakt genberegning.
+
+Ud fra float32-lageret (se embedding_store.py) bygges to kompakte kopier af
+de L2-normaliserede vektorer:
+  - int8:   én byte pr. dimension med skala og nulpunkt pr. dimension (4x mindre)
+  - binær:  én bit pr. dimension (fortegnet), pakket med packbits (32x mindre);
+            afstanden er Hamming-afstand, beregnet med en popcount-tabel over
+            16-bit ord
+Søgningen finder kandidaterne i den kvantiserede kopi og beregner derefter
+cosinus-ligheden eksakt for kandidaterne på den memory-mappede float32-matrix.
+Kopierne bygges kun med "build" herunder og skal bygges igen, når
+embedding-lageret er skrevet om.
+
+Brug:
+    python3 quantized_store.py build
+    python3 quantized_store.py report -k 10 --candidates 20 50 100 200
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from embedding_store import EMBEDDINGS_FILE
+from search import normalize_rows, top_k
+
+QUANTIZED_DIR = "cowis_embeddings_quantized"
+# Antal kandidater fra den kvantiserede søgning der genberegnes eksakt
+DEFAULT_CANDIDATES = 100
+# Vektorer der behandles ad gangen (begrænser de midlertidige arrays)
+SCAN_BATCH = 4096
+
+# Antal sat-bits for hver 16-bit værdi
+_POPCOUNT16 = np.unpackbits(
+    np.arange(1 << 16, dtype=np.uint16).view(np.uint8).reshape(-1, 2), axis=1
+).sum(axis=1).astype(np.uint8)
+
+
+def quantize_int8(vectors):
+    """(koder, skala, nulpunkt) så vectors ≈ koder * skala + nulpunkt, pr. dimension."""
+    low = vectors.min(axis=0)
+    high = vectors.max(axis=0)
+    scale = np.where(high > low, (high - low) / 255.0, 1.0).astype(np.float32)
+    codes = np.round((vectors - low) / scale) - 128
+    return codes.astype(np.int8), scale, (low + 128 * scale).astype(np.float32)
+
+def quantize_binary(vectors):
+    """Fortegns-bits pakket i bytes, udfyldt til et lige antal bytes (hele 16-bit ord)."""
+    codes = np.packbits(vectors > 0, axis=1)
+    if codes.shape[1] % 2:
+        codes = np.pad(codes, ((0, 0), (0, 1)))
+    return codes
+
+def hamming_distances(codes, query_code):
+    """Hamming-afstand fra query_code til hver række i codes (pakkede bits)."""
+    query_words = query_code.view(np.uint16)
+    distances = np.empty(len(codes), dtype=np.uint32)
+    for start in range(0, len(codes), SCAN_BATCH):
+        words = np.ascontiguousarray(codes[start:start + SCAN_BATCH]).view(np.uint16)
+        distances[start:start + SCAN_BATCH] = _POPCOUNT16[words ^ query_words].sum(axis=1, dtype=np.uint32)
+    return distances
+
+def build_quantized(matrix, path=QUANTIZED_DIR):
+    vectors = normalize_rows(matrix)
+    codes, scale, offset = quantize_int8(vectors)
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "int8.npy"), codes)
+    np.save(os.path.join(path, "int8_scale.npy"), scale)
+    np.save(os.path.join(path, "int8_offset.npy"), offset)
+    binary = quantize_binary(vectors)
+    np.save(os.path.join(path, "binary.npy"), binary)
+    return vectors.nbytes, codes.nbytes, binary.nbytes
+
+
+class QuantizedStore:
+    def __init__(self, path=QUANTIZED_DIR, embeddings_path=EMBEDDINGS_FILE):
+        self.int8 = np.load(os.path.join(path, "int8.npy"), mmap_mode="r")
+        self.scale = np.load(os.path.join(path, "int8_scale.npy"))
+        self.offset = np.load(os.path.join(path, "int8_offset.npy"))
+        self.binary = np.load(os.path.join(path, "binary.npy"), mmap_mode="r")
+        # Fuld præcision bruges kun til at genberegne kandidaterne
+        self.full = np.load(embeddings_path, mmap_mode="r")
+        # Kandidaterne er rækkenumre i lageret - kopierne skal være bygget over det samme lager
+        if len(self.int8) != len(self.full):
+            raise ValueError(f"De kvantiserede kopier i {path} har {len(self.int8)} vektorer, men {embeddings_path} "
+                             f"har {len(self.full)} (byg dem igen: python3 quantized_store.py build)")
+
+    def __len__(self):
+        return len(self.int8)
+
+    def int8_scores(self, query):
+        """Tilnærmet cosinus: q·(koder*skala + nulpunkt) = (q*skala)·koder + q·nulpunkt."""
+        weights = (query * self.scale).astype(np.float32)
+        scores = np.empty(len(self.int8), dtype=np.float32)
+        for start in range(0, len(self.int8), SCAN_BATCH):
+            scores[start:start + SCAN_BATCH] = self.int8[start:start + SCAN_BATCH].astype(np.float32) @ weights
+        return scores + float(query @ self.offset)
+
+    def rescore(self, query, candidates, k):
+        """Eksakt cosinus for kandidaterne; returnerer (scores, rækkenumre) for de k bedste."""
+        candidates = np.sort(candidates)  # sorteret læsning fra mmap'en
+        scores = normalize_rows(self.full[candidates]) @ query
+        best = top_k(scores, k)
+        return scores[best], candidates[best]
+
+    def search(self, query_vector, k=10, method="int8", candidates=DEFAULT_CANDIDATES):
+        """De k bedste (scores, rækkenumre). method er "int8" eller "binary"."""
+        query = normalize_rows(query_vector)
+        candidates = max(k, candidates)
+        if method == "binary":
+            distances = hamming_distances(self.binary, quantize_binary(query[None, :])[0])
+            shortlist = top_k(-distances.astype(np.int64), candidates)
+        else:
+            shortlist = top_k(self.int8_scores(query), candidates)
+        return self.rescore(query, shortlist, k)
+
+
+def recall_report(path=QUANTIZED_DIR, embeddings_path=EMBEDDINGS_FILE, k=10,
+                  candidate_counts=(20, 50, 100, 200), queries=200, seed=0):
+    """recall@k og svartid for int8 og binær mod eksakt float32-søgning."""
+    store = QuantizedStore(path, embeddings_path)
+    exact = normalize_rows(store.full)
+    rng = np.random.default_rng(seed)
+    sample = exact[rng.choice(len(exact), min(queries, len(exact)), replace=False)]
+    k = min(k, len(exact))
+    started = time.perf_counter()
+    truth = np.stack([top_k(exact @ query, k) for query in sample])
+    exact_ms = (time.perf_counter() - started) * 1000 / len(sample)
+
+    full_mb = exact.nbytes / 1e6
+    print(f"📦 {len(store)} vektorer: float32 {full_mb:.1f} MB, int8 {store.int8.nbytes / 1e6:.1f} MB, "
+          f"binær {store.binary.nbytes / 1e6:.2f} MB")
+    print(f"   eksakt float32                 recall@{k} 1.000  {exact_ms:.3f} ms/forespørgsel")
+    for method in ("int8", "binary"):
+        for candidates in candidate_counts:
+            started = time.perf_counter()
+            found = [store.search(query, k, method, candidates)[1] for query in sample]
+            ms = (time.perf_counter() - started) * 1000 / len(sample)
+            hits = sum(len(np.intersect1d(t, f)) for t, f in zip(truth, found))
+            print(f"   {method:<6} kandidater={candidates:<5d} recall@{k} {hits / truth.size:.3f}  {ms:.3f} ms/forespørgsel")
+
+def main():
+    parser = argparse.ArgumentParser(description="int8- og binær-kvantiserede embeddings med eksakt genberegning.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Byg de kvantiserede kopier af embedding-lageret")
+    report = sub.add_parser("report", help="recall@k og svartid mod eksakt søgning")
+    report.add_argument("-k", type=int, default=10)
+    report.add_argument("--candidates", type=int, nargs="+", default=[20, 50, 100, 200])
+    report.add_argument("--queries", type=int, default=200)
+    for p in (build, report):
+        p.add_argument("--embeddings-file", default=EMBEDDINGS_FILE)
+        p.add_argument("--quantized-dir", default=QUANTIZED_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        full, int8, binary = build_quantized(np.load(args.embeddings_file, mmap_mode="r"), args.quantized_dir)
+        print(f"✅ Kvantiseret lager gemt i {args.quantized_dir}/: float32 {full / 1e6:.1f} MB -> "
+              f"int8 {int8 / 1e6:.1f} MB ({full / int8:.0f}x), binær {binary / 1e6:.2f} MB ({full / binary:.0f}x)")
+    else:
+        try:
+            recall_report(args.quantized_dir, args.embeddings_file, args.k, args.candidates, args.queries)
+        except ValueError as e:
+            raise SystemExit(str(e))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Lokal semantisk søgning i de crawlede artikler.
+
+Embedding-lageret (se embedding_store.py) indlæses én gang og L2-normaliseres,
+så cosinus-ligheden for alle artikler er ét matrix-vektor-produkt. De k
+bedste findes med argpartition (O(n)) og sorteres bagefter. Mange
+forespørgsler på én gang er ét matrix-matrix-produkt.
+
+Brug:
+    python3 search.py "Kassenabschluss drucken"           # top 10 (forespørgslen embeddes via OpenAI)
+    python3 search.py "Inventory" --embedder hashing --embeddings-file corpus_embeddings.npy \
+        --index-file corpus_embeddings_index.json         # lokalt embeddet korpus (embedding_providers.py)
+    python3 search.py "Gutschein" -k 5 --main-category pos
+    python3 search.py --like <artikel-url>                 # artikler der ligner en crawlet artikel (intet API-kald)
+    python3 search.py "Gutschein" --nprobe 8               # approksimativ søgning i IVF-indexet (ann_index.py)
+    python3 search.py "Inventory" --nprobe 8 --embedder hashing --embeddings-file corpus_embeddings.npy \
+        --index-file corpus_embeddings_index.json         # IVF-indexet i corpus_embeddings_ivf/
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from embedding_providers import PROVIDERS
+from embedding_store import EMBEDDINGS_FILE, INDEX_FILE, EmbeddingStore
+
+DEFAULT_K = 10
+
+
+def normalize_rows(matrix):
+    """L2-normaliserer hver række (nul-vektorer forbliver nul)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def top_k(scores, k):
+    """Indeks for de k højeste scores pr. række, sorteret faldende."""
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=-1)
+
+
+class SemanticIndex:
+    def __init__(self, embeddings_path=EMBEDDINGS_FILE, index_path=INDEX_FILE):
+        store = EmbeddingStore(embeddings_path, index_path)
+        self.rows = store.rows
+        self.row_of = store.row_of
+        # Normaliseret kopi i hukommelsen - så er prikproduktet cosinus-ligheden
+        self.vectors = normalize_rows(store.matrix)
+        self._main_rows = {}
+        for i, row in enumerate(self.rows):
+            self._main_rows.setdefault(row["main_category"], []).append(i)
+        self._main_rows = {main: np.asarray(rows, dtype=np.int64) for main, rows in self._main_rows.items()}
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def main_categories(self):
+        return sorted(self._main_rows)
+
+    def _candidates(self, main_category):
+        if main_category is None:
+            return None, self.vectors
+        rows = self._main_rows.get(main_category, np.empty(0, dtype=np.int64))
+        return rows, self.vectors[rows]
+
+    def search(self, query_vector, k=DEFAULT_K, main_category=None):
+        """De k mest lignende artikler som liste af (score, række-metadata)."""
+        return self.search_batch(np.asarray(query_vector)[None, :], k, main_category)[0]
+
+    def search_batch(self, query_vectors, k=DEFAULT_K, main_category=None):
+        """search for mange forespørgsler på én gang (én række pr. forespørgsel)."""
+        queries = normalize_rows(np.atleast_2d(query_vectors))
+        rows, vectors = self._candidates(main_category)
+        scores = queries @ vectors.T
+        best = top_k(scores, k)
+        results = []
+        for query_scores, query_best in zip(scores, best):
+            results.append([
+                (float(query_scores[i]), self.rows[i if rows is None else rows[i]])
+                for i in query_best
+            ])
+        return results
+
+    def similar(self, url, k=DEFAULT_K, main_category=None):
+        """Artikler der ligner en artikel i lageret (artiklen selv udelades)."""
+        hits = self.search(self.vectors[self.row_of[url]], k + 1, main_category)
+        return [(score, row) for score, row in hits if row["url"] != url][:k]
+
+
+def embed_query(text, backend="openai"):
+    """Embedder en forespørgsel med samme backend som lageret blev bygget med."""
+    from embedding_providers import get_provider
+
+    try:
+        return get_provider(backend).embed_one(text)
+    except ValueError as e:
+        raise SystemExit(f"{e} (brug --like for at søge uden API)")
+
+def print_hits(hits):
+    for rank, (score, row) in enumerate(hits, 1):
+        print(f"{rank:3d}. {score:.4f}  [{row['main_category']}/{row['category']}]  {row['url']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Semantisk søgning i de crawlede artikler.")
+    parser.add_argument("query", nargs="?", help="Søgetekst")
+    parser.add_argument("--like", metavar="URL", help="Find artikler der ligner en crawlet artikel")
+    parser.add_argument("-k", type=int, default=DEFAULT_K, help=f"Antal resultater (standard: {DEFAULT_K})")
+    parser.add_argument("--main-category", help="Søg kun i én hovedkategori (fx backoffice, pos, webshop)")
+    parser.add_argument("--nprobe", type=int,
+                        help="Søg approksimativt i IVF-indexet med så mange klynger (se ann_index.py)")
+    parser.add_argument("--embedder", default="openai", choices=sorted(PROVIDERS),
+                        help="Backend forespørgslen embeddes med - samme som lageret (standard: openai)")
+    parser.add_argument("--embeddings-file", default=EMBEDDINGS_FILE)
+    parser.add_argument("--index-file", default=INDEX_FILE)
+    parser.add_argument("--ivf-dir", help="IVF-index til --nprobe (standard: <embeddings-file>_ivf)")
+    args = parser.parse_args()
+    if not args.query and not args.like:
+        parser.error("angiv en søgetekst eller --like URL")
+
+    started = time.perf_counter()
+    index = SemanticIndex(args.embeddings_file, args.index_file)
+    print(f"📚 {len(index)} artikler indlæst på {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    if args.like:
+        if args.like not in index.row_of:
+            raise SystemExit(f"{args.like} findes ikke i {args.index_file}")
+        query_vector = index.vectors[index.row_of[args.like]]
+    else:
+        query_vector = embed_query(args.query, args.embedder)
+
+    started = time.perf_counter()
+    if args.nprobe:
+        from ann_index import IvfIndex, ann_dir_for
+
+        ivf_dir = args.ivf_dir or ann_dir_for(args.embeddings_file)
+        if not os.path.isdir(ivf_dir):
+            raise SystemExit(f"Intet IVF-index i {ivf_dir} "
+                             f"(byg det: python3 ann_index.py build --embeddings-file {args.embeddings_file})")
+        ivf = IvfIndex(ivf_dir)
+        # IVF-indexets id'er er rækkenumre i lageret - de skal være bygget over det samme lager
+        if len(ivf) != len(index):
+            raise SystemExit(f"IVF-indexet i {ivf_dir} har {len(ivf)} vektorer, men lageret har {len(index)} "
+                             f"(byg det igen: python3 ann_index.py build --embeddings-file {args.embeddings_file})")
+        # Filteret anvendes efter IVF-søgningen, så der hentes ekstra kandidater
+        wanted = (args.k + 1) * (4 if args.main_category else 1)
+        scores, ids = ivf.search(query_vector, wanted, args.nprobe)
+        hits = [(float(score), index.rows[i]) for score, i in zip(scores, ids) if i >= 0]
+        if args.main_category:
+            hits = [hit for hit in hits if hit[1]["main_category"] == args.main_category]
+        if args.like:
+            hits = [hit for hit in hits if hit[1]["url"] != args.like]
+        hits = hits[:args.k]
+    elif args.like:
+        hits = index.similar(args.like, args.k, args.main_category)
+    else:
+        hits = index.search(query_vector, args.k, args.main_category)
+    print(f"🔎 Søgning: {(time.perf_counter() - started) * 1000:.2f} ms\n")
+    print_hits(hits)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Streaming reader for the Freshdesk Solutions.json export.
+
+The export is one large JSON array of {"category": {"name", "all_folders": [
+{"name", "articles": [...]}]}} objects. Instead of json.load-ing the whole
+file, iter_solution_articles() walks the structure incrementally and yields
+(category_name, folder_name, article) one article at a time. Only the
+current read buffer and the current article are held in memory, so peak
+memory does not grow with the size of the export.
+
+Each article (and any other value outside the category/folder structure) is
+decoded with the C json decoder via raw_decode; the scanner itself only
+steps over the brackets, keys and commas between them.
+"""
+
+import json
+
+SOLUTIONS_FILE = "Solutions.json"
+READ_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Scanner:
+    """Incremental JSON tokenizer over a text file."""
+
+    def __init__(self, f, read_size=READ_SIZE):
+        self._f = f
+        self._read_size = read_size
+        self._decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size=None):
+        """Reads more of the file into the buffer; False at end of file."""
+        if self.eof:
+            return False
+        data = self._f.read(size or self._read_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character (not consumed), or "" at end of file."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in Solutions.json, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decodes the next complete JSON value."""
+        self.peek()
+        # Read ahead in growing steps, so a large value is re-decoded O(log n) times, not O(n)
+        size = self._read_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+                # A number at the very end of the buffer may continue in the next read
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill(size)
+            size *= 2
+
+    def items(self, open_char, close_char):
+        """Iterates over the members of an array or object; yields nothing per member, the caller reads it."""
+        self.expect(open_char)
+        if self.peek() == close_char:
+            self.pos += 1
+            return
+        while True:
+            yield
+            separator = self.peek()
+            self.pos += 1
+            if separator == close_char:
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or {close_char!r} in Solutions.json, found {separator!r}")
+
+    def keys(self):
+        """Iterates over the keys of an object; the caller reads each value."""
+        for _ in self.items("{", "}"):
+            key = self.value()
+            self.expect(":")
+            yield key
+
+
+def _folder_articles(scanner):
+    """(folder_name, article) for one folder object."""
+    name = None
+    waiting = []  # articles seen before the folder's "name" key
+    for key in scanner.keys():
+        if key == "name":
+            name = scanner.value()
+            for article in waiting:
+                yield name, article
+            waiting = []
+        elif key == "articles" and scanner.peek() == "[":
+            for _ in scanner.items("[", "]"):
+                article = scanner.value()
+                if name is None:
+                    waiting.append(article)
+                else:
+                    yield name, article
+        else:
+            scanner.value()
+    for article in waiting:
+        yield "Unknown Folder", article
+
+def _category_articles(scanner):
+    """(category_name, folder_name, article) for one category object."""
+    name = None
+    waiting = []  # (folder, article) seen before the category's "name" key
+    for key in scanner.keys():
+        if key == "name":
+            name = scanner.value()
+            for folder_name, article in waiting:
+                yield name, folder_name, article
+            waiting = []
+        elif key == "all_folders" and scanner.peek() == "[":
+            for _ in scanner.items("[", "]"):
+                for folder_name, article in _folder_articles(scanner):
+                    if name is None:
+                        waiting.append((folder_name, article))
+                    else:
+                        yield name, folder_name, article
+        else:
+            scanner.value()
+    for folder_name, article in waiting:
+        yield "Unknown Category", folder_name, article
+
+def iter_solution_articles(path=SOLUTIONS_FILE):
+    """Yields (category_name, folder_name, article) for every article in the export, in file order."""
+    with open(path, "r", encoding="utf-8") as f:
+        scanner = _Scanner(f)
+        for _ in scanner.items("[", "]"):
+            for key in scanner.keys():
+                if key == "category" and scanner.peek() == "{":
+                    yield from _category_articles(scanner)
+                else:
+                    scanner.value()
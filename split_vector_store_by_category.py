@@ -8,6 +8,8 @@ import os
 from pathlib import Path
 from collections import defaultdict
 
+from taxonomy import load_taxonomy
+
 def load_consolidated_articles():
     """Load the consolidated articles file."""
     print("🔍 Loading consolidated articles...")
@@ -20,39 +22,14 @@ def load_consolidated_articles():
 
 def group_articles_by_main_category(articles):
     """Group articles by their main category for splitting."""
-
-    # Define main category groupings
-    category_mapping = {
-        "Cowis Backoffice": ["Cowis Customer Help", "DdD Customer Help"],
-        "Cowis POS": ["RVE - RFA - POSFLOW etc.  Customer Help", "Imagine Documentation"],
-        "MStore": ["MStore Customer Help", "MStore User Guide", "MStore Customer FAQs"],
-        "Internal Support": ["INTERNAL Support Articles"],
-        "Internal MStore": ["INTERNAL MStore Product Information"],
-        "RMS": ["RMS Customer Help", "RMSify Customer Help"],
-        "Other": ["Omnis Customer Help", "Hardware Support", "Default Category",
-                 "How to use this portal and what to expect from Support"],
-        "Specialized": ["SmartVision Customer Help", "JobBOSS Customer Help",
-                       "Sigma Customer Help", "Alert Manager Customer Help",
-                       "ViJi Track Documentation", "Imagine FAQs",
-                       "ARCHIVED", "Support Portal"]
-    }
+    vector_store_group = load_taxonomy().vector_store_group
 
     # Group articles
     grouped = defaultdict(list)
 
     for article in articles:
         category = article.get("category", "Unknown")
-        assigned = False
-
-        # Find which main category this belongs to
-        for main_cat, sub_cats in category_mapping.items():
-            if category in sub_cats:
-                grouped[main_cat].append(article)
-                assigned = True
-                break
-
-        if not assigned:
-            grouped["Other"].append(article)
+        grouped[vector_store_group(category)].append(article)
 
     return grouped
 
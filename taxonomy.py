@@ -0,0 +1,73 @@
+"""
+Fælles kategori-taksonomi for crawleren og Freshdesk-scripts.
+
+Taksonomien ligger i taxonomy.json og kompileres én gang til opslagstabeller:
+  - knowledge.cowis.net: kategori-ID og normaliseret URL -> hovedkategori,
+    samt startsiderne pr. crawl-gruppe i crawl-rækkefølge
+  - Freshdesk: kategorinavn -> hovedkategori og vector store-gruppe
+"""
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from cowis_extract import normalize_url
+
+TAXONOMY_FILE = Path(__file__).with_name("taxonomy.json")
+
+_CATEGORY_ID = re.compile(r"/category/(\d+)/")
+
+
+class Taxonomy:
+    def __init__(self, data):
+        knowledge_base = data["knowledge_base"]
+        self.default_main_category = knowledge_base["default_main_category"]
+        self.main_by_id = {}
+        self.main_by_url = {}
+        self.crawl_groups = {}
+        for entry in knowledge_base["categories"]:
+            self.main_by_id[entry["id"]] = entry["main_category"]
+            if entry.get("url"):
+                self.main_by_url[normalize_url(entry["url"])] = entry["main_category"]
+            if entry.get("crawl_group"):
+                self.crawl_groups.setdefault(entry["crawl_group"], []).append(entry["url"])
+
+        freshdesk = data["freshdesk"]
+        self.default_freshdesk_main_category = freshdesk["default_main_category"]
+        self.default_vector_store = freshdesk["default_vector_store"]
+        self.freshdesk_main = {}
+        self.freshdesk_vector_store = {}
+        for entry in freshdesk["categories"]:
+            if "main_category" in entry:
+                self.freshdesk_main[entry["name"]] = entry["main_category"]
+            if "vector_store" in entry:
+                self.freshdesk_vector_store[entry["name"]] = entry["vector_store"]
+
+    def category_urls(self, crawl_group):
+        """Startsider for en crawl-gruppe (backoffice, pos, webshop, updatebeschreibungen)."""
+        return list(self.crawl_groups.get(crawl_group, []))
+
+    def main_category(self, url):
+        """Hovedkategori (backoffice/pos/webshop) for en kategori-URL på knowledge.cowis.net."""
+        normalized = normalize_url(url)
+        match = _CATEGORY_ID.search(normalized)
+        if match:
+            main_category = self.main_by_id.get(int(match.group(1)))
+            if main_category:
+                return main_category
+        return self.main_by_url.get(normalized, self.default_main_category)
+
+    def freshdesk_main_category(self, category_name):
+        """Hovedkategori for en Freshdesk-kategori (Solutions_Organized)."""
+        return self.freshdesk_main.get(category_name, self.default_freshdesk_main_category)
+
+    def vector_store_group(self, category_name):
+        """Vector store-fil som en Freshdesk-kategori hører til."""
+        return self.freshdesk_vector_store.get(category_name, self.default_vector_store)
+
+
+@lru_cache(maxsize=None)
+def load_taxonomy(path=TAXONOMY_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return Taxonomy(json.load(f))
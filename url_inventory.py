@@ -0,0 +1,139 @@
+"""
+Opdagelse af alle artikel-URLs før crawlet, og et gemt URL-inventar.
+
+Artikel-URL'erne findes først - via sitemap (robots.txt / sitemap.xml) hvis
+sitet har et, ellers med én BFS over kategoriernes sider (kun kategori-sider
+hentes, ingen artikler). Resultatet gemmes i url_inventory.json, så senere
+kørsler kan lægge artiklerne direkte i kø uden at hente kategori-sider.
+"""
+
+import json
+import re
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from cowis_extract import BASE_URL, DEFAULT_PARSER, category_id, extract_category_page, normalize_page_url, normalize_url
+
+INVENTORY_FILE = "url_inventory.json"
+SITEMAP_PATHS = ["sitemap.xml", "sitemap_index.xml"]
+# Antal kategori-sider der hentes samtidigt i BFS'en
+DISCOVERY_WORKERS = 8
+
+_CONTENT_CATEGORY_ID = re.compile(r"/content/(\d+)/")
+
+
+def article_category_id(url):
+    """Kategori-ID'et i en artikel-URL (/content/<id>/...), eller None."""
+    match = _CONTENT_CATEGORY_ID.search(url)
+    return match.group(1) if match else None
+
+def _xml_locs(xml_text):
+    """(er sitemap-index, <loc>-værdier) fra et sitemap-dokument."""
+    try:
+        root = ET.fromstring(xml_text.encode("utf-8"))
+    except ET.ParseError:
+        return False, []
+    locs = [el.text.strip() for el in root.iter() if el.tag.rsplit("}", 1)[-1] == "loc" and el.text]
+    return root.tag.rsplit("}", 1)[-1] == "sitemapindex", locs
+
+def sitemap_urls(fetch, base_url=BASE_URL):
+    """Alle URLs fra sitets sitemaps (fra robots.txt eller standardstierne). Tom liste hvis der ikke er nogen."""
+    robots = fetch(urljoin(base_url, "robots.txt")) or ""
+    pending = [line.split(":", 1)[1].strip() for line in robots.splitlines()
+               if line.lower().startswith("sitemap:")]
+    pending = pending or [urljoin(base_url, path) for path in SITEMAP_PATHS]
+
+    seen = set()
+    urls = []
+    while pending:
+        sitemap_url = pending.pop(0)
+        if sitemap_url in seen:
+            continue
+        seen.add(sitemap_url)
+        xml_text = fetch(sitemap_url)
+        if not xml_text:
+            continue
+        is_index, locs = _xml_locs(xml_text)
+        if is_index:
+            pending.extend(locs)
+        else:
+            urls.extend(locs)
+    return urls
+
+def discover_from_sitemap(fetch, categories, base_url=BASE_URL):
+    """Artikler fra sitemap'et der hører til en af de kendte kategorier (via kategori-ID'et i URL'en)."""
+    entries = {}
+    unmatched = 0
+    for url in sitemap_urls(fetch, base_url):
+        normalized = normalize_url(url)
+        if "/content/" not in normalized:
+            continue
+        category = categories.get(article_category_id(normalized))
+        if category is None:
+            unmatched += 1
+            continue
+        category_url, category_name = category
+        entries.setdefault(normalized, {"url": url, "category_name": category_name, "category_url": category_url})
+    if unmatched:
+        print(f"   ⚠️ {unmatched} artikler i sitemap'et hører ikke til en kendt kategori")
+    return list(entries.values())
+
+def discover_by_category_bfs(fetch, categories, parser=DEFAULT_PARSER, workers=DISCOVERY_WORKERS):
+    """BFS over kategori-siderne (forsider + paginering), ét niveau ad gangen med parallelle hentninger.
+
+    Returnerer (artikler, antal hentede sider). En artikel tilhører den første kategori der linker til den.
+    """
+    entries = {}
+    level = [(category_url, category_url, category_name) for category_url, category_name in categories.values()]
+    seen_pages = {normalize_page_url(page_url) for page_url, _, _ in level}
+    pages_fetched = 0
+
+    def visit(job):
+        page_url = job[0]
+        html = fetch(page_url)
+        return job, extract_category_page(html, page_url, parser) if html else ([], [], [])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while level:
+            next_level = []
+            for (page_url, category_url, category_name), (article_links, pagination_links, _) in pool.map(visit, level):
+                pages_fetched += 1
+                for article_url in article_links:
+                    entries.setdefault(article_url, {
+                        "url": article_url, "category_name": category_name, "category_url": category_url,
+                    })
+                for full_url, link_normalized in pagination_links:
+                    if link_normalized not in seen_pages:
+                        seen_pages.add(link_normalized)
+                        next_level.append((full_url, category_url, category_name))
+            level = next_level
+    return list(entries.values()), pages_fetched
+
+def discover(fetch, category_urls, category_name_of, parser=DEFAULT_PARSER, base_url=BASE_URL):
+    """Finder alle artikel-URLs for kategorierne: sitemap hvis muligt, ellers BFS. Returnerer inventaret."""
+    categories = {}
+    for category_url in category_urls:
+        categories.setdefault(category_id(normalize_url(category_url)), (category_url, category_name_of(category_url)))
+
+    print("🗺️  Søger efter sitemap...")
+    entries = discover_from_sitemap(fetch, categories, base_url)
+    source = "sitemap"
+    pages_fetched = 0
+    if not entries:
+        print("🗺️  Intet brugbart sitemap - gennemløber kategori-siderne (BFS)...")
+        entries, pages_fetched = discover_by_category_bfs(fetch, categories, parser)
+        source = "bfs"
+    print(f"🗺️  Fundet {len(entries)} artikler via {source}"
+          + (f" ({pages_fetched} kategori-sider hentet)" if pages_fetched else ""))
+    return {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "source": source, "articles": entries}
+
+def save_inventory(inventory, path=INVENTORY_FILE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(inventory, f, ensure_ascii=False, indent=2)
+    print(f"💾 URL-inventar gemt i {path} ({len(inventory['articles'])} artikler)")
+
+def load_inventory(path=INVENTORY_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)